@@ -3,18 +3,50 @@ Quantum simulation API: arbitrage, scheduler, liquidation.
 
 Endpoints (see README "Functions and Algorithms" for algorithms and I/O):
 - POST /arbitrage  — optimal swap path (Arbitrage Pathfinder)
+- POST /cycles     — profitable cycles across the whole pool graph (negative-cycle scan)
 - POST /scheduler  — transaction schedule (Transaction Scheduler)
+- POST /scheduler/sessions — incremental scheduler session; then POST .../{id}/orders (add/remove),
+  GET .../{id} (schedule), POST .../{id}/rebuild, GET .../{id}/stream (SSE), DELETE .../{id}
 - POST /liquidation — liquidation strategy (Liquidation Optimizer)
+- POST /positions (bulk upsert/remove), GET /positions/liquidatable, POST /positions/select,
+  GET /positions/stats — server-side position book for the liquidation optimizer
+- GET  /sniper/models — sniper scoring models (hot-reloaded from SNIPER_MODELS_DIR), chosen per request
+- POST /sniper/feed (updates), GET /sniper/feed (top K), GET /sniper/feed/stream (SSE) — continuous
+  sniper ranking over rolling per-pool state
+- POST /hedge-portfolio — exit routes for a whole portfolio on one snapshot (parallel routing,
+  shared reserves)
+- GET  /correlations/anti?token=..&k=.., GET /correlations/stats — rolling reserve-price correlations
+- GET  /executor/stats — solver executor queue depth and wait/run times per endpoint
+- GET  /cache/stats — result cache hit/miss counters (arbitrage, hedge finder)
 
-All computations use classical simulators (simulated annealing / QUBO) for PoC.
+All computations use classical simulators (simulated annealing / QUBO) for PoC. Solvers are
+CPU-bound and run off the event loop through services/executor; the ones that read the shared
+live pool graph use the thread pool and only see read-only snapshots of it (see
+services/pool_graph), and process-local stores (position book) hand workers copies.
 """
 
-from fastapi import APIRouter
-from pydantic import BaseModel
-from typing import Optional
+import asyncio
+import json
+import time
 
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+
+from services.coloring import SlotCapacity
+from services.executor import get_solver_executor, run_solver
+from services.hedge_portfolio import solve_hedge_portfolio
+from services.knapsack import solve_knapsack_problem
+from services.memequbit_fetcher import get_memequbit_fetcher
+from services.pool_graph import get_live_pool_graph
+from services.position_book import get_position_book
+from services.price_history import get_price_history
+from services.result_cache import get_result_cache
+from services.scheduler_sessions import SchedulerSession, get_scheduler_sessions, recolor
+from services.scoring_models import UnknownScoringModel, get_scoring_models
+from services.sniper_feed import get_sniper_feed
 from services.quantum_simulator import (
     solve_arbitrage,
+    solve_cycle_scan,
     solve_scheduler,
     solve_liquidation,
 )
@@ -27,26 +59,46 @@ from services.meme_quantum import solve_sniper, solve_batch_exit, solve_hedge_fi
 from models.quantum import (
     ArbitrageRequest,
     ArbitrageResponse,
+    CycleScanRequest,
+    CycleScanResponse,
     SchedulerRequest,
     SchedulerResponse,
+    SchedulerSessionCreate,
+    SchedulerSessionDelta,
+    SchedulerSessionDeltaResponse,
+    SchedulerSessionState,
     LiquidationRequest,
     LiquidationResponse,
+    PositionBookQueryResponse,
+    PositionBookSelectRequest,
+    PositionBookSelectResponse,
+    PositionBookUpsert,
+    PositionBookUpsertResponse,
     YieldSchedulingRequest,
     YieldSchedulingResponse,
     PoolRiskRequest,
     PoolRiskResponse,
     PredictionMarketRequest,
     PredictionMarketResponse,
+    PoolInput,
     SniperRequest,
     SniperResponse,
+    SniperFeedSnapshot,
+    SniperFeedUpdateBatch,
+    SniperFeedUpdateResponse,
     BatchExitRequest,
     BatchExitResponse,
     HedgeFinderRequest,
     HedgeFinderResponse,
+    HedgePortfolioRequest,
+    HedgePortfolioResponse,
+    AntiCorrelationResponse,
 )
 
 router = APIRouter()
 
+_REBUILD_ATTEMPTS = 3
+
 
 @router.get("/status")
 async def quantum_status():
@@ -59,22 +111,196 @@ async def quantum_status():
     }
 
 
+@router.get("/executor/stats")
+async def executor_stats():
+    """Solver executor: mode, worker counts and per-endpoint queue depth / wait / run times."""
+    return get_solver_executor().stats()
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """Result cache: entries, evictions and per-endpoint hit / miss / coalesced / bypassed counters."""
+    return get_result_cache().stats()
+
+
 @router.post("/arbitrage", response_model=ArbitrageResponse)
 async def api_arbitrage(req: ArbitrageRequest):
     """Quantum Arbitrage Pathfinder: find optimal path across pools (QUBO + simulated annealing)."""
-    return await solve_arbitrage(req)
+    kind = None
+    live_pools = not (req.use_extended_demo or req.pools)
+    if live_pools:
+        await get_live_pool_graph()  # first sync happens on the event loop, not in a worker
+        kind = "thread"
+    return await get_result_cache().get_or_compute(
+        "arbitrage", req, ArbitrageResponse, lambda: run_solver("arbitrage", solve_arbitrage, req, kind=kind),
+        live_pools=live_pools,
+        # only the opt-in path-selection QUBO samples; unseeded, its reported pick varies per call
+        deterministic=not req.path_qubo or (req.solver is not None and req.solver.seed is not None),
+    )
+
+
+@router.post("/cycles", response_model=CycleScanResponse)
+async def api_cycles(req: CycleScanRequest):
+    """Arbitrage cycle scan: top-K negative cycles (-log rate) over the live pool graph."""
+    await get_live_pool_graph()
+    return await run_solver("cycles", solve_cycle_scan, req, kind="thread")
 
 
 @router.post("/scheduler", response_model=SchedulerResponse)
 async def api_scheduler(req: SchedulerRequest):
     """Quantum Transaction Scheduler: minimize conflicts (graph coloring QUBO)."""
-    return await solve_scheduler(req)
+    return await run_solver("scheduler", solve_scheduler, req)
+
+
+def _session(session_id: str) -> SchedulerSession:
+    session = get_scheduler_sessions().get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Scheduler session {session_id} not found")
+    return session
+
+
+@router.post("/scheduler/sessions", response_model=SchedulerSessionState)
+async def api_scheduler_session_create(req: SchedulerSessionCreate):
+    """Incremental scheduler: open a session, optionally seeded with orders."""
+    session = get_scheduler_sessions().create(
+        req.hazards, SlotCapacity(max_orders=req.max_orders_per_slot, max_gas=req.max_gas_per_slot)
+    )
+    for order in req.pending_orders:
+        session.add(order)
+    return session.state()
+
+
+@router.get("/scheduler/sessions/{session_id}", response_model=SchedulerSessionState)
+async def api_scheduler_session_get(session_id: str):
+    """Current slot assignment of a scheduler session."""
+    return _session(session_id).state()
+
+
+@router.post("/scheduler/sessions/{session_id}/orders", response_model=SchedulerSessionDeltaResponse)
+async def api_scheduler_session_update(session_id: str, req: SchedulerSessionDelta):
+    """Apply a delta: remove executed/cancelled orders, then slot newly arrived ones."""
+    session = _session(session_id)
+    t0 = time.perf_counter()
+    removed = [order_id for order_id in req.remove if session.remove(order_id)]
+    assignments = {order.id: f"slot_{session.add(order) + 1}" for order in req.add}
+    return SchedulerSessionDeltaResponse(
+        session_id=session.id,
+        assignments=assignments,
+        removed=removed,
+        total_slots=session.total_slots,
+        total_orders=len(session.orders),
+        version=session.version,
+        update_ms=round((time.perf_counter() - t0) * 1000, 3),
+    )
+
+
+@router.post("/scheduler/sessions/{session_id}/rebuild", response_model=SchedulerSessionState)
+async def api_scheduler_session_rebuild(session_id: str):
+    """Recolor all pending orders of the session from scratch (DSATUR)."""
+    session = _session(session_id)
+    # Color a snapshot in the executor; sessions are only mutated on the event loop, so the result
+    # is installed only if no order arrived or left meanwhile.
+    for _ in range(_REBUILD_ATTEMPTS):
+        job = session.rebuild_job()
+        colors = await run_solver("scheduler-rebuild", recolor, job)
+        if session.apply_rebuild(job, colors):
+            return session.state()
+    raise HTTPException(status_code=409, detail=f"Scheduler session {session_id} kept changing during rebuild; retry")
+
+
+@router.delete("/scheduler/sessions/{session_id}")
+async def api_scheduler_session_delete(session_id: str):
+    if not get_scheduler_sessions().delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Scheduler session {session_id} not found")
+    return {"deleted": session_id}
+
+
+@router.get("/scheduler/sessions/{session_id}/stream")
+async def api_scheduler_session_stream(session_id: str):
+    """Server-sent events: a snapshot, then one event per slot assignment / removal."""
+    session = _session(session_id)
+
+    async def events():
+        queue = session.subscribe()
+        try:
+            yield f"event: snapshot\ndata: {session.state().model_dump_json()}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    session.touch()  # a watched session stays alive
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                if event["type"] in ("closed", "overflow"):
+                    break
+        finally:
+            session.unsubscribe(queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 
 @router.post("/liquidation", response_model=LiquidationResponse)
 async def api_liquidation(req: LiquidationRequest):
     """Quantum Liquidation Optimizer: optimal set of positions to liquidate."""
-    return await solve_liquidation(req)
+    if req.use_position_book:
+        # Materialize only the liquidatable slice of the book here; the solver itself stays stateless.
+        book = get_position_book()
+        positions = book.to_models(book.liquidatable_rows(req.health_threshold))
+        req = req.model_copy(update={"positions_to_liquidate": positions, "use_position_book": False})
+    return await run_solver("liquidation", solve_liquidation, req)
+
+
+@router.post("/positions", response_model=PositionBookUpsertResponse)
+async def api_positions_upsert(req: PositionBookUpsert):
+    """Position book: bulk insert/replace positions and drop closed ones."""
+    t0 = time.perf_counter()
+    book = get_position_book()
+    upserted, removed = book.upsert(req.positions, req.remove)
+    return PositionBookUpsertResponse(
+        upserted=upserted,
+        removed=removed,
+        total_positions=len(book),
+        update_ms=round((time.perf_counter() - t0) * 1000, 3),
+    )
+
+
+@router.get("/positions/liquidatable", response_model=PositionBookQueryResponse)
+async def api_positions_liquidatable(threshold: float = 1.0, limit: int = 100):
+    """Position book: positions with health factor below threshold, worst first."""
+    t0 = time.perf_counter()
+    book = get_position_book()
+    rows = book.liquidatable_rows(threshold)
+    return PositionBookQueryResponse(
+        positions=book.to_models(rows[: max(0, limit)]),
+        total_liquidatable=len(rows),
+        query_ms=round((time.perf_counter() - t0) * 1000, 3),
+    )
+
+
+@router.post("/positions/select", response_model=PositionBookSelectResponse)
+async def api_positions_select(req: PositionBookSelectRequest):
+    """Position book: liquidatable positions that maximize recovery under gas and liquidity limits."""
+    t0 = time.perf_counter()
+    book = get_position_book()
+    rows, problem = book.select_problem(req.health_threshold, req.max_gas_per_block, req.available_liquidity, req.time_budget_ms)
+    ids = [book.position_ids[r] for r in rows.tolist()]
+    gas = book.gas_estimate[rows]
+    result = await run_solver("positions-select", solve_knapsack_problem, problem)
+    return PositionBookSelectResponse(
+        selected_positions=[ids[i] for i in result.selected],
+        candidates=len(rows),
+        recovery_value=round(result.value, 4),
+        gas_used=int(gas[result.selected].sum()),
+        optimality_gap=round(result.gap, 6),
+        method=result.method,
+        query_ms=round((time.perf_counter() - t0) * 1000, 3),
+    )
+
+
+@router.get("/positions/stats")
+async def api_positions_stats():
+    return get_position_book().stats()
 
 
 # --- Quantum Vision: Yield Infra & Prediction Market ---
@@ -83,19 +309,19 @@ async def api_liquidation(req: LiquidationRequest):
 @router.post("/yield-scheduling", response_model=YieldSchedulingResponse)
 async def api_yield_scheduling(req: YieldSchedulingRequest):
     """Yield Infra: quantum scheduling batches reinvest txs → 20–40% gas savings."""
-    return await solve_yield_scheduling(req)
+    return await run_solver("yield-scheduling", solve_yield_scheduling, req)
 
 
 @router.post("/pool-risk", response_model=PoolRiskResponse)
 async def api_pool_risk(req: PoolRiskRequest):
     """Pool risk classifier: quantum evaluates 10+ factors for accurate risk scores."""
-    return await solve_pool_risk_classifier(req)
+    return await run_solver("pool-risk", solve_pool_risk_classifier, req)
 
 
 @router.post("/prediction-market", response_model=PredictionMarketResponse)
 async def api_prediction_market(req: PredictionMarketRequest):
     """Prediction market AMM: quantum dynamic curve → 15–30% less slippage."""
-    return await solve_prediction_market_amm(req)
+    return await run_solver("prediction-market", solve_prediction_market_amm, req)
 
 
 # --- MemeQubit: Sniper, Batch Exit, Hedge Finder ---
@@ -104,16 +330,101 @@ async def api_prediction_market(req: PredictionMarketRequest):
 @router.post("/sniper", response_model=SniperResponse)
 async def api_sniper(req: SniperRequest):
     """Quantum Sniper: rank new Pump.fun pools by entry score. Classical = rules; Quantum = QUBO."""
-    return await solve_sniper(req)
+    # Models are resolved in the worker, against its own registry (which may have reloaded since).
+    try:
+        return await run_solver("sniper", solve_sniper, req)
+    except UnknownScoringModel as e:
+        raise HTTPException(status_code=404, detail=f"Scoring model {e.args[0]} not found")
+
+
+@router.get("/sniper/models")
+async def api_sniper_models():
+    """Registered scoring models (built-in and SNIPER_MODELS_DIR files) and files that failed to compile."""
+    return get_scoring_models().describe()
+
+
+@router.post("/sniper/feed", response_model=SniperFeedUpdateResponse)
+async def api_sniper_feed_update(body: SniperFeedUpdateBatch):
+    """Push pool / funding / wallet / dev updates into the rolling sniper state."""
+    feed = get_sniper_feed()
+    now = time.time()
+    for update in body.updates:
+        feed.apply(update, now)
+    return SniperFeedUpdateResponse(applied=len(body.updates), pools=len(feed), version=feed.version)
+
+
+@router.get("/sniper/feed", response_model=SniperFeedSnapshot)
+async def api_sniper_feed_snapshot(k: int = 20):
+    feed = get_sniper_feed()
+    return SniperFeedSnapshot(ranking=feed.snapshot(k), pools=len(feed), version=feed.version)
+
+
+@router.get("/sniper/feed/stream")
+async def api_sniper_feed_stream(k: int = 20):
+    """Server-sent events: a snapshot, then one tick event per rescore with rank changes and fly flips."""
+    feed = get_sniper_feed()
+
+    async def events():
+        queue = feed.subscribe()
+        try:
+            snapshot = SniperFeedSnapshot(ranking=feed.snapshot(k), pools=len(feed), version=feed.version)
+            yield f"event: snapshot\ndata: {snapshot.model_dump_json()}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            feed.unsubscribe(queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 
 @router.post("/batch-exit", response_model=BatchExitResponse)
 async def api_batch_exit(req: BatchExitRequest):
     """Quantum Batching: split sell into N batches. Classical = 1 tx; Quantum = optimal batches."""
-    return await solve_batch_exit(req)
+    if req.pool is None and req.pool_address:
+        pools = await get_memequbit_fetcher().get_pools()
+        pool = next((p for p in pools if p["address"].lower() == req.pool_address.lower()), None)
+        if pool is None:
+            raise HTTPException(status_code=404, detail=f"Pool {req.pool_address} not found")
+        req = req.model_copy(update={"pool": PoolInput(**pool)})
+    return await run_solver("batch-exit", solve_batch_exit, req)
 
 
 @router.post("/hedge-finder", response_model=HedgeFinderResponse)
 async def api_hedge_finder(req: HedgeFinderRequest):
     """Quantum Hedge Finder: best path from held token to stable. Classical = 2-hop; Quantum = full path."""
-    return await solve_hedge_finder(req)
+    if req.risk_weight > 0 and req.correlations is None:
+        tokens = {t for p in req.pools for t in p.tokens}
+        req = req.model_copy(update={"correlations": get_price_history().correlations_with(req.token_to_hedge, sorted(tokens))})
+    return await get_result_cache().get_or_compute(
+        "hedge-finder", req, HedgeFinderResponse, lambda: run_solver("hedge-finder", solve_hedge_finder, req),
+        live_pools=False,
+    )
+
+
+@router.get("/correlations/anti", response_model=AntiCorrelationResponse)
+async def api_anti_correlated(token: str, k: int = 10):
+    """Top-k pools most anti-correlated with `token`, from the rolling reserve-price history."""
+    history = get_price_history()
+    return AntiCorrelationResponse(
+        token=token,
+        reference_pool=history.reference_pool(token),
+        pools=history.anti_correlated(token, k),
+    )
+
+
+@router.get("/correlations/stats")
+async def api_correlation_stats():
+    return get_price_history().stats()
+
+
+@router.post("/hedge-portfolio", response_model=HedgePortfolioResponse)
+async def api_hedge_portfolio(req: HedgePortfolioRequest):
+    """Exit routes for every held token on one pool snapshot; tokens are routed in parallel, then
+    settled on shared reserves."""
+    pools = [p.model_dump() for p in req.pools] if req.pools else await get_memequbit_fetcher().get_pools()
+    return await solve_hedge_portfolio(req, pools)
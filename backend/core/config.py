@@ -9,6 +9,53 @@ class Settings(BaseSettings):
     # Comma-separated origins for CORS (e.g. for Vercel: https://your-app.vercel.app)
     CORS_ORIGINS: str = "http://localhost:3000,http://127.0.0.1:3000"
     POOL_CACHE_TTL_SECONDS: int = 30
+    # Chain RPC client: calls per JSON-RPC batch request, batches in flight, per-request timeout
+    RPC_BATCH_SIZE: int = 100
+    RPC_MAX_CONCURRENCY: int = 8
+    RPC_TIMEOUT_SECONDS: float = 10.0
+    NETWORK_STATS_TTL_SECONDS: float = 3.0  # block number / gas price cache (chain id is cached for good)
+    # On-chain pool discovery (Uniswap-V2-style factory); demo pools are served when unset
+    POOL_FACTORY_ADDRESS: str | None = None
+    POOL_FACTORY_FEE_BPS: int = 30
+    POOL_DISCOVERY_MAX_PAIRS: int = 5000  # newest factory pairs loaded
+    # Background negative-cycle (arbitrage loop) scan over the live pool graph
+    CYCLE_SCAN_BUDGET_MS: int = 200
+    CYCLE_SCAN_MAX_HOPS: int = 4
+    CYCLE_SCAN_TOP_K: int = 20
+    # CPU-bound solver dispatch: "process", "thread" or "inline" (run on the event loop)
+    SOLVER_EXECUTOR: str = "process"
+    SOLVER_PROCESS_WORKERS: int = 0  # 0 = one per CPU core
+    SOLVER_THREAD_WORKERS: int = 4
+    SOLVER_DEFAULT_CONCURRENCY: int = 8  # max in-flight solves per endpoint
+    # Per-endpoint overrides, e.g. "arbitrage=4,scheduler=2"
+    SOLVER_CONCURRENCY_LIMITS: str = ""
+    # Solver result cache (in-process LRU + optional Redis tier), entries live POOL_CACHE_TTL_SECONDS
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MAX_ENTRIES: int = 1024
+    # Incremental scheduler sessions (in-process)
+    SCHEDULER_SESSION_TTL_SECONDS: int = 900
+    SCHEDULER_MAX_SESSIONS: int = 100
+    # Continuous sniper feed: rescore interval, funding-velocity window, ranks tracked for changes
+    SNIPER_FEED_TICK_MS: int = 1000
+    SNIPER_FEED_VELOCITY_WINDOW_SEC: float = 30.0
+    SNIPER_FEED_TOP_K: int = 50
+    # Sniper scoring models: *.json specs (relative to the backend package), re-scanned for changes
+    # at most every N seconds
+    SNIPER_MODELS_DIR: str = "scoring_models"
+    SNIPER_MODELS_RELOAD_SEC: float = 2.0
+    # Price history for correlations: snapshots kept per pool (one per pool refresh), the
+    # shared samples required before a correlation is reported, and pools tracked (the running
+    # sums are dense max_pools x max_pools matrices)
+    PRICE_HISTORY_WINDOW: int = 256
+    PRICE_HISTORY_MIN_SAMPLES: int = 8
+    PRICE_HISTORY_MAX_POOLS: int = 1024
+    # Hedge targets when a request names none (symbols or addresses, matched case-insensitively)
+    STABLE_TOKENS: str = (
+        "USDC,USDT,DAI,"
+        "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48,"
+        "0xdAC17F958D2ee523a2206206994597C13D831ec7,"
+        "0x6B175474E89094C44Da98b954EedeAC495271d0F"
+    )
     # CoinGecko Demo API (optional; get key at https://www.coingecko.com/en/api/pricing)
     COINGECKO_DEMO_API_KEY: str | None = None
 
@@ -20,6 +67,15 @@ class Settings(BaseSettings):
     def cors_origins_list(self) -> list[str]:
         return [x.strip() for x in self.CORS_ORIGINS.split(",") if x.strip()]
 
+    @property
+    def solver_concurrency_limits(self) -> dict[str, int]:
+        limits = {}
+        for item in self.SOLVER_CONCURRENCY_LIMITS.split(","):
+            name, _, value = item.partition("=")
+            if name.strip() and value.strip().isdigit():
+                limits[name.strip()] = int(value)
+        return limits
+
 
 @lru_cache
 def get_settings() -> Settings:
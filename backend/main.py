@@ -11,18 +11,32 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from api import health, quantum, memequbit, coingecko
 from core.config import settings
+from services.executor import get_solver_executor, run_solver
+from services.rpc_client import close_rpc_client
 
 _background_task: asyncio.Task | None = None
 
 
 async def _pool_refresh_loop():
-    """Refresh pool cache every 30 seconds (TTL aligned)."""
+    """Refresh pool cache every 30 seconds (TTL aligned), sync the shared pool graph in place,
+    record a price-history sample and re-check arbitrage cycles touched by pools whose reserves changed."""
+    from services.cycle_scanner import CycleRefresh, get_cycle_scanner, refresh_cycles
     from services.memequbit_fetcher import get_memequbit_fetcher
+    from services.pool_graph import get_pool_graph, publish_live_graph
+    from services.price_history import record_prices
     fetcher = get_memequbit_fetcher()
+    graph = get_pool_graph()
+    scanner = get_cycle_scanner()
     while True:
         try:
             await asyncio.sleep(settings.POOL_CACHE_TTL_SECONDS)
-            await fetcher.get_pools()
+            pools = await fetcher.get_pools()
+            changed = graph.sync(pools)
+            snapshot = publish_live_graph()
+            await run_solver("price-history", record_prices, pools, kind="thread")
+            if changed or not scanner.complete:
+                # Off the event loop: a scan can take its whole CYCLE_SCAN_BUDGET_MS.
+                await run_solver("cycle-refresh", refresh_cycles, CycleRefresh(snapshot, changed), kind="thread")
             print(f"Pool cache refreshed at {datetime.utcnow().isoformat()}")
         except asyncio.CancelledError:
             print("Pool refresh task cancelled")
@@ -43,6 +57,8 @@ async def lifespan(app: FastAPI):
             await _background_task
         except asyncio.CancelledError:
             pass
+    get_solver_executor().shutdown()
+    await close_rpc_client()
 
 
 app = FastAPI(
@@ -2,8 +2,18 @@
 Pydantic models for quantum module requests/responses.
 """
 
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Literal, Optional
+
+from core.config import settings
+
+
+class SolverOptions(BaseModel):
+    """Simulated-annealing controls for QUBO-backed solvers."""
+    num_reads: int = 50
+    num_sweeps: int = 1000
+    seed: Optional[int] = None
+    time_budget_ms: Optional[float] = None  # stop sampling once exceeded (completed reads are kept)
 
 
 class PoolInput(BaseModel):
@@ -16,10 +26,18 @@ class PoolInput(BaseModel):
 class ArbitrageRequest(BaseModel):
     token_in: str
     token_out: str
-    pools: list[PoolInput]
+    pools: list[PoolInput] = []  # empty = route over the shared live pool graph
     max_hops: int = 4
     amount_in: float = 1000.0
     use_extended_demo: bool = False  # Use 6-token graph where quantum (full path) beats greedy (2-hop)
+    optimize_amount: bool = False  # also solve for the profit-maximizing input size
+    reference_rate: Optional[float] = None  # token_out per token_in used to value profit; default: 1 for cycles, else direct pool mid price
+    max_amount_in: Optional[float] = None  # cap for the optimized input size
+    size_candidates: int = 5  # best path plus close competitors to size
+    split_routes: bool = False  # also split amount_in across several paths to cut slippage
+    max_splits: int = 4
+    path_qubo: bool = False  # also sample the path-selection QUBO over the top candidates (reported in metrics only)
+    solver: Optional[SolverOptions] = None  # path-selection QUBO sampling (path_qubo)
 
 
 class TransactionRef(BaseModel):
@@ -28,6 +46,21 @@ class TransactionRef(BaseModel):
     amount: float
 
 
+class SplitAllocation(BaseModel):
+    path: list[str]
+    amount_in: float
+    amount_out: float
+    transactions: list[TransactionRef]
+
+
+class TradeSizeCandidate(BaseModel):
+    path: list[str]
+    optimal_amount_in: float
+    amount_out: float
+    profit: float  # amount_out - reference_rate * optimal_amount_in
+    transactions: list[TransactionRef]
+
+
 class ArbitrageComparison(BaseModel):
     classical_path: list[str]
     classical_profit: float
@@ -47,6 +80,32 @@ class ArbitrageResponse(BaseModel):
     classical_baseline: Optional[float] = None
     comparison: Optional[ArbitrageComparison] = None
     quantum_metrics: Optional[dict] = None  # paths_evaluated, max_hops, solver_ms, qubo_approx_vars
+    trade_sizes: Optional[list[TradeSizeCandidate]] = None  # with optimize_amount, best profit first
+    split_allocations: Optional[list[SplitAllocation]] = None  # with split_routes, largest leg first
+    split_amount_out: Optional[float] = None
+
+
+class CycleScanRequest(BaseModel):
+    top_k: int = Field(default_factory=lambda: settings.CYCLE_SCAN_TOP_K)
+    rescan: bool = False  # force a full rescan instead of returning the background job's cycles
+    budget_ms: Optional[int] = Field(None, gt=0, le=2000)  # runtime budget for a forced scan (default: CYCLE_SCAN_BUDGET_MS)
+
+
+class ArbitrageCycleEntry(BaseModel):
+    path: list[str]  # starts and ends at the same token
+    pools: list[str]
+    marginal_rate: float  # product of fee-adjusted spot rates; > 1 is profitable
+    optimal_amount_in: float
+    expected_profit: float  # in the start token
+
+
+class CycleScanResponse(BaseModel):
+    cycles: list[ArbitrageCycleEntry]
+    cycles_tracked: int
+    complete: bool  # False if the budget ran out before every start token was scanned
+    graph_version: int
+    scan_ms: float
+    sources_scanned: int
 
 
 # --- Scheduler ---
@@ -59,11 +118,26 @@ class PendingOrder(BaseModel):
     account: str
     reads: list[str] = []
     writes: list[str] = []
+    gas_estimate: Optional[int] = None  # for per-slot gas capacity; default 150k
 
 
 class SchedulerRequest(BaseModel):
     pending_orders: list[PendingOrder]
     conflict_matrix: Optional[list[list[int]]] = None  # computed if not provided
+    include_matrix: bool = True  # dense n x n matrix in the response (heatmap); disable for large batches
+    include_edges: bool = False  # sparse [i, j] conflict pairs in the response
+    strategy: Literal["first_fit", "largest_first", "dsatur"] = "dsatur"  # coloring order
+    local_search_ms: Optional[int] = None  # iterated-greedy improvement budget; None/0 = off
+    max_orders_per_slot: Optional[int] = None  # slot (block) capacity in orders
+    max_gas_per_slot: Optional[int] = None  # slot (block) capacity in gas
+    seed: Optional[int] = None  # local search RNG
+    hazards: Literal["ww", "rw"] = "rw"  # ww = shared writes only; rw = read-write, write-read, write-write
+    pipelined: bool = False  # ordered slots from a dependency DAG (arrival order = program order)
+
+
+class ColoringStrategyResult(BaseModel):
+    slots: int
+    ms: float
 
 
 class SchedulerComparison(BaseModel):
@@ -73,18 +147,52 @@ class SchedulerComparison(BaseModel):
     quantum_conflicts_remaining: int  # 0
     slots_reduction_pct: float  # (classical - quantum) / classical * 100
     winner: str
+    strategies: Optional[dict[str, ColoringStrategyResult]] = None  # slots and time per coloring strategy
 
 
 class SchedulerResponse(BaseModel):
     schedule: dict[str, list[str]]  # slot_id -> order_ids
     total_slots: int
     conflict_reduction: str
-    conflict_matrix: Optional[list[list[int]]] = None  # for heatmap
+    conflict_matrix: Optional[list[list[int]]] = None  # for heatmap (include_matrix)
+    conflict_edges: Optional[list[list[int]]] = None  # [i, j] pairs, i < j (include_edges)
+    dependency_edges: Optional[list[list[int]]] = None  # [i, j, strict] DAG edges (pipelined + include_edges)
     total_conflicts: int = 0
     comparison: Optional[SchedulerComparison] = None
     quantum_metrics: Optional[dict] = None  # graph_nodes, graph_edges, coloring_ms, conflict_pairs
 
 
+class SchedulerSessionCreate(BaseModel):
+    pending_orders: list[PendingOrder] = []  # initial orders
+    hazards: Literal["ww", "rw"] = "rw"
+    max_orders_per_slot: Optional[int] = None
+    max_gas_per_slot: Optional[int] = None
+
+
+class SchedulerSessionDelta(BaseModel):
+    add: list[PendingOrder] = []  # new orders (an existing id is replaced)
+    remove: list[str] = []  # order ids to drop (executed or cancelled)
+
+
+class SchedulerSessionState(BaseModel):
+    session_id: str
+    schedule: dict[str, list[str]]  # slot_id -> order_ids
+    total_slots: int
+    total_orders: int
+    total_conflicts: int
+    version: int  # bumped on every assignment / removal
+
+
+class SchedulerSessionDeltaResponse(BaseModel):
+    session_id: str
+    assignments: dict[str, str]  # order_id -> slot_id for added orders
+    removed: list[str]  # ids that were present and removed
+    total_slots: int
+    total_orders: int
+    version: int
+    update_ms: float
+
+
 # --- Liquidation ---
 
 
@@ -99,32 +207,75 @@ class PositionToLiquidate(BaseModel):
 
 
 class LiquidationRequest(BaseModel):
-    positions_to_liquidate: list[PositionToLiquidate]
+    positions_to_liquidate: list[PositionToLiquidate] = []
     available_liquidity: Optional[dict[str, float]] = None  # e.g. {"USDC": 100000, "USDT": 50000}
     protocol_constraints: Optional[dict] = None  # max_gas_per_block, etc.
+    solver: Optional[SolverOptions] = None  # knapsack QUBO sampling (used when max_gas_per_block is set)
+    time_budget_ms: int = 200  # branch-and-bound budget for large multi-constraint instances
+    use_position_book: bool = False  # take positions from the server-side book instead of the request
+    health_threshold: float = 1.0  # book positions below this health factor are candidates
 
 
 class LiquidationComparison(BaseModel):
-    classical_recovery: float
+    classical_recovery: float  # average recovery score of the selected positions
+    classical_recovery_value: float = 0.0  # total recovery value (score x debt), the optimized objective
     classical_selected: list[str]
     classical_gas_used: Optional[int] = None
     classical_constraint_violation: Optional[str] = None  # e.g. "gas exceeded" if classical would exceed
     quantum_recovery: float
+    quantum_recovery_value: float = 0.0
     quantum_selected: list[str]
     quantum_gas_used: Optional[int] = None
-    improvement_pct: float
-    winner: str
+    improvement_pct: float  # by total recovery value
+    winner: str  # by total recovery value
 
 
 class LiquidationResponse(BaseModel):
     selected_positions: list[str]
     strategy: list[dict]  # e.g. [{"position": "pos_1", "action": "liquidate", "priority": 1}]
-    estimated_recovery: float
+    estimated_recovery: float  # average recovery score of the selected positions
+    recovery_value: Optional[float] = None  # total recovery value of the selection
     simulation_time: float
+    optimality_gap: Optional[float] = None  # (upper bound - recovery value) / upper bound; 0 = proven optimal
     comparison: Optional[LiquidationComparison] = None
     quantum_metrics: Optional[dict] = None  # positions_evaluated, constraints_checked, solver_ms
 
 
+class PositionBookUpsert(BaseModel):
+    positions: list[PositionToLiquidate] = []  # inserted or replaced by position_id
+    remove: list[str] = []  # position ids to drop (repaid, liquidated)
+
+
+class PositionBookUpsertResponse(BaseModel):
+    upserted: int
+    removed: int
+    total_positions: int
+    update_ms: float
+
+
+class PositionBookQueryResponse(BaseModel):
+    positions: list[PositionToLiquidate]  # worst health factor first
+    total_liquidatable: int
+    query_ms: float
+
+
+class PositionBookSelectRequest(BaseModel):
+    health_threshold: float = 1.0
+    max_gas_per_block: Optional[int] = None
+    available_liquidity: Optional[dict[str, float]] = None
+    time_budget_ms: int = 200
+
+
+class PositionBookSelectResponse(BaseModel):
+    selected_positions: list[str]
+    candidates: int  # liquidatable positions considered
+    recovery_value: float
+    gas_used: int
+    optimality_gap: float
+    method: str  # knapsack method: all / dp / bnb / bnb_timeout
+    query_ms: float
+
+
 # --- Quantum Vision: Yield Infra & Prediction Market ---
 
 
@@ -228,6 +379,11 @@ class PoolCandidate(BaseModel):
 
 class SniperRequest(BaseModel):
     candidates: list[PoolCandidate]
+    select_k: int = 3  # size of the entry set chosen by the top-K QUBO
+    top_k: Optional[int] = None  # return only the K best (quantum score); None = all candidates
+    model: Optional[str] = None  # scoring model for the quantum ranking (default "quantum"); see GET /sniper/models
+    classical_model: Optional[str] = None  # scoring model for the baseline ranking (default "classical")
+    solver: Optional[SolverOptions] = None
 
 
 class SniperRankEntry(BaseModel):
@@ -237,6 +393,7 @@ class SniperRankEntry(BaseModel):
     quantum_score: float
     quantum_rank: int
     fly: bool  # recommended to enter
+    selected: bool = False  # in the top-K entry set chosen by the QUBO
 
 
 class SniperComparison(BaseModel):
@@ -256,10 +413,89 @@ class SniperResponse(BaseModel):
     quantum_metrics: Optional[dict] = None
 
 
+class SniperFeedUpdate(BaseModel):
+    """One incremental update for the continuous sniper feed."""
+    type: Literal["pool", "funding", "wallets", "dev", "remove"]
+    pool_id: str
+    ts: Optional[float] = None  # unix seconds; default = arrival time
+    created_at_sec_ago: Optional[float] = None  # pool: age when first seen (default 0)
+    dev_wallet_active: Optional[bool] = None  # pool / dev
+    amount: Optional[float] = None  # funding: amount added to the bond curve
+    wallet: Optional[str] = None  # funding: buyer, counted towards unique_wallets_ratio
+    unique_wallets: Optional[int] = None  # wallets: aggregated counts from upstream
+    total_buys: Optional[int] = None
+    unique_wallets_ratio: Optional[float] = None  # wallets: ratio directly
+
+
+class SniperFeedUpdateBatch(BaseModel):
+    updates: list[SniperFeedUpdate]
+
+
+class SniperFeedUpdateResponse(BaseModel):
+    applied: int
+    pools: int
+    version: int
+
+
+class SniperFeedEntry(BaseModel):
+    pool_id: str
+    quantum_rank: int
+    quantum_score: float
+    classical_score: float
+    bond_curve_funding_velocity: float
+    unique_wallets_ratio: float
+    created_at_sec_ago: float
+    fly: bool
+
+
+class SniperFeedSnapshot(BaseModel):
+    ranking: list[SniperFeedEntry]
+    pools: int
+    version: int
+
+
 class BatchExitRequest(BaseModel):
-    position_tokens: float = 1000.0
-    max_slippage_pct: float = 5.0
+    position_tokens: float = Field(1000.0, gt=0)
+    max_slippage_pct: float = 5.0  # cap on any single batch's price impact
     gas_per_tx: int = 150_000
+    pool: Optional[PoolInput] = None  # pool to sell into; None = synthetic pool sized from max_slippage_pct
+    pool_address: Optional[str] = None  # or resolve the pool by address from the fetcher
+    token_in: Optional[str] = None  # token being sold; default pool.tokens[0]
+    gas_price_gwei: float = 0.0  # gas cost per tx = gas_per_tx * gas_price * native_token_price
+    native_token_price: float = 0.0  # price of the gas token in the output token
+    recovery: float = Field(0.5, ge=0.0, le=1.0)  # fraction of our price impact arbitraged back between batches
+    max_batches: int = Field(20, ge=1, le=50)  # sweep N = 1..max_batches; the grid is (N, profiles, N)
+    simulate: bool = False  # Monte Carlo over randomized market paths for the best plan of every N
+    paths: int = Field(10_000, ge=1, le=20_000)  # arrays are (max_batches, paths)
+    volatility_pct: float = Field(2.0, ge=0.0, le=50.0)  # per-block std of the external price (log %), moved by other traders
+    drift_pct: float = Field(0.0, ge=-50.0, le=50.0)  # per-block mean log move (negative = net sell pressure)
+    seed: Optional[int] = None
+
+    @field_validator("pool")
+    @classmethod
+    def _two_sided_pool(cls, pool: Optional[PoolInput]) -> Optional[PoolInput]:
+        if pool is not None and (len(pool.tokens) != 2 or len(pool.reserves) != 2 or min(pool.reserves) <= 0):
+            raise ValueError("pool needs two tokens and two positive reserves")
+        return pool
+
+
+class BatchExitSweepEntry(BaseModel):
+    batches: int
+    profile: float  # batch i is proportional to profile**i (1 = equal batches)
+    proceeds: float
+    net_proceeds: float  # proceeds minus gas
+    slippage_pct: float  # vs selling the whole position at the initial mid price
+    max_batch_impact_pct: float
+    feasible: bool  # max_batch_impact_pct <= max_slippage_pct
+
+
+class BatchExitSimulation(BaseModel):
+    batches: int
+    profile: float
+    paths: int
+    mean_net_proceeds: float
+    net_proceeds: dict[str, float]  # percentile -> value, e.g. {"p5": ..., "p50": ..., "p95": ...}
+    slippage_pct: dict[str, float]
 
 
 class BatchExitComparison(BaseModel):
@@ -275,8 +511,10 @@ class BatchExitComparison(BaseModel):
 
 
 class BatchExitResponse(BaseModel):
-    recommended_batches: list[dict]  # e.g. [{"batch": 1, "amount": 200, "slot": 1}, ...]
+    recommended_batches: list[dict]  # e.g. [{"batch": 1, "amount": 200, "slot": 1, "expected_out": 190, "impact_pct": 5.1}, ...]
     comparison: Optional[BatchExitComparison] = None
+    sweep: list[BatchExitSweepEntry] = []  # best profile for every N
+    simulation: list[BatchExitSimulation] = []  # Monte Carlo percentiles per sweep plan (simulate=True)
     simulation_time: float
     quantum_metrics: Optional[dict] = None
 
@@ -285,6 +523,63 @@ class HedgeFinderRequest(BaseModel):
     token_to_hedge: str  # e.g. WIF address or symbol
     pools: list[PoolInput]  # meme + stables
     target_stable: Optional[str] = None  # e.g. USDC; if None, find best path to any stable
+    targets: Optional[list[str]] = None  # candidate exits ranked in one search; default: target_stable or STABLE_TOKENS
+    amount: float = 1000.0  # amount of token_to_hedge actually held
+    max_hops: int = 5
+    risk_weight: float = 0.0  # > 0: rank targets by output * (1 - risk_weight * max(correlation, 0))
+    correlations: Optional[dict[str, float]] = None  # target -> correlation with token_to_hedge; default from price history
+    split_routes: bool = False  # split the exit across several paths
+    max_splits: int = 4
+
+
+class HedgeTarget(BaseModel):
+    target: str
+    path: list[str]
+    expected_output: float
+    correlation: Optional[float] = None  # with token_to_hedge (log returns); None = not enough history
+    risk_adjusted_output: Optional[float] = None
+
+
+class AntiCorrelatedPool(BaseModel):
+    pool: str
+    tokens: list[str]
+    correlation: float  # of the pool's token0 price with the queried token
+    samples: int  # shared snapshots behind the estimate
+
+
+class AntiCorrelationResponse(BaseModel):
+    token: str
+    reference_pool: Optional[str] = None  # pool whose price stands for the token
+    pools: list[AntiCorrelatedPool]
+
+
+class HedgePortfolioRequest(BaseModel):
+    portfolio: dict[str, float]  # token -> amount held
+    pools: list[PoolInput] = []  # empty = the fetcher's current pool snapshot
+    targets: Optional[list[str]] = None  # candidate exits; default STABLE_TOKENS
+    max_hops: int = 5
+    shared_reserves: bool = True  # later exits see the reserves left by earlier ones
+
+
+class HedgePortfolioExit(BaseModel):
+    token: str
+    amount: float
+    target: Optional[str] = None  # None = no route to any target
+    path: list[str]
+    pools: list[str]  # pool address per hop
+    expected_output: float  # after earlier exits (shared_reserves)
+    standalone_output: float  # on the untouched snapshot
+    rerouted: bool  # snapshot route crossed a pool used by an earlier exit
+    order: int  # execution order, largest exit first
+    conflict_group: int  # exits whose snapshot routes share pools
+
+
+class HedgePortfolioResponse(BaseModel):
+    exits: list[HedgePortfolioExit]
+    total_output: float
+    standalone_total: float  # sum of standalone outputs (what independent /hedge-finder calls would promise)
+    simulation_time: float
+    quantum_metrics: Optional[dict] = None
 
 
 class HedgeFinderComparison(BaseModel):
@@ -301,6 +596,10 @@ class HedgeFinderComparison(BaseModel):
 class HedgeFinderResponse(BaseModel):
     optimal_path: list[str]
     expected_output: float
+    target: Optional[str] = None  # stable the optimal path ends in
+    ranked_targets: list[HedgeTarget] = []  # every reachable candidate target, best output first
     comparison: Optional[HedgeFinderComparison] = None
     simulation_time: float
     quantum_metrics: Optional[dict] = None
+    split_allocations: Optional[list[SplitAllocation]] = None
+    split_output: Optional[float] = None
@@ -0,0 +1,101 @@
+"""
+Microbenchmark: per-path Python loop vs vectorized NumPy path evaluation (services/path_eval).
+
+The loop is the pre-vectorization implementation: Python floats read from per-edge dicts, one
+path at a time. On a 400-token / 4000-pool random graph, best of 3 runs on one shared CPU, the
+NumPy pass measured about 5-11x faster at 1k paths, 9-14x at 10k and 10-16x at 100k.
+
+Run from backend/:  python scripts/bench_path_eval.py
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from services.path_eval import evaluate_paths, pack_paths  # noqa: E402
+from services.pool_graph import PoolGraph  # noqa: E402
+
+
+def _random_graph(num_tokens: int, num_pools: int, seed: int = 7) -> PoolGraph:
+    rnd = random.Random(seed)
+    pools = []
+    for i in range(num_pools):
+        a, b = rnd.sample(range(num_tokens), 2)
+        pools.append({
+            "address": f"0x{i:040x}",
+            "tokens": [f"T{a}", f"T{b}"],
+            "reserves": [rnd.uniform(1e4, 1e7), rnd.uniform(1e4, 1e7)],
+            "fee": rnd.choice([30, 100, 300]),
+        })
+    return PoolGraph.from_pools(pools)
+
+
+def _random_paths(graph: PoolGraph, count: int, max_hops: int = 4, seed: int = 11) -> list[list[int]]:
+    rnd = random.Random(seed)
+    paths = []
+    while len(paths) < count:
+        u = rnd.randrange(len(graph.tokens))
+        path = []
+        for _ in range(rnd.randint(1, max_hops)):
+            if not graph.out_edges[u]:
+                break
+            e = rnd.choice(graph.out_edges[u])
+            path.append(e)
+            u = int(graph.edge_dst[e])
+        if path:
+            paths.append(path)
+    return paths
+
+
+def _edge_dicts(graph: PoolGraph) -> list[dict]:
+    """Per-edge attribute dicts of Python floats, as the pre-vectorization networkx edges held them."""
+    return [
+        {"reserve_in": float(r_in), "reserve_out": float(r_out), "fee": float(f)}
+        for r_in, r_out, f in zip(graph.reserve_in.tolist(), graph.reserve_out.tolist(), graph.fee.tolist())
+    ]
+
+
+def _loop(edges: list[dict], paths: list[list[int]], amount: float) -> list[float]:
+    # The pre-vectorization evaluation: hop-by-hop float math on edge dicts, one path at a time.
+    out = []
+    for path in paths:
+        amt = amount
+        for e in path:
+            edge = edges[e]
+            amt = (amt * edge["reserve_out"] * edge["fee"]) / (edge["reserve_in"] + amt * edge["fee"])
+        out.append(amt)
+    return out
+
+
+def _best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    graph = _random_graph(num_tokens=400, num_pools=4000)
+    edges = _edge_dicts(graph)
+    amount = 1000.0
+    sweep = np.linspace(100.0, 100_000.0, 16)
+    print(f"{'paths':>8} {'loop ms':>10} {'numpy ms':>10} {'speedup':>8} {'sweep x16 ms':>13}")
+    for count in (1_000, 10_000, 100_000):
+        paths = _random_paths(graph, count)
+        batch = pack_paths(paths)
+        loop_ms = _best_of(lambda: _loop(edges, paths, amount))
+        vec_ms = _best_of(lambda: evaluate_paths(graph, batch, amount))
+        sweep_ms = _best_of(lambda: evaluate_paths(graph, batch, sweep))
+        assert np.allclose(_loop(edges, paths[:100], amount), evaluate_paths(graph, pack_paths(paths[:100]), amount))
+        print(f"{count:>8} {loop_ms:>10.2f} {vec_ms:>10.2f} {loop_ms / vec_ms:>7.1f}x {sweep_ms:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
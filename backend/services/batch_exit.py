@@ -0,0 +1,177 @@
+"""
+Slippage-aware batch exit over a constant-product pool.
+
+A sell of `a` tokens into reserves (x, y) with fee multiplier f returns a*f*y / (x + a*f); the
+pool then holds (x + a, y - out). Between our batches (one per block) arbitrageurs pull the pool
+back toward the pre-exit price: the price moves a fraction `recovery` of the way back in log
+space along the current curve (x*y constant), so recovery=0 leaves the pool where we pushed it
+and recovery=1 restores the original price.
+
+Plans are N batches with sizes proportional to rho**i (rho=1 is equal batches; rho<1
+front-loads, rho>1 back-loads). Every (N, rho) pair for N = 1..max_batches is simulated in one
+vectorized pass over a (N, rho) grid, batch by batch, and the plan with the best net proceeds
+(output minus N * gas cost) whose largest per-batch price impact stays within the cap wins.
+
+simulate_paths() replays chosen plans over thousands of randomized markets (seeded RNG, the same
+paths for every plan) to give the distribution of proceeds rather than one point estimate.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+PROFILE_RHOS = np.array([0.5, 0.6, 0.7, 0.8, 0.9, 1.0, 1.1, 1.25, 1.5])
+
+
+@dataclass
+class ExitGrid:
+    """Simulated outcomes for every plan on the grid; arrays are (max_batches, len(rhos))."""
+    batches: np.ndarray  # (B,) N values
+    rhos: np.ndarray  # (R,)
+    sizes: np.ndarray  # (B, R, B) per-batch amounts, zero past N
+    proceeds: np.ndarray  # gross output tokens
+    net: np.ndarray  # proceeds - N * gas_cost
+    slippage_pct: np.ndarray  # 1 - proceeds / (position * initial mid price)
+    max_impact_pct: np.ndarray  # worst single-batch execution price vs its pre-trade mid
+    batch_out: np.ndarray  # (B, R, B) per-batch output
+    batch_impact_pct: np.ndarray  # (B, R, B)
+
+
+def plan_sizes(position: float, max_batches: int, rhos: np.ndarray = PROFILE_RHOS) -> np.ndarray:
+    """(B, R, B) batch sizes: row N-1 splits `position` into N parts proportional to rho**i."""
+    n = np.arange(1, max_batches + 1)
+    i = np.arange(max_batches)
+    weights = rhos[None, :, None] ** i[None, None, :] * (i[None, None, :] < n[:, None, None])
+    return position * weights / weights.sum(axis=2, keepdims=True)
+
+
+def recover(x: np.ndarray, y: np.ndarray, p0: float, recovery: float) -> tuple[np.ndarray, np.ndarray]:
+    """Move the price y/x a fraction `recovery` back toward p0 (log space), keeping x*y."""
+    if recovery <= 0:
+        return x, y
+    k = x * y
+    p = y / x
+    target = p * (p0 / p) ** recovery
+    return np.sqrt(k / target), np.sqrt(k * target)
+
+
+def simulate_grid(
+    position: float,
+    reserve_in: float,
+    reserve_out: float,
+    fee: float,
+    gas_cost: float = 0.0,
+    recovery: float = 0.5,
+    max_batches: int = 20,
+    rhos: np.ndarray = PROFILE_RHOS,
+) -> ExitGrid:
+    """Sell `position` into (reserve_in, reserve_out) with fee multiplier `fee`, for every plan on the grid."""
+    max_batches = max(1, max_batches)
+    sizes = plan_sizes(position, max_batches, rhos)
+    shape = sizes.shape[:2]
+    p0 = reserve_out / reserve_in
+    x = np.full(shape, float(reserve_in))
+    y = np.full(shape, float(reserve_out))
+    batch_out = np.zeros_like(sizes)
+    batch_impact = np.zeros_like(sizes)
+    for i in range(max_batches):
+        a = sizes[:, :, i]
+        out = a * fee * y / (x + a * fee)
+        spot = a * y / x
+        batch_out[:, :, i] = out
+        batch_impact[:, :, i] = np.where(spot > 0, 100.0 * (1.0 - out / np.where(spot > 0, spot, 1.0)), 0.0)
+        x, y = recover(x + a, y - out, p0, recovery)
+    n = np.arange(1, max_batches + 1, dtype=np.float64)[:, None]
+    proceeds = batch_out.sum(axis=2)
+    fair = position * p0
+    return ExitGrid(
+        batches=np.arange(1, max_batches + 1),
+        rhos=rhos,
+        sizes=sizes,
+        proceeds=proceeds,
+        net=proceeds - n * gas_cost,
+        slippage_pct=100.0 * (1.0 - proceeds / fair) if fair > 0 else np.zeros(shape),
+        max_impact_pct=batch_impact.max(axis=2),
+        batch_out=batch_out,
+        batch_impact_pct=batch_impact,
+    )
+
+
+def best_plans(grid: ExitGrid, max_impact_pct: float | None = None) -> tuple[np.ndarray, np.ndarray, tuple[int, int]]:
+    """Per N the best profile (index into rhos) and whether it respects the impact cap, plus the
+    overall best (N index, rho index): the best feasible plan, or the best plan if none is feasible."""
+    # Ties (e.g. N=1, where every profile is the same plan) go to the profile closest to equal batches.
+    pref = np.argsort(np.abs(np.log(grid.rhos)), kind="stable")
+    net = grid.net[:, pref]
+    feasible = grid.max_impact_pct[:, pref] <= max_impact_pct if max_impact_pct is not None else np.ones_like(net, dtype=bool)
+    scored = np.where(feasible, net, -np.inf)
+    per_n = np.where(feasible.any(axis=1), np.argmax(scored, axis=1), np.argmax(net, axis=1))
+    per_n_ok = feasible[np.arange(len(per_n)), per_n]
+    target = scored if feasible.any() else net
+    bi, br = np.unravel_index(int(np.argmax(target)), target.shape)
+    return pref[per_n], per_n_ok, (int(bi), int(pref[br]))
+
+
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+@dataclass
+class ExitPaths:
+    """Monte Carlo outcomes per plan; arrays are (plans, paths)."""
+    proceeds: np.ndarray
+    net: np.ndarray
+    slippage_pct: np.ndarray
+
+
+def simulate_paths(
+    sizes: np.ndarray,
+    reserve_in: float,
+    reserve_out: float,
+    fee: float,
+    gas_cost: float = 0.0,
+    recovery: float = 0.5,
+    volatility: float = 0.02,
+    drift: float = 0.0,
+    paths: int = 10_000,
+    seed: int | None = None,
+) -> ExitPaths:
+    """Run every plan in `sizes` (plans, batches) over the same `paths` randomized markets.
+
+    Before each batch the external price takes a log step drift + volatility * Z (other traders
+    move the pool with it), and the pool's displacement from that price left by our previous
+    batch shrinks by `recovery`. With volatility = drift = 0 this reproduces simulate_grid()."""
+    sizes = np.atleast_2d(np.asarray(sizes, dtype=np.float64))
+    plans, batches = sizes.shape
+    rng = np.random.default_rng(seed)
+    steps = drift + volatility * rng.standard_normal((batches, paths))  # shared by all plans
+    k = np.full((plans, paths), float(reserve_in) * float(reserve_out))
+    log_market = np.zeros(paths)  # log(market price / initial mid)
+    displacement = np.zeros((plans, paths))  # log(pool price / market price)
+    p0 = reserve_out / reserve_in
+    proceeds = np.zeros((plans, paths))
+    for i in range(batches):
+        log_market += steps[i]
+        rows = np.flatnonzero(sizes[:, i] > 0)  # plans that still have a batch in this slot
+        if not len(rows):
+            continue
+        a = sizes[rows, i : i + 1]
+        kr = k[rows]
+        price = p0 * np.exp(log_market + displacement[rows] * (1.0 - recovery if i else 1.0))
+        x, y = np.sqrt(kr / price), np.sqrt(kr * price)
+        out = a * fee * y / (x + a * fee)
+        proceeds[rows] += out
+        x, y = x + a, y - out
+        k[rows] = x * y
+        displacement[rows] = np.log(y / x / p0) - log_market
+    n = np.count_nonzero(sizes, axis=1).astype(np.float64)[:, None]
+    fair = sizes.sum(axis=1, keepdims=True) * p0
+    return ExitPaths(
+        proceeds=proceeds,
+        net=proceeds - n * gas_cost,
+        slippage_pct=100.0 * (1.0 - proceeds / np.where(fair > 0, fair, 1.0)),
+    )
+
+
+def percentiles(values: np.ndarray, levels=PERCENTILES) -> np.ndarray:
+    """(plans, len(levels)) percentiles along the path axis."""
+    return np.percentile(values, levels, axis=1).T
@@ -0,0 +1,179 @@
+"""
+Graph-coloring engine for the transaction scheduler.
+
+Colors are execution slots: adjacent orders in the ConflictGraph never share a slot. Works on
+neighbor sets, so every strategy is O((n + m) log n) or better instead of scanning dense rows.
+
+Strategies:
+- first_fit: index order (the original behavior, depends on input order)
+- largest_first: highest degree first (Welsh-Powell)
+- dsatur: most distinct neighbor colors first, ties by degree (Brelaz); usually fewest slots
+- pipelined: list scheduling over a DependencyDAG in arrival order; each order takes the first
+  slot (with capacity) after its strict predecessors and not before its same-slot ones
+
+Slots can be capacity-bounded (max orders and/or max gas per slot, like a block gas limit).
+improve_coloring() runs iterated greedy (Culberson) under a time budget: recoloring first-fit in
+an order grouped by the current color classes never needs more slots, and permuting the class
+order regularly frees one. Capacity is respected throughout.
+"""
+
+import heapq
+import random
+import time
+from dataclasses import dataclass
+
+from services.conflict_graph import ConflictGraph, DependencyDAG
+
+STRATEGIES = ("first_fit", "largest_first", "dsatur")
+_DEFAULT_ORDER_GAS = 150_000
+
+
+def order_gas(order) -> int:
+    return getattr(order, "gas_estimate", None) or _DEFAULT_ORDER_GAS
+
+
+@dataclass
+class SlotCapacity:
+    max_orders: int | None = None
+    max_gas: int | None = None
+
+
+@dataclass
+class Coloring:
+    colors: list[int]  # slot index per order
+    num_slots: int
+    strategy: str
+    ms: float
+
+
+class _Slots:
+    """Per-slot load tracking for capacity checks."""
+
+    def __init__(self, gas: list[int], capacity: SlotCapacity | None):
+        self.gas = gas
+        self.capacity = capacity or SlotCapacity()
+        self.count: list[int] = []
+        self.load: list[int] = []
+
+    def fits(self, c: int, u: int) -> bool:
+        if c >= len(self.count):
+            return True
+        cap = self.capacity
+        if cap.max_orders is not None and self.count[c] >= cap.max_orders:
+            return False
+        # An order heavier than the limit on its own still gets an (empty) slot of its own.
+        if cap.max_gas is not None and self.count[c] and self.load[c] + self.gas[u] > cap.max_gas:
+            return False
+        return True
+
+    def place(self, c: int, u: int) -> None:
+        while c >= len(self.count):
+            self.count.append(0)
+            self.load.append(0)
+        self.count[c] += 1
+        self.load[c] += self.gas[u]
+
+
+def _first_free(used: set[int], slots: _Slots, u: int) -> int:
+    c = 0
+    while c in used or not slots.fits(c, u):
+        c += 1
+    return c
+
+
+def _greedy(graph: ConflictGraph, order, gas: list[int], capacity: SlotCapacity | None) -> list[int]:
+    colors = [-1] * graph.n
+    slots = _Slots(gas, capacity)
+    for u in order:
+        used = {colors[v] for v in graph.adj[u] if colors[v] != -1}
+        c = _first_free(used, slots, u)
+        colors[u] = c
+        slots.place(c, u)
+    return colors
+
+
+def _dsatur(graph: ConflictGraph, gas: list[int], capacity: SlotCapacity | None) -> list[int]:
+    n = graph.n
+    colors = [-1] * n
+    neighbor_colors: list[set[int]] = [set() for _ in range(n)]
+    slots = _Slots(gas, capacity)
+    heap = [(0, -graph.degree(u), u) for u in range(n)]
+    heapq.heapify(heap)
+    while heap:
+        neg_sat, _, u = heapq.heappop(heap)
+        if colors[u] != -1 or -neg_sat != len(neighbor_colors[u]):
+            continue  # stale entry
+        c = _first_free(neighbor_colors[u], slots, u)
+        colors[u] = c
+        slots.place(c, u)
+        for v in graph.adj[u]:
+            if colors[v] == -1 and c not in neighbor_colors[v]:
+                neighbor_colors[v].add(c)
+                heapq.heappush(heap, (-len(neighbor_colors[v]), -graph.degree(v), v))
+    return colors
+
+
+def color_graph(graph: ConflictGraph, strategy: str = "dsatur", gas: list[int] | None = None, capacity: SlotCapacity | None = None) -> Coloring:
+    """Color the conflict graph with one strategy."""
+    t0 = time.perf_counter()
+    gas = gas or [0] * graph.n
+    if strategy == "first_fit":
+        colors = _greedy(graph, range(graph.n), gas, capacity)
+    elif strategy == "largest_first":
+        colors = _greedy(graph, sorted(range(graph.n), key=lambda u: -graph.degree(u)), gas, capacity)
+    elif strategy == "dsatur":
+        colors = _dsatur(graph, gas, capacity)
+    else:
+        raise ValueError(f"unknown coloring strategy {strategy!r}, expected one of {', '.join(STRATEGIES)}")
+    return Coloring(colors, max(colors, default=-1) + 1, strategy, (time.perf_counter() - t0) * 1000)
+
+
+def improve_coloring(
+    graph: ConflictGraph,
+    start: Coloring,
+    time_budget_ms: int,
+    gas: list[int] | None = None,
+    capacity: SlotCapacity | None = None,
+    seed: int | None = None,
+) -> Coloring:
+    """Iterated greedy: re-run first-fit over color classes in permuted order until the budget runs out."""
+    t0 = time.perf_counter()
+    deadline = t0 + time_budget_ms / 1000
+    gas = gas or [0] * graph.n
+    rng = random.Random(seed)
+    best = start.colors
+    best_k = start.num_slots
+    current = best
+    step = 0
+    while best_k > 1 and time.perf_counter() < deadline:
+        classes: list[list[int]] = [[] for _ in range(max(current) + 1)]
+        for u, c in enumerate(current):
+            classes[c].append(u)
+        # Alternate reverse, largest-class-first and random class orders (Culberson's mix).
+        if step % 3 == 0:
+            classes.reverse()
+        elif step % 3 == 1:
+            classes.sort(key=len, reverse=True)
+        else:
+            rng.shuffle(classes)
+        current = _greedy(graph, [u for cls in classes for u in cls], gas, capacity)
+        k = max(current) + 1
+        if k < best_k:
+            best, best_k = current, k
+        step += 1
+    return Coloring(best, best_k, f"{start.strategy}+iterated_greedy", start.ms + (time.perf_counter() - t0) * 1000)
+
+
+def pipeline_schedule(dag: DependencyDAG, gas: list[int] | None = None, capacity: SlotCapacity | None = None) -> Coloring:
+    """Earliest slot per order that respects the DAG (strict -> later slot, WAR -> same slot or later)."""
+    t0 = time.perf_counter()
+    gas = gas or [0] * dag.n
+    slots = _Slots(gas, capacity)
+    colors = [0] * dag.n
+    for j in range(dag.n):
+        c = max((colors[i] + 1 if strict else colors[i] for i, strict in dag.preds[j].items()), default=0)
+        while not slots.fits(c, j):
+            c += 1
+        colors[j] = c
+        slots.place(c, j)
+    return Coloring(colors, max(colors, default=-1) + 1, "pipelined", (time.perf_counter() - t0) * 1000)
@@ -0,0 +1,149 @@
+"""
+Sparse conflict graph for the transaction scheduler.
+
+Two pending orders conflict when they touch the same state key and at least one writes it.
+Instead of intersecting the key sets of every pair (O(n^2) set allocations), an inverted index key -> orders is built in
+one pass and only orders sharing a key are linked, so construction is O(total keys + edges).
+Adjacency is kept as per-order neighbor sets; CSR arrays, an edge list or the dense matrix
+(for the frontend heatmap) are derived on demand.
+
+With hazards="rw" reads count too: read-after-write, write-after-read and write-after-write
+all conflict. DependencyDAG keeps the direction instead (arrival order is program order), so a
+pipelined schedule can put a write-after-read pair in the same slot: reads see the state at the
+start of their slot.
+"""
+
+import numpy as np
+
+
+def _keys(order, field: str) -> set[str]:
+    return set(getattr(order, field, None) or [])
+
+
+class ConflictGraph:
+    """Undirected conflict graph over orders 0..n-1."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.adj: list[set[int]] = [set() for _ in range(n)]
+        self.num_edges = 0
+
+    def add_edge(self, i: int, j: int) -> None:
+        if i != j and j not in self.adj[i]:
+            self.adj[i].add(j)
+            self.adj[j].add(i)
+            self.num_edges += 1
+
+    @classmethod
+    def from_orders(cls, orders: list, hazards: str = "rw") -> "ConflictGraph":
+        """hazards="ww": only shared writes conflict; "rw": read-write, write-read and write-write."""
+        graph = cls(len(orders))
+        writers: dict[str, list[int]] = {}
+        readers: dict[str, list[int]] = {}
+        for i, o in enumerate(orders):
+            writes, reads = _keys(o, "writes"), _keys(o, "reads") if hazards == "rw" else set()
+            for key in writes:
+                for j in writers.get(key, ()):
+                    graph.add_edge(j, i)
+                for j in readers.get(key, ()):
+                    graph.add_edge(j, i)
+            for key in reads - writes:
+                for j in writers.get(key, ()):
+                    graph.add_edge(j, i)
+            for key in writes:
+                writers.setdefault(key, []).append(i)
+            for key in reads - writes:
+                readers.setdefault(key, []).append(i)
+        return graph
+
+    @classmethod
+    def from_matrix(cls, matrix: list[list[int]]) -> "ConflictGraph":
+        graph = cls(len(matrix))
+        for i, row in enumerate(matrix):
+            for j in range(i + 1, min(len(row), graph.n)):
+                if row[j]:
+                    graph.add_edge(i, j)
+        return graph
+
+    def degree(self, i: int) -> int:
+        return len(self.adj[i])
+
+    def edge_list(self) -> list[list[int]]:
+        """Each conflicting pair once, as [i, j] with i < j."""
+        return [[i, j] for i in range(self.n) for j in sorted(self.adj[i]) if i < j]
+
+    def to_csr(self) -> tuple[np.ndarray, np.ndarray]:
+        """(indptr, indices): neighbors of i are indices[indptr[i]:indptr[i + 1]], sorted."""
+        indptr = np.zeros(self.n + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(a) for a in self.adj])
+        indices = np.fromiter((j for a in self.adj for j in sorted(a)), dtype=np.int64, count=int(indptr[-1]))
+        return indptr, indices
+
+    def to_matrix(self) -> list[list[int]]:
+        M = [[0] * self.n for _ in range(self.n)]
+        for i, neighbors in enumerate(self.adj):
+            row = M[i]
+            for j in neighbors:
+                row[j] = 1
+        return M
+
+
+class DependencyDAG:
+    """Ordered dependencies between orders 0..n-1 (i < j always).
+
+    preds[j][i] is True when j must run in a strictly later slot than i (read-after-write,
+    write-after-write) and False when the same slot is enough (write-after-read). Only the last
+    writer and the readers since the last write are linked per key; older accesses are already
+    ordered before those, so the DAG stays O(total keys accessed).
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self.preds: list[dict[int, bool]] = [{} for _ in range(n)]
+        self.hazards = {"raw": 0, "war": 0, "waw": 0}
+
+    def _link(self, i: int, j: int, strict: bool, kind: str) -> None:
+        if i == j:
+            return
+        preds = self.preds[j]
+        if i not in preds:
+            self.hazards[kind] += 1
+        preds[i] = preds.get(i, False) or strict
+
+    @classmethod
+    def from_orders(cls, orders: list, hazards: str = "rw") -> "DependencyDAG":
+        dag = cls(len(orders))
+        last_writer: dict[str, int] = {}
+        readers: dict[str, list[int]] = {}
+        for j, o in enumerate(orders):
+            writes, reads = _keys(o, "writes"), _keys(o, "reads") if hazards == "rw" else set()
+            for key in reads - writes:
+                if key in last_writer:
+                    dag._link(last_writer[key], j, True, "raw")
+            for key in writes:
+                if key in last_writer:
+                    dag._link(last_writer[key], j, True, "waw")
+                for i in readers.pop(key, ()):
+                    dag._link(i, j, False, "war")
+                last_writer[key] = j
+            for key in reads - writes:
+                readers.setdefault(key, []).append(j)
+        return dag
+
+    @classmethod
+    def from_graph(cls, graph: ConflictGraph) -> "DependencyDAG":
+        """Orient an undirected conflict graph by index; every edge is strict."""
+        dag = cls(graph.n)
+        for j in range(graph.n):
+            for i in graph.adj[j]:
+                if i < j:
+                    dag._link(i, j, True, "waw")
+        return dag
+
+    @property
+    def num_edges(self) -> int:
+        return sum(len(p) for p in self.preds)
+
+    def edge_list(self) -> list[list[int]]:
+        """[i, j, strict] per dependency, strict as 0/1."""
+        return [[i, j, int(strict)] for j, preds in enumerate(self.preds) for i, strict in sorted(preds.items())]
@@ -0,0 +1,246 @@
+"""
+Negative-cycle arbitrage scanner over the whole pool graph.
+
+Each directed pool edge gets weight -log(fee * r_out / r_in) (its marginal rate at zero size),
+so a profitable loop is a negative cycle. A hop-bounded Bellman-Ford runs for a batch of start
+tokens at once: one (sources x tokens) distance matrix relaxed across all edges per hop with
+NumPy. Closed walks are split into simple cycles, deduplicated by rotation and ranked by
+marginal rate. Only the best walk per (start token, hop count) is kept, so the tracked set is
+the strongest cycles through each token rather than every profitable cycle.
+
+The scanner is incremental: after a pool refresh only cycles that touch changed pools are
+re-priced, and only tokens of changed pools are re-scanned (any new cycle must pass through a
+changed pool). Scans run under a time budget; unfinished start tokens carry over to the next run.
+The scanner is shared by the refresh loop and /cycles workers, so refresh() and multi-step reads
+hold its lock; it is always given a read-only graph snapshot.
+"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from core.config import settings
+from services.path_eval import compose_paths, optimal_inputs, pack_paths
+from services.pool_graph import PoolGraph
+
+_SOURCE_CHUNK = 64
+_MIN_LOG_GAIN = 1e-9
+
+
+@dataclass
+class ArbitrageCycle:
+    edges: tuple[int, ...]  # canonical rotation: smallest edge index first
+    log_gain: float  # log of the marginal rate product; > 0 means profitable
+    pools: frozenset = field(default_factory=frozenset)
+
+    @property
+    def marginal_rate(self) -> float:
+        return math.exp(self.log_gain)
+
+
+def _edge_weights(graph: PoolGraph) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = np.where(graph.reserve_in > 0, graph.fee * graph.reserve_out / graph.reserve_in, 0.0)
+        return np.where(rate > 0, -np.log(rate), np.inf)
+
+
+def _canonical(edges: list[int]) -> tuple[int, ...]:
+    i = edges.index(min(edges))
+    return tuple(edges[i:] + edges[:i])
+
+
+def _split_walk(graph: PoolGraph, walk: list[int]) -> list[list[int]]:
+    """Split a closed walk (edge list) into simple cycles."""
+    cycles = []
+    stack: list[int] = []
+    position = {int(graph.edge_src[walk[0]]): 0}
+    for e in walk:
+        stack.append(e)
+        v = int(graph.edge_dst[e])
+        if v in position:
+            start = position[v]
+            cycle = stack[start:]
+            del stack[start:]
+            for c in cycle:
+                position.pop(int(graph.edge_dst[c]), None)
+            position[v] = start
+            if len(cycle) >= 2:
+                cycles.append(cycle)
+        else:
+            position[v] = len(stack)
+    return cycles
+
+
+class CycleScanner:
+    """Keeps the current set of profitable cycles for one PoolGraph, updated incrementally."""
+
+    def __init__(self, max_hops: int | None = None, budget_ms: int | None = None):
+        self.max_hops = max_hops or settings.CYCLE_SCAN_MAX_HOPS
+        self.budget_ms = budget_ms if budget_ms is not None else settings.CYCLE_SCAN_BUDGET_MS
+        self.cycles: dict[tuple[int, ...], ArbitrageCycle] = {}
+        self._pool_cycles: dict[int, set[tuple[int, ...]]] = {}
+        self._pending: list[int] = []
+        self._topology_version = -1
+        self.graph_version = -1
+        self.last_scan_ms = 0.0
+        self.last_sources_scanned = 0
+        self.last_scanned_at: float | None = None
+        self.lock = threading.RLock()
+
+    @property
+    def complete(self) -> bool:
+        return not self._pending
+
+    def refresh(self, graph: PoolGraph, changed_pools: list[int] | None = None, budget_ms: int | None = None) -> None:
+        """Re-price cycles touched by `changed_pools` and scan their tokens for new ones.
+        A topology change (or changed_pools=None) triggers a full rescan."""
+        with self.lock:
+            self._refresh(graph, changed_pools, budget_ms)
+
+    def _refresh(self, graph: PoolGraph, changed_pools: list[int] | None, budget_ms: int | None) -> None:
+        t0 = time.perf_counter()
+        budget = self.budget_ms if budget_ms is None else budget_ms
+        weights = _edge_weights(graph)
+        if changed_pools is None or graph.topology_version != self._topology_version:
+            self.cycles.clear()
+            self._pool_cycles.clear()
+            self._pending = list(range(len(graph.tokens)))
+            self._topology_version = graph.topology_version
+        else:
+            self._reprice(weights, changed_pools)
+            sources = {int(graph.edge_src[2 * i]) for i in changed_pools} | {int(graph.edge_dst[2 * i]) for i in changed_pools}
+            self._pending = sorted(sources.union(self._pending))
+
+        scanned = 0
+        while self._pending:
+            chunk, self._pending = self._pending[:_SOURCE_CHUNK], self._pending[_SOURCE_CHUNK:]
+            for walk in self._scan_sources(graph, weights, np.asarray(chunk, dtype=np.int64)):
+                for cycle in _split_walk(graph, walk):
+                    self._add(graph, weights, cycle)
+            scanned += len(chunk)
+            if (time.perf_counter() - t0) * 1000 >= budget:
+                break
+
+        self.graph_version = graph.version
+        self.last_sources_scanned = scanned
+        self.last_scan_ms = (time.perf_counter() - t0) * 1000
+        self.last_scanned_at = time.time()
+
+    def _reprice(self, weights: np.ndarray, changed_pools: list[int]) -> None:
+        touched: set[tuple[int, ...]] = set()
+        for i in changed_pools:
+            touched |= self._pool_cycles.get(i, set())
+        for key in touched:
+            gain = -float(weights[list(key)].sum())
+            if gain > _MIN_LOG_GAIN:
+                self.cycles[key].log_gain = gain
+            else:
+                self._remove(key)
+
+    def _add(self, graph: PoolGraph, weights: np.ndarray, cycle: list[int]) -> None:
+        key = _canonical(cycle)
+        gain = -float(weights[list(key)].sum())
+        if gain <= _MIN_LOG_GAIN or key in self.cycles:
+            return
+        pools = frozenset(e // 2 for e in key)
+        if len(pools) < len(key):
+            return  # reuses a pool (e.g. A->B->A through one pool): never profitable in practice
+        self.cycles[key] = ArbitrageCycle(edges=key, log_gain=gain, pools=pools)
+        for p in pools:
+            self._pool_cycles.setdefault(p, set()).add(key)
+
+    def _remove(self, key: tuple[int, ...]) -> None:
+        cycle = self.cycles.pop(key, None)
+        if cycle is None:
+            return
+        for p in cycle.pools:
+            keys = self._pool_cycles.get(p)
+            if keys:
+                keys.discard(key)
+
+    def _scan_sources(self, graph: PoolGraph, weights: np.ndarray, sources: np.ndarray) -> list[list[int]]:
+        """Hop-bounded Bellman-Ford from every source in the batch; returns closed negative walks."""
+        n_tokens, n_edges = len(graph.tokens), graph.num_edges
+        if n_edges == 0 or len(sources) == 0:
+            return []
+        src_e, dst_e = graph.edge_src, graph.edge_dst
+        order = np.argsort(dst_e, kind="stable")
+        dst_sorted = dst_e[order]
+        starts = np.flatnonzero(np.r_[True, dst_sorted[1:] != dst_sorted[:-1]])
+        in_nodes = dst_sorted[starts]
+        rows = np.arange(len(sources))
+
+        dist = np.full((len(sources), n_tokens), np.inf)
+        dist[rows, sources] = 0.0
+        preds: list[np.ndarray] = []
+        walks = []
+        for hop in range(1, self.max_hops + 1):
+            cand = dist[:, src_e] + weights  # (S, E)
+            new = np.full_like(dist, np.inf)
+            new[:, in_nodes] = np.minimum.reduceat(cand[:, order], starts, axis=1)
+            pred = np.full(dist.shape, -1, dtype=np.int64)
+            hit_rows, hit_edges = np.nonzero(np.isfinite(cand) & (cand == new[:, dst_e]))
+            pred[hit_rows, dst_e[hit_edges]] = hit_edges
+            preds.append(pred)
+            if hop >= 2:
+                for r in np.flatnonzero(new[rows, sources] < -_MIN_LOG_GAIN):
+                    walks.append(self._walk_back(graph, preds, int(r), int(sources[r])))
+            dist = new
+        return walks
+
+    @staticmethod
+    def _walk_back(graph: PoolGraph, preds: list[np.ndarray], row: int, source: int) -> list[int]:
+        walk = []
+        node = source
+        for pred in reversed(preds):
+            e = int(pred[row, node])
+            walk.append(e)
+            node = int(graph.edge_src[e])
+        walk.reverse()
+        return walk
+
+    def top(self, graph: PoolGraph, k: int) -> list[dict]:
+        """Top-k cycles by marginal rate, with closed-form optimal size and profit (in the start token)."""
+        with self.lock:
+            ranked = sorted(self.cycles.values(), key=lambda c: -c.log_gain)[:k]
+        if not ranked:
+            return []
+        batch = pack_paths([list(c.edges) for c in ranked])
+        A, C = compose_paths(graph, batch)
+        amounts_in, _, profits = optimal_inputs(A, C, 1.0)
+        return [
+            {
+                "path": graph.path_tokens(list(c.edges)),
+                "pools": [graph.edge_pool_address(e) for e in c.edges],
+                "marginal_rate": c.marginal_rate,
+                "optimal_amount_in": float(amounts_in[i]),
+                "expected_profit": float(profits[i]),
+            }
+            for i, c in enumerate(ranked)
+        ]
+
+
+@dataclass
+class CycleRefresh:
+    """Arguments of one CycleScanner.refresh() dispatched through the solver executor."""
+    graph: PoolGraph  # read-only snapshot
+    changed_pools: list[int] | None
+    budget_ms: int | None = None
+
+
+async def refresh_cycles(job: CycleRefresh) -> None:
+    """Executor entry for the refresh loop; run with kind="thread" (the scanner is process-local)."""
+    get_cycle_scanner().refresh(job.graph, job.changed_pools, job.budget_ms)
+
+
+_scanner: CycleScanner | None = None
+
+
+def get_cycle_scanner() -> CycleScanner:
+    global _scanner
+    if _scanner is None:
+        _scanner = CycleScanner()
+    return _scanner
@@ -0,0 +1,146 @@
+"""
+Off-event-loop execution of CPU-bound solvers.
+
+The solve_* coroutines are pure CPU work. Routers dispatch them through SolverExecutor, which
+runs them in a process pool (default) or thread pool sized from Settings, so a heavy arbitrage
+or scheduler request no longer stalls /api/health and the other I/O endpoints. Each endpoint
+has its own concurrency limit; queue depth and wait/run times are tracked per endpoint.
+
+Solvers that depend on process-local state (the live pool graph, the cycle scanner, ...) must be
+dispatched with kind="thread" so they see the same objects as the event loop. Such state is only
+mutated on the event loop; workers get read-only snapshots (PoolGraph.frozen_copy) or hold the
+object's lock (CycleScanner.lock).
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+
+from core.config import settings
+
+
+def _invoke(solve, req):
+    """Worker-side entry: run the solver coroutine to completion. Returns (start wall time, result)."""
+    started = time.time()
+    return started, asyncio.run(solve(req))
+
+
+@dataclass
+class EndpointStats:
+    limit: int
+    waiting: int = 0
+    in_flight: int = 0
+    completed: int = 0
+    failed: int = 0
+    total_wait_ms: float = 0.0
+    max_wait_ms: float = 0.0
+    total_run_ms: float = 0.0
+
+    def as_dict(self) -> dict:
+        done = max(self.completed + self.failed, 1)
+        return {
+            "limit": self.limit,
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_ms": round(self.total_wait_ms / done, 2),
+            "max_wait_ms": round(self.max_wait_ms, 2),
+            "avg_run_ms": round(self.total_run_ms / done, 2),
+        }
+
+
+class SolverExecutor:
+    def __init__(self, mode: str | None = None):
+        self.mode = (mode or settings.SOLVER_EXECUTOR).lower()
+        self.process_workers = settings.SOLVER_PROCESS_WORKERS or os.cpu_count() or 1
+        self.thread_workers = settings.SOLVER_THREAD_WORKERS
+        self._process_pool: ProcessPoolExecutor | None = None
+        self._thread_pool: ThreadPoolExecutor | None = None
+        self._limits = settings.solver_concurrency_limits
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._stats: dict[str, EndpointStats] = {}
+
+    def _pool(self, kind: str) -> Executor | None:
+        if kind == "inline":
+            return None
+        if kind == "process":
+            if self._process_pool is None:
+                self._process_pool = ProcessPoolExecutor(max_workers=self.process_workers)
+            return self._process_pool
+        if self._thread_pool is None:
+            self._thread_pool = ThreadPoolExecutor(max_workers=self.thread_workers, thread_name_prefix="solver")
+        return self._thread_pool
+
+    def _endpoint(self, name: str) -> tuple[asyncio.Semaphore, EndpointStats]:
+        if name not in self._semaphores:
+            limit = self._limits.get(name, settings.SOLVER_DEFAULT_CONCURRENCY)
+            self._semaphores[name] = asyncio.Semaphore(limit)
+            self._stats[name] = EndpointStats(limit=limit)
+        return self._semaphores[name], self._stats[name]
+
+    async def run(self, name: str, solve, req, kind: str | None = None):
+        """Run `await solve(req)` off the event loop under the endpoint's concurrency limit.
+        kind overrides the configured mode ("process", "thread" or "inline")."""
+        kind = kind or self.mode
+        if kind == "process" and self.mode != "process":
+            kind = self.mode  # never spin up processes when the deployment disabled them
+        semaphore, stats = self._endpoint(name)
+        arrived = time.time()
+        stats.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            stats.waiting -= 1
+        stats.in_flight += 1
+        started = time.time()
+        try:
+            pool = self._pool(kind)
+            if pool is None:
+                result = await solve(req)
+            else:
+                started, result = await asyncio.get_running_loop().run_in_executor(pool, _invoke, solve, req)
+            stats.completed += 1
+            return result
+        except Exception:
+            stats.failed += 1
+            raise
+        finally:
+            wait_ms = max((started - arrived) * 1000, 0.0)
+            stats.in_flight -= 1
+            stats.total_wait_ms += wait_ms
+            stats.max_wait_ms = max(stats.max_wait_ms, wait_ms)
+            stats.total_run_ms += (time.time() - started) * 1000
+            semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "process_workers": self.process_workers if self.mode == "process" else 0,
+            "thread_workers": self.thread_workers,
+            "endpoints": {name: s.as_dict() for name, s in sorted(self._stats.items())},
+        }
+
+    def shutdown(self) -> None:
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+            self._thread_pool = None
+
+
+_executor: SolverExecutor | None = None
+
+
+def get_solver_executor() -> SolverExecutor:
+    global _executor
+    if _executor is None:
+        _executor = SolverExecutor()
+    return _executor
+
+
+async def run_solver(name: str, solve, req, kind: str | None = None):
+    return await get_solver_executor().run(name, solve, req, kind=kind)
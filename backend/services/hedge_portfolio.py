@@ -0,0 +1,170 @@
+"""
+Portfolio-wide hedge: exit routes for many held tokens against one pool snapshot.
+
+1. route: every token gets its best exit into the target set on the untouched snapshot
+   (one-to-many search, services/path_engine). Tokens are independent here, so they are split
+   into chunks and routed in parallel through the solver executor (worker processes by default);
+   each chunk builds the graph once.
+2. settle: exits are replayed largest first on a private copy of the snapshot, each swap leaving
+   its reserves behind. A token whose snapshot route touches a pool that an earlier exit already
+   moved is re-routed on the current reserves; the others keep their route. Tokens whose routes
+   share pools form conflict groups (union-find over pool addresses), reported per exit.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+
+from models.quantum import HedgePortfolioExit, HedgePortfolioRequest, HedgePortfolioResponse
+from services.executor import get_solver_executor, run_solver
+from services.path_engine import best_output_paths, hedge_targets
+from services.pool_graph import PoolGraph, graph_for_pools
+
+
+@dataclass
+class _RouteChunk:
+    pools: list[dict]
+    exits: list[tuple[str, float]]  # (token, amount)
+    targets: list[str] | None
+    max_hops: int
+
+
+@dataclass
+class _Route:
+    token: str
+    amount: float
+    target: str | None
+    path: list[str]
+    pools: list[str]  # pool address per hop
+    edges: list[int]  # same pool list => same edge indices in every process
+    output: float
+
+
+def _best_exit(graph: PoolGraph, token: str, amount: float, targets: list[str] | None, max_hops: int) -> _Route:
+    best_by_target, _ = best_output_paths(graph, token, hedge_targets(graph, token, targets), amount, max_hops=max_hops)
+    if not best_by_target:
+        return _Route(token, amount, None, [token], [], [], 0.0)
+    target, best = max(best_by_target.items(), key=lambda kv: kv[1].amount_out)
+    return _Route(
+        token, amount, target,
+        graph.path_tokens(best.edges),
+        [graph.edge_pool_address(e) for e in best.edges],
+        best.edges,
+        best.amount_out,
+    )
+
+
+async def route_chunk(chunk: _RouteChunk) -> list[_Route]:
+    """Worker side of step 1: snapshot routes for a slice of the portfolio."""
+    graph = graph_for_pools(chunk.pools)
+    return [_best_exit(graph, token, amount, chunk.targets, chunk.max_hops) for token, amount in chunk.exits]
+
+
+def _conflict_groups(routes: list[_Route]) -> list[int]:
+    """Group id per route: routes sharing any pool (transitively) share a group."""
+    parent = list(range(len(routes)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    owner: dict[str, int] = {}
+    for i, r in enumerate(routes):
+        for address in r.pools:
+            j = owner.setdefault(address, i)
+            parent[find(i)] = find(j)
+    roots: dict[int, int] = {}
+    return [roots.setdefault(find(i), len(roots)) for i in range(len(routes))]
+
+
+@dataclass
+class _SettleTask:
+    pools: list[dict]
+    routes: list[_Route]
+    targets: list[str] | None
+    max_hops: int
+
+
+async def settle(task: _SettleTask) -> tuple[list[tuple[_Route, bool]], int]:
+    """Step 2: replay exits largest first on shared reserves. Returns ([(route, rerouted)] in
+    execution order, swaps executed)."""
+    routes, targets, max_hops = task.routes, task.targets, task.max_hops
+    graph = PoolGraph.from_pools(task.pools)  # private copy: reserves are consumed below
+    touched: set[str] = set()
+    settled = []
+    swaps = 0
+    for route in sorted(routes, key=lambda r: -r.output):
+        rerouted = bool(touched.intersection(route.pools))
+        if rerouted:
+            route = _best_exit(graph, route.token, route.amount, targets, max_hops)
+        amount = route.amount
+        for e in route.edges:
+            amount = graph.apply_swap(e, amount)
+            swaps += 1
+        if route.edges:
+            route.output = amount
+        touched.update(route.pools)
+        settled.append((route, rerouted))
+    return settled, swaps
+
+
+async def solve_hedge_portfolio(req: HedgePortfolioRequest, pools: list[dict]) -> HedgePortfolioResponse:
+    """Route every held token in parallel chunks, then settle them on shared reserves."""
+    t0 = time.perf_counter()
+    exits = [(token, float(amount)) for token, amount in req.portfolio.items() if amount > 0]
+    executor = get_solver_executor()
+    workers = executor.process_workers if executor.mode == "process" else executor.thread_workers
+    n_chunks = max(1, min(len(exits), workers))
+    chunks = [
+        _RouteChunk(pools, exits[i::n_chunks], req.targets, req.max_hops)
+        for i in range(n_chunks)
+    ]
+    t_r = time.perf_counter()
+    results = await asyncio.gather(*(run_solver("hedge-portfolio", route_chunk, c) for c in chunks))
+    routes = [r for chunk_routes in results for r in chunk_routes]
+    route_ms = (time.perf_counter() - t_r) * 1000
+    standalone = {r.token: r.output for r in routes}
+    groups = dict(zip((r.token for r in routes), _conflict_groups(routes)))
+
+    t_s = time.perf_counter()
+    if req.shared_reserves:
+        settled, swaps = await run_solver("hedge-portfolio", settle, _SettleTask(pools, routes, req.targets, req.max_hops))
+    else:
+        settled, swaps = [(r, False) for r in sorted(routes, key=lambda r: -r.output)], 0
+    settle_ms = (time.perf_counter() - t_s) * 1000
+
+    out = [
+        HedgePortfolioExit(
+            token=r.token,
+            amount=r.amount,
+            target=r.target,
+            path=r.path,
+            pools=r.pools,
+            expected_output=round(r.output, 6),
+            standalone_output=round(standalone[r.token], 6),
+            rerouted=rerouted,
+            order=i + 1,
+            conflict_group=groups[r.token],
+        )
+        for i, (r, rerouted) in enumerate(settled)
+    ]
+    total = sum(e.expected_output for e in out)
+    standalone_total = sum(standalone.values())
+    return HedgePortfolioResponse(
+        exits=out,
+        total_output=round(total, 6),
+        standalone_total=round(standalone_total, 6),
+        simulation_time=round((time.perf_counter() - t0) * 1000, 2),
+        quantum_metrics={
+            "tokens": len(exits),
+            "chunks": n_chunks,
+            "route_ms": round(route_ms, 2),
+            "settle_ms": round(settle_ms, 2),
+            "conflict_groups": len(set(groups.values())),
+            "rerouted": sum(1 for e in out if e.rerouted),
+            "swaps": swaps,
+            "shared_reserve_cost": round(standalone_total - total, 6),
+        },
+    )
@@ -0,0 +1,230 @@
+"""
+Multi-dimensional 0/1 knapsack for liquidation selection.
+
+maximize sum v_i x_i  s.t.  sum_i W[d, i] x_i <= cap[d]  for every dimension d (gas, one per debt token)
+
+- dp: exact dynamic program when there is one dimension with integer weights (gas only). Weights
+  and capacity are divided by their gcd, so a block gas limit of 30M with 150k-granular estimates
+  is a table of a few hundred cells per item.
+- bnb: depth-first branch and bound for everything else. Lagrangian multipliers (subgradient
+  descent on the dual) collapse the dimensions into one surrogate constraint; items are ordered by
+  value per unit of surrogate weight and the bound at a node is the fractional optimum of that
+  constraint over the undecided items, found with a prefix-sum binary search. The search starts
+  from the greedy fill and stops at the time budget, returning the incumbent.
+
+The reported gap is (upper bound - value) / upper bound: 0 when the search finished, otherwise
+the root bound (the Lagrangian dual, i.e. the LP relaxation, or a tighter single-dimension LP).
+"""
+
+import math
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+_DP_MAX_CELLS = 20_000_000
+_CHECK_EVERY = 2048
+
+
+@dataclass
+class KnapsackResult:
+    selected: list[int]  # item indices
+    value: float
+    upper_bound: float
+    gap: float
+    method: str  # "dp", "bnb", "bnb_timeout", "all" (nothing binds)
+    nodes: int
+    ms: float
+
+
+def _fractional_bound(values: np.ndarray, weights: np.ndarray, capacity: float) -> float:
+    """LP optimum of a single-constraint knapsack (items with zero weight are free)."""
+    free = weights <= 0
+    bound = float(values[free].sum())
+    v, w = values[~free], weights[~free]
+    order = np.argsort(-v / w)
+    cum_w = np.cumsum(w[order])
+    cum_v = np.cumsum(v[order])
+    k = int(np.searchsorted(cum_w, capacity, side="right"))
+    bound += float(cum_v[k - 1]) if k > 0 else 0.0
+    if k < len(order):
+        used = float(cum_w[k - 1]) if k > 0 else 0.0
+        bound += float(v[order[k]]) * (capacity - used) / float(w[order[k]])
+    return bound
+
+
+def _lagrangian_bound(values: np.ndarray, W: np.ndarray, cap: np.ndarray, lower: float, iterations: int = 300) -> tuple[float, np.ndarray]:
+    """min over lambda >= 0 of lambda.cap + sum_i max(0, v_i - lambda.W_i), by Polyak subgradient steps.
+    Every lambda gives a valid upper bound; at the optimum it equals the LP relaxation.
+    Returns (bound, lambda) with lambda in units of normalized weights W / cap."""
+    Wn = W / cap[:, None]
+    m = len(cap)
+    lam = np.full(m, float(values.sum()) / max(float(Wn.sum()), 1e-12))
+    best, best_lam = float(values.sum()), np.zeros(m)
+    scale, stall = 2.0, 0
+    for _ in range(iterations):
+        reduced = values - lam @ Wn
+        take = reduced > 0
+        ub = float(lam.sum() + reduced[take].sum())
+        if ub < best - 1e-12:
+            best, best_lam, stall = ub, lam.copy(), 0
+        else:
+            stall += 1
+            if stall >= 20:
+                scale, stall = scale / 2, 0
+        g = 1.0 - Wn[:, take].sum(axis=1)
+        norm = float(g @ g)
+        if norm < 1e-18 or scale < 1e-6:
+            break
+        lam = np.maximum(0.0, lam - scale * (ub - lower) / norm * g)
+    return best, best_lam
+
+
+def _dp(values: np.ndarray, weights: np.ndarray, capacity: int) -> tuple[list[int], float]:
+    n = len(values)
+    best = np.zeros(capacity + 1)
+    take = np.zeros((n, capacity + 1), dtype=bool)
+    for i in range(n):
+        w = int(weights[i])
+        if w > capacity:
+            continue
+        cand = np.full(capacity + 1, -np.inf)
+        cand[w:] = best[: capacity + 1 - w] + values[i]
+        better = cand > best
+        take[i] = better
+        best = np.where(better, cand, best)
+    c = int(np.argmax(best))
+    value = float(best[c])
+    selected = []
+    for i in range(n - 1, -1, -1):
+        if take[i, c]:
+            selected.append(i)
+            c -= int(weights[i])
+    selected.reverse()
+    return selected, value
+
+
+def _bnb(values: np.ndarray, W: np.ndarray, cap: np.ndarray, multipliers: np.ndarray, deadline: float) -> tuple[list[int], float, int, bool]:
+    """Returns (selected, value, nodes, finished). The surrogate constraint is multipliers . (W / cap) <= sum(multipliers)."""
+    n = len(values)
+    surrogate = multipliers @ (W / cap[:, None])
+    eff = np.where(surrogate > 0, values / np.maximum(surrogate, 1e-300), np.inf)
+    order = np.argsort(-eff, kind="stable")
+    v = values[order]
+    Wo = W[:, order]
+    s = surrogate[order]
+    cum_s = np.concatenate([[0.0], np.cumsum(s)])
+    cum_v = np.concatenate([[0.0], np.cumsum(v)])
+    s_cap = float(multipliers.sum())  # surrogate capacity: sum_d multipliers[d] * cap[d] / cap[d]
+
+    def bound(k: int, used_s: float) -> float:
+        # Fractional fill of items k.. under the remaining surrogate capacity.
+        room = s_cap - used_s
+        t = int(np.searchsorted(cum_s, cum_s[k] + room, side="right")) - 1
+        t = max(t, k)
+        b = cum_v[t] - cum_v[k]
+        if t < n and s[t] > 0:
+            b += v[t] * (room - (cum_s[t] - cum_s[k])) / s[t]
+        return float(b)
+
+    # Greedy incumbent in the same order.
+    load = np.zeros(len(cap))
+    greedy = []
+    for i in range(n):
+        if np.all(load + Wo[:, i] <= cap):
+            load += Wo[:, i]
+            greedy.append(i)
+    best_value = float(v[greedy].sum()) if greedy else 0.0
+    best_set = list(greedy)
+
+    # Iterative DFS: stack of (item index, value, load, surrogate used, chosen).
+    stack = [(0, 0.0, np.zeros(len(cap)), 0.0, [])]
+    nodes = 0
+    finished = True
+    while stack:
+        k, val, ld, used_s, chosen = stack.pop()
+        nodes += 1
+        if nodes % _CHECK_EVERY == 0 and time.perf_counter() > deadline:
+            finished = False
+            break
+        if val > best_value:
+            best_value, best_set = val, chosen
+        if k == n or val + bound(k, used_s) <= best_value + 1e-12:
+            continue
+        # Exclude branch first on the stack so the include branch is explored first.
+        stack.append((k + 1, val, ld, used_s, chosen))
+        new_load = ld + Wo[:, k]
+        if np.all(new_load <= cap):
+            stack.append((k + 1, val + v[k], new_load, used_s + s[k], chosen + [k]))
+    return sorted(int(order[i]) for i in best_set), best_value, nodes, finished
+
+
+def _greedy_value(values: np.ndarray, W: np.ndarray, cap: np.ndarray) -> float:
+    surrogate = (W / cap[:, None]).sum(axis=0)
+    load = np.zeros(len(cap))
+    total = 0.0
+    for i in np.argsort(-values / np.maximum(surrogate, 1e-300)):
+        if np.all(load + W[:, i] <= cap):
+            load += W[:, i]
+            total += float(values[i])
+    return total
+
+
+def solve_knapsack(values, weights, capacities, time_budget_ms: float = 200.0) -> KnapsackResult:
+    """values: (n,); weights: (m, n); capacities: (m,). Items that cannot fit alone are never selected."""
+    t0 = time.perf_counter()
+    v = np.asarray(values, dtype=np.float64)
+    cap = np.asarray(capacities, dtype=np.float64)
+    W = np.asarray(weights, dtype=np.float64).reshape(len(cap), len(v))
+    n = len(v)
+
+    eligible = np.flatnonzero((v > 0) & np.all(W <= cap[:, None], axis=0)) if n else np.zeros(0, dtype=np.int64)
+    ve, We = v[eligible], W[:, eligible]
+    binding = cap > 0  # a zero capacity already excluded every item that uses it
+    We, cap = We[binding], cap[binding]
+    if len(cap) == 0 or np.all(We.sum(axis=1) <= cap):
+        return KnapsackResult(eligible.tolist(), float(ve.sum()), float(ve.sum()), 0.0, "all", 0, (time.perf_counter() - t0) * 1000)
+
+    upper = min(_fractional_bound(ve, We[d], float(cap[d])) for d in range(len(cap)))
+
+    method, nodes = "dp", 0
+    integral = len(cap) == 1 and np.all(We == np.round(We)) and cap[0] == round(cap[0])
+    if integral:
+        g = math.gcd(*(int(w) for w in We[0]), int(cap[0])) or 1
+        cells = (int(cap[0]) // g + 1) * len(ve)
+        integral = cells <= _DP_MAX_CELLS
+    if integral:
+        picked, value = _dp(ve, (We[0] // g).astype(np.int64), int(cap[0]) // g)
+        upper = value
+    else:
+        lagrangian, multipliers = _lagrangian_bound(ve, We, cap, _greedy_value(ve, We, cap))
+        upper = min(upper, lagrangian)
+        if not multipliers.any():
+            multipliers = np.ones(len(cap))
+        picked, value, nodes, finished = _bnb(ve, We, cap, multipliers, t0 + time_budget_ms / 1000)
+        method = "bnb" if finished else "bnb_timeout"
+        if finished:
+            upper = value
+    gap = max(0.0, (upper - value) / upper) if upper > 0 else 0.0
+    return KnapsackResult(
+        selected=sorted(int(eligible[i]) for i in picked),
+        value=float(value),
+        upper_bound=float(upper),
+        gap=float(gap),
+        method=method,
+        nodes=nodes,
+        ms=(time.perf_counter() - t0) * 1000,
+    )
+
+
+@dataclass
+class KnapsackProblem:
+    """A solve_knapsack() call packaged for the solver executor (inputs are plain arrays)."""
+    values: np.ndarray
+    weights: np.ndarray
+    capacities: list[float]
+    time_budget_ms: float = 200.0
+
+
+async def solve_knapsack_problem(problem: KnapsackProblem) -> KnapsackResult:
+    return solve_knapsack(problem.values, problem.weights, problem.capacities, problem.time_budget_ms)
@@ -2,16 +2,19 @@
 MemeQubit: Quantum Sniper, Batch Exit, Hedge Finder.
 
 - Sniper: rank new Pump.fun pools by entry score. Classical = sequential rules; Quantum = QUBO weighted sum.
-- Batch Exit: split sell into N batches. Classical = 1 tx (high slippage); Quantum = QUBO scheduling.
-- Hedge Finder: find best path from held token to stable/hedge. Classical = 2-hop greedy; Quantum = full path.
+- Batch Exit: split sell into N batches. Classical = 1 tx (high slippage); Quantum = best N and batch
+  sizes on the pool's constant-product curve (services/batch_exit).
+- Hedge Finder: best exit from held token into each candidate stable, ranked. Classical = 2-hop greedy
+  per target; Quantum = one-to-many full path search.
 """
 
 import time
 from typing import Optional
 
+import numpy as np
+
 from models.quantum import (
     PoolInput,
-    PoolCandidate,
     SniperRequest,
     SniperResponse,
     SniperRankEntry,
@@ -19,103 +22,85 @@ from models.quantum import (
     BatchExitRequest,
     BatchExitResponse,
     BatchExitComparison,
+    BatchExitSimulation,
+    BatchExitSweepEntry,
     HedgeFinderRequest,
     HedgeFinderResponse,
     HedgeFinderComparison,
+    HedgeTarget,
 )
+from services.batch_exit import PERCENTILES, best_plans, percentiles, simulate_grid, simulate_paths
+from services.path_engine import best_output_paths, hedge_targets
+from services.pool_graph import graph_for_pools
 from services.quantum_simulator import (
     _arbitrage_classical_baseline,
-    _arbitrage_qubo_classical,
+    _split_allocations,
 )
+from services.qubo_solver import solve_qubo, top_k_qubo
+from services.scoring_models import get_scoring_models
+from services.sniper_scoring import rank_order, ranks, to_columns, top_k
+from services.split_router import split_route
 
+_SNIPER_QUBO_MAX_VARS = 64
 
-# --- Sniper: entry timing ---
-
-def _classical_sniper_score(c: PoolCandidate) -> float:
-    """Classical: sequential rules. Score 0..100. Fly if velocity > 0.5 and uniqueness > 0.3."""
-    score = 0.0
-    if c.bond_curve_funding_velocity > 0.5:
-        score += 40
-    elif c.bond_curve_funding_velocity > 0.2:
-        score += 20
-    if c.unique_wallets_ratio > 0.5:
-        score += 35
-    elif c.unique_wallets_ratio > 0.3:
-        score += 15
-    if c.created_at_sec_ago < 120:  # fresh
-        score += 15
-    if not c.dev_wallet_active:
-        score += 10  # dev not dumping
-    return min(100.0, score)
-
-
-def _quantum_sniper_score(c: PoolCandidate) -> float:
-    """Quantum: weighted QUBO-style sum. All factors evaluated simultaneously."""
-    w_vel, w_uniq, w_fresh, w_dev = 0.35, 0.35, 0.2, 0.1
-    v_norm = min(1.0, c.bond_curve_funding_velocity / 1.0)
-    u_norm = c.unique_wallets_ratio
-    fresh_norm = max(0, 1.0 - c.created_at_sec_ago / 300)  # decay over 5 min
-    dev_penalty = 0.0 if not c.dev_wallet_active else -0.3
-    return 100.0 * (w_vel * v_norm + w_uniq * u_norm + w_fresh * fresh_norm + w_dev + 0.1)
 
+# --- Sniper: entry timing ---
 
 async def solve_sniper(req: SniperRequest) -> SniperResponse:
-    """Rank pools: classical (rule-based) vs quantum (QUBO weighted)."""
+    """Rank pools: classical (rule-based) vs quantum (QUBO weighted). Scores are computed column-wise."""
     t0 = time.perf_counter()
     candidates = req.candidates
     if not candidates:
         return SniperResponse(ranking=[], comparison=None, simulation_time=0.0)
+    models = get_scoring_models()
+    classical_model = models.get(req.classical_model or "classical")
+    quantum_model = models.get(req.model or "quantum")
+    cols = to_columns(candidates)
+    n = len(cols)
+    limit = n if req.top_k is None else max(0, min(req.top_k, n))
 
     # Classical: rule-based scores and sort
     t_c = time.perf_counter()
-    classical_scores = [(c.pool_id, _classical_sniper_score(c)) for c in candidates]
-    classical_scores.sort(key=lambda x: -x[1])
-    classical_ranking = [x[0] for x in classical_scores]
+    cl_scores = classical_model.evaluate(cols)
+    cl_order = rank_order(cl_scores)
     classical_time_ms = (time.perf_counter() - t_c) * 1000
 
-    # Quantum: QUBO-style weighted scores (simulate annealing read)
+    # Quantum: QUBO-style weighted scores, then a top-K QUBO picks the entry set
     t_q = time.perf_counter()
-    try:
-        import dimod
-        import neal
-        # Minimal QUBO for demo: binary vars for "include in top set"
-        n = min(10, len(candidates))
-        bqm = dimod.AdjVectorBQM(dimod.BINARY)
-        for i in range(n):
-            bqm.linear[i] = -0.1 * (i + 1)  # prefer lower index
-        sampler = neal.SimulatedAnnealingSampler()
-        _ = sampler.sample(bqm, num_reads=50)
-    except Exception:
-        pass
-    quantum_scores = [(c.pool_id, _quantum_sniper_score(c)) for c in candidates]
-    quantum_scores.sort(key=lambda x: -x[1])
-    quantum_ranking = [x[0] for x in quantum_scores]
+    q_scores = quantum_model.evaluate(cols)
+    k = max(0, min(req.select_k, n, _SNIPER_QUBO_MAX_VARS))
+    # Only the strongest few candidates can make the set; keep the QUBO small.
+    qubo_pool = min(n, max(4 * k, k + 8), _SNIPER_QUBO_MAX_VARS) if k else 0
+    q_order = rank_order(q_scores) if limit == n else top_k(q_scores, max(limit, qubo_pool))
+    selected_idx: set[int] = set()
+    qubo = None
+    if k:
+        pool = q_order[:qubo_pool]
+        qubo = solve_qubo(*top_k_qubo(q_scores[pool], k), options=req.solver)
+        selected_idx = {int(pool[i]) for i in np.flatnonzero(qubo.sample > 0.5)}
+    q_order = q_order[:limit]
     quantum_time_ms = (time.perf_counter() - t_q) * 1000
 
-    # Build ranking table (pool_id -> classical rank, quantum rank, scores)
-    rank_entries: list[SniperRankEntry] = []
-    by_id = {c.pool_id: c for c in candidates}
-    for i, pid in enumerate(quantum_ranking):
-        c = by_id[pid]
-        cl_rank = classical_ranking.index(pid) + 1
-        q_rank = i + 1
-        cl_sc = _classical_sniper_score(c)
-        q_sc = _quantum_sniper_score(c)
-        fly = q_sc >= 50.0  # recommend fly if quantum score >= 50
-        rank_entries.append(SniperRankEntry(
-            pool_id=pid,
-            classical_score=round(cl_sc, 2),
-            classical_rank=cl_rank,
-            quantum_score=round(q_sc, 2),
+    # Build ranking table (quantum order; ranks from argsort, no per-candidate lookups)
+    cl_rank = ranks(cl_order)
+    rank_entries = [
+        SniperRankEntry(
+            pool_id=cols.pool_ids[i],
+            classical_score=round(float(cl_scores[i]), 2),
+            classical_rank=int(cl_rank[i]),
+            quantum_score=round(float(q_scores[i]), 2),
             quantum_rank=q_rank,
-            fly=fly,
-        ))
+            fly=bool(q_scores[i] >= quantum_model.fly_threshold),  # recommend fly (default: quantum score >= 50)
+            selected=i in selected_idx,
+        )
+        for q_rank, i in enumerate(q_order.tolist(), start=1)
+    ]
 
     # Winner: which ranking is "better" (we use correlation with ideal: lower rank = better; compare top-1)
     winner = "quantum" if quantum_time_ms < classical_time_ms * 2 else "classical"
     comparison = SniperComparison(
-        classical_ranking=classical_ranking,
-        quantum_ranking=quantum_ranking,
+        classical_ranking=[cols.pool_ids[i] for i in cl_order[:limit].tolist()],
+        quantum_ranking=[cols.pool_ids[i] for i in q_order.tolist()],
         classical_time_ms=round(classical_time_ms, 2),
         quantum_time_ms=round(quantum_time_ms, 2),
         factors_classical=3,
@@ -127,49 +112,121 @@ async def solve_sniper(req: SniperRequest) -> SniperResponse:
         ranking=rank_entries,
         comparison=comparison,
         simulation_time=round(sim_time, 2),
-        quantum_metrics={"candidates": len(candidates), "solver_ms": round(quantum_time_ms, 2)},
+        quantum_metrics={
+            "candidates": n,
+            "returned": len(rank_entries),
+            "solver_ms": round(quantum_time_ms, 2),
+            "selected": len(selected_idx),
+            **(qubo.metrics() if qubo else {}),
+        },
     )
 
 
 # --- Batch Exit: split sell into batches ---
 
+def _exit_pool(req: BatchExitRequest) -> tuple[float, float, float, str | None]:
+    """(reserve_in, reserve_out, fee multiplier, pool address) for the token being sold.
+    Without a pool, a synthetic one where a single dump moves the price by the classical
+    assumption (2x max_slippage_pct, capped at 15%)."""
+    pool = req.pool
+    if pool is None:
+        impact = min(req.max_slippage_pct * 2, 15.0) / 100
+        depth = req.position_tokens * (1 - impact) / impact if impact > 0 else 1e18
+        return depth, depth, 1.0, None
+    side = 1 if req.token_in is not None and req.token_in == pool.tokens[1] else 0
+    return float(pool.reserves[side]), float(pool.reserves[1 - side]), 1 - pool.fee / 10000, pool.address
+
+
 async def solve_batch_exit(req: BatchExitRequest) -> BatchExitResponse:
-    """Classical = 1 tx (high slippage); Quantum = N batches to reduce slippage."""
+    """Classical = 1 tx (high slippage); Quantum = N batches sized to maximize net proceeds on the pool's curve."""
     t0 = time.perf_counter()
     position = req.position_tokens
-    max_slip = req.max_slippage_pct
     gas_per_tx = req.gas_per_tx
+    reserve_in, reserve_out, fee, address = _exit_pool(req)
+    gas_cost = gas_per_tx * req.gas_price_gwei * 1e-9 * req.native_token_price
 
-    # Classical: single transaction → assume linear slippage model (e.g. 2% per 200 tokens)
-    classical_txs = 1
-    classical_slippage = min(max_slip * 2, 15.0)  # single dump often 2x max_slip or cap 15%
-    classical_gas = gas_per_tx
+    grid = simulate_grid(
+        position, reserve_in, reserve_out, fee,
+        gas_cost=gas_cost,
+        recovery=req.recovery,
+        max_batches=req.max_batches,
+    )
+    per_n, per_n_ok, (bi, br) = best_plans(grid, req.max_slippage_pct)
+    sweep = [
+        BatchExitSweepEntry(
+            batches=int(grid.batches[i]),
+            profile=float(grid.rhos[r]),
+            proceeds=round(float(grid.proceeds[i, r]), 6),
+            net_proceeds=round(float(grid.net[i, r]), 6),
+            slippage_pct=round(float(grid.slippage_pct[i, r]), 4),
+            max_batch_impact_pct=round(float(grid.max_impact_pct[i, r]), 4),
+            feasible=bool(per_n_ok[i]),
+        )
+        for i, r in enumerate(per_n.tolist())
+    ]
 
-    # Quantum: N batches (QUBO-like: minimize total slippage subject to N)
-    # Simple model: 5 batches of equal size → slippage per batch ~ 1/5 of single-tx impact
-    n_batches = 5
-    per_batch = position / n_batches
-    # Slippage scales sub-linearly with size (e.g. sqrt)
-    import math
-    single_impact = classical_slippage
-    batch_impact = single_impact * math.sqrt(per_batch / position) if position else 0
-    quantum_slippage = round(batch_impact * n_batches * 0.6, 2)  # 0.6 = empirical factor
-    quantum_gas = n_batches * gas_per_tx
+    simulation: list[BatchExitSimulation] = []
+    mc_metrics = {}
+    if req.simulate:
+        t_mc = time.perf_counter()
+        rows = np.arange(len(per_n))
+        paths = req.paths
+        mc = simulate_paths(
+            grid.sizes[rows, per_n], reserve_in, reserve_out, fee,
+            gas_cost=gas_cost,
+            recovery=req.recovery,
+            volatility=req.volatility_pct / 100,
+            drift=req.drift_pct / 100,
+            paths=paths,
+            seed=req.seed,
+        )
+        net_pct, slip_pct = percentiles(mc.net), percentiles(mc.slippage_pct)
+        keys = [f"p{q}" for q in PERCENTILES]
+        simulation = [
+            BatchExitSimulation(
+                batches=int(grid.batches[i]),
+                profile=float(grid.rhos[r]),
+                paths=paths,
+                mean_net_proceeds=round(float(mc.net[i].mean()), 6),
+                net_proceeds={key: round(float(v), 6) for key, v in zip(keys, net_pct[i])},
+                slippage_pct={key: round(float(v), 4) for key, v in zip(keys, slip_pct[i])},
+            )
+            for i, r in enumerate(per_n.tolist())
+        ]
+        mc_metrics = {
+            "mc_paths": paths,
+            "mc_ms": round((time.perf_counter() - t_mc) * 1000, 2),
+            "mc_best_median_batches": int(grid.batches[int(np.argmax(net_pct[:, PERCENTILES.index(50)]))]),
+            "mc_best_p5_batches": int(grid.batches[int(np.argmax(net_pct[:, 0]))]),
+        }
+
+    # Classical: single transaction = N=1 on the same curve
+    classical = sweep[0]
+    n_batches = int(grid.batches[bi])
     recommended_batches = [
-        {"batch": i + 1, "amount": round(per_batch, 2), "slot": i + 1}
+        {
+            "batch": i + 1,
+            "amount": round(float(grid.sizes[bi, br, i]), 6),
+            "slot": i + 1,  # one batch per block
+            "expected_out": round(float(grid.batch_out[bi, br, i]), 6),
+            "impact_pct": round(float(grid.batch_impact_pct[bi, br, i]), 4),
+        }
         for i in range(n_batches)
     ]
-
+    classical_slippage = classical.slippage_pct
+    quantum_slippage = float(grid.slippage_pct[bi, br])
+    classical_gas = gas_per_tx
+    quantum_gas = n_batches * gas_per_tx
     slippage_reduction = round((classical_slippage - quantum_slippage) / max(classical_slippage, 0.01) * 100, 2)
     gas_increase = round((quantum_gas - classical_gas) / max(classical_gas, 1) * 100, 2)
-    winner = "quantum" if quantum_slippage < classical_slippage * 0.8 else "classical"
+    winner = "quantum" if float(grid.net[bi, br]) > classical.net_proceeds else "classical"
 
     comparison = BatchExitComparison(
-        classical_txs=classical_txs,
+        classical_txs=1,
         classical_est_slippage_pct=round(classical_slippage, 2),
         classical_est_gas=classical_gas,
         quantum_batches=n_batches,
-        quantum_est_slippage_pct=quantum_slippage,
+        quantum_est_slippage_pct=round(quantum_slippage, 2),
         quantum_est_gas=quantum_gas,
         slippage_reduction_pct=slippage_reduction,
         gas_increase_pct=gas_increase,
@@ -179,52 +236,68 @@ async def solve_batch_exit(req: BatchExitRequest) -> BatchExitResponse:
     return BatchExitResponse(
         recommended_batches=recommended_batches,
         comparison=comparison,
+        sweep=sweep,
+        simulation=simulation,
         simulation_time=round(sim_time, 2),
-        quantum_metrics={"batches": n_batches, "position": position},
+        quantum_metrics={
+            "batches": n_batches,
+            "position": position,
+            "profile": float(grid.rhos[br]),
+            "classical_net_proceeds": round(classical.net_proceeds, 6),
+            "quantum_net_proceeds": round(float(grid.net[bi, br]), 6),
+            "gas_cost_per_tx": gas_cost,
+            "plans_evaluated": int(grid.net.size),
+            "synthetic_pool": address is None,
+            **mc_metrics,
+        },
     )
 
 
 # --- Hedge Finder: best path from token to stable ---
 
 async def solve_hedge_finder(req: HedgeFinderRequest) -> HedgeFinderResponse:
-    """Find best path from token_to_hedge to stable. Classical = 2-hop; Quantum = full path."""
+    """Best exit from token_to_hedge into each candidate stable, ranked. Classical = 2-hop per target;
+    Quantum = one full-path search that resolves every target at once."""
     t0 = time.perf_counter()
     token_hold = req.token_to_hedge
-    pools = [p.model_dump() for p in req.pools]
-    target = req.target_stable
-
-    # Build token set; if target not set, pick first token that looks like stable (e.g. USDC in list)
-    tokens_in_pools = set()
-    for p in pools:
-        tokens_in_pools.add(p["tokens"][0])
-        tokens_in_pools.add(p["tokens"][1])
-    if token_hold not in tokens_in_pools:
-        tokens_in_pools.add(token_hold)
-    if target and target not in tokens_in_pools:
-        tokens_in_pools.add(target)
-    if not target and pools:
-        # Default: use first pool's second token as "stable" for demo
-        target = list(tokens_in_pools - {token_hold})[0] if len(tokens_in_pools) > 1 else list(tokens_in_pools)[0]
-
-    # Classical: 2-hop only
+    amount = req.amount
+    graph = graph_for_pools([p.model_dump() for p in req.pools])
+    targets = hedge_targets(graph, token_hold, req.targets, req.target_stable)
+
+    # Classical: 2-hop only, one search per target
     t_c = time.perf_counter()
-    classical_path, _, classical_out = _arbitrage_classical_baseline(
-        pools, token_hold, target, 1000.0
-    )
+    classical_path, classical_out = [token_hold], 0.0
+    for target in targets:
+        path, _, out, _ = _arbitrage_classical_baseline(graph, token_hold, target, amount)
+        if out > classical_out:
+            classical_path, classical_out = path, out
     classical_time_ms = (time.perf_counter() - t_c) * 1000
 
-    # Quantum: full path search
+    # Quantum: one-to-many full path search
     t_q = time.perf_counter()
-    path, _, quantum_out = _arbitrage_qubo_classical(
-        pools, token_hold, target, 1000.0
-    )
+    best_by_target, search = best_output_paths(graph, token_hold, targets, amount, max_hops=req.max_hops)
+    correlations = req.correlations or {}
+    risk_weight = max(req.risk_weight, 0.0)
+
+    def risk_adjusted(target: str, out: float) -> float:
+        return out * (1 - risk_weight * max(correlations.get(target, 0.0), 0.0))
+
+    ranked = sorted(best_by_target.items(), key=lambda kv: -risk_adjusted(kv[0], kv[1].amount_out))
     quantum_time_ms = (time.perf_counter() - t_q) * 1000
+    if ranked:
+        target, best = ranked[0]
+        path, quantum_out = graph.path_tokens(best.edges), best.amount_out
+    else:
+        target = req.target_stable or (targets[0] if targets else None)
+        path, quantum_out = [token_hold, target] if target else [token_hold], 0.0
 
     improvement_pct = 0.0
     if classical_out > 0:
         improvement_pct = round((quantum_out - classical_out) / classical_out * 100, 2)
     winner = "quantum" if quantum_out >= classical_out else "classical"
 
+    route = split_route(graph, token_hold, target, amount, max_splits=req.max_splits) if req.split_routes and target else None
+
     comparison = HedgeFinderComparison(
         classical_path=classical_path,
         classical_output=round(classical_out, 2),
@@ -239,7 +312,26 @@ async def solve_hedge_finder(req: HedgeFinderRequest) -> HedgeFinderResponse:
     return HedgeFinderResponse(
         optimal_path=path,
         expected_output=round(quantum_out, 2),
+        target=target,
+        ranked_targets=[
+            HedgeTarget(
+                target=t,
+                path=graph.path_tokens(p.edges),
+                expected_output=round(p.amount_out, 6),
+                correlation=correlations.get(t),
+                risk_adjusted_output=round(risk_adjusted(t, p.amount_out), 6) if risk_weight else None,
+            )
+            for t, p in ranked
+        ],
         comparison=comparison,
         simulation_time=round(sim_time, 2),
-        quantum_metrics={"paths_evaluated": 1, "solver_ms": round(quantum_time_ms, 2)},
+        quantum_metrics={
+            "paths_evaluated": search.paths_completed,
+            "states_expanded": search.states_expanded,
+            "solver_ms": round(quantum_time_ms, 2),
+            "targets": len(targets),
+            "targets_reached": len(ranked),
+        },
+        split_allocations=_split_allocations(graph, route) if req.split_routes and route else None,
+        split_output=(round(route.amount_out, 2) if route else 0.0) if req.split_routes else None,
     )
@@ -1,29 +1,26 @@
 """
 MemeQubit chain data fetcher.
-Fetches DEX pool data and caches in Redis. Falls back to demo data if RPC unavailable.
+Fetches DEX pool data and caches in Redis. Pools come from factory enumeration
+(services/pool_discovery) when POOL_FACTORY_ADDRESS is set; falls back to demo data otherwise or
+if the RPC is unavailable.
+Chain calls go through the shared async JSON-RPC client (services/rpc_client), so RPC latency
+never blocks the event loop.
 """
 
+import asyncio
+import time
 from typing import Any
 
 from core.config import settings
+from services.pool_discovery import get_pool_discovery
+from services.rpc_client import RpcError, get_rpc_client
 
-# Optional: web3 and redis. Graceful fallback if not configured.
-_w3 = None
+# Optional: redis. Graceful fallback if not configured.
 _redis = None
 
 
-def _get_web3():
-    global _w3
-    if _w3 is None:
-        try:
-            from web3 import Web3
-            _w3 = Web3(Web3.HTTPProvider(settings.MEMEQUBIT_RPC_URL))
-        except Exception:
-            _w3 = False
-    return _w3 if _w3 else None
-
-
-async def _get_redis():
+async def get_redis():
+    """Shared async Redis client, or None when redis is not installed or REDIS_URL is unreachable."""
     global _redis
     if _redis is None:
         try:
@@ -73,15 +70,20 @@ TOKEN_LINK = "0x514910771AF9Ca656af840dff83E8264EcF986CA"
 class MemeQubitDataFetcher:
     def __init__(self):
         self._pools_cache: list[dict] | None = None
-        self._network_checked = False
         self._connected = False
         self._block_number: int | None = None
-        self._chain_id: int | None = None
+        self._chain_id: int | None = None  # never changes for an RPC URL: read once
+        self._stats: dict | None = None
+        self._stats_at = 0.0
+        self._stats_lock = asyncio.Lock()
 
     async def get_network_stats(self) -> dict:
-        """Check connection to MemeQubit RPC and return block/chain info."""
-        w3 = _get_web3()
-        if not w3:
+        """Check connection to MemeQubit RPC and return block/chain info.
+
+        Block number and gas price are cached for NETWORK_STATS_TTL_SECONDS and read together
+        (with chain id, the first time) in one JSON-RPC batch; concurrent callers wait for that
+        one refresh instead of each hitting the RPC."""
+        if not settings.MEMEQUBIT_RPC_URL:
             return {
                 "block_number": None,
                 "chain_id": None,
@@ -89,14 +91,28 @@ class MemeQubitDataFetcher:
                 "message": "MemeQubit RPC not configured or unavailable. Using demo data.",
                 "gas_price": None,
             }
+        if self._stats is not None and time.monotonic() - self._stats_at < settings.NETWORK_STATS_TTL_SECONDS:
+            return self._stats
+        async with self._stats_lock:
+            if self._stats is not None and time.monotonic() - self._stats_at < settings.NETWORK_STATS_TTL_SECONDS:
+                return self._stats
+            self._stats = await self._fetch_network_stats()
+            self._stats_at = time.monotonic()
+            return self._stats
+
+    async def _fetch_network_stats(self) -> dict:
+        calls = [("eth_blockNumber", []), ("eth_gasPrice", [])]
+        if self._chain_id is None:
+            calls.append(("eth_chainId", []))
         try:
-            self._block_number = w3.eth.block_number
-            self._chain_id = w3.eth.chain_id
-            gas_price = 0
-            try:
-                gas_price = w3.eth.gas_price or 0
-            except Exception:
-                pass
+            results = await get_rpc_client().batch(calls)
+            for r in (results[0], *results[2:]):  # gas price may fail on its own
+                if isinstance(r, RpcError):
+                    raise r
+            self._block_number = int(results[0], 16)
+            if self._chain_id is None:
+                self._chain_id = int(results[2], 16)
+            gas_price = 0 if isinstance(results[1], RpcError) else int(results[1] or "0x0", 16)
             self._connected = True
             return {
                 "block_number": self._block_number,
@@ -106,17 +122,18 @@ class MemeQubitDataFetcher:
                 "gas_price": gas_price,
             }
         except Exception as e:
+            self._connected = False
             return {
                 "block_number": None,
                 "chain_id": None,
                 "connected": False,
-                "message": str(e),
+                "message": str(e) or type(e).__name__,
                 "gas_price": None,
             }
 
     async def get_pools(self) -> list[dict]:
         """Return pools from Redis cache or fetch from chain; fallback to demo data."""
-        redis = await _get_redis()
+        redis = await get_redis()
         if redis:
             try:
                 import json
@@ -126,12 +143,15 @@ class MemeQubitDataFetcher:
             except Exception:
                 pass
 
-        w3 = _get_web3()
-        stats = await self.get_network_stats()
-        if stats.get("connected") and w3:
-            # TODO: integrate real factory + getPair enumeration (e.g. Pump.fun)
-            pass
-        pools = _demo_pools()
+        pools = None
+        discovery = get_pool_discovery()
+        if discovery:
+            try:
+                pools = await discovery.load_pools(redis) or None
+            except Exception as e:
+                print(f"Pool discovery failed, serving demo pools: {e}")
+        if pools is None:
+            pools = _demo_pools()
 
         if redis:
             try:
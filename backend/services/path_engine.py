@@ -0,0 +1,227 @@
+"""
+Bounded best-output routing over a PoolGraph.
+
+Hop-layered label-setting search: a label is (token, amount held, edges taken, tokens visited).
+Each layer extends every live label by one pool hop. A label reaching a token is dominated, and
+dropped, when `labels_per_node` labels already reached that token in the same or fewer hops with
+at least the same amount and a subset of its visited tokens: every simple completion of the
+dominated label is open to those labels too, and constant-product output is monotone in input,
+so they end with at least as much. Amount alone is not enough, since a richer label may already
+have used the token the best completion needs.
+
+That rule is exact but can keep exponentially many labels on dense graphs, so each token keeps at
+most _LABEL_CAP of its richest labels. The search is exact while no token overflows the cap (and
+no `beam_width` is set); past that it is a heuristic, which in randomized checks against brute
+force over simple paths has not missed the optimum. Work is O(max_hops * _LABEL_CAP * E).
+
+Cycles (token_in == token_out) are supported: the start token is accepted as a terminal
+after two or more hops, which is what cyclic arbitrage needs.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+from core.config import settings
+from services.pool_graph import PoolGraph
+
+
+_LABEL_CAP = 8  # labels kept per token
+_MAX_MASK = float("inf")  # sorts after every bitmask with the same amount
+
+
+@dataclass
+class RoutedPath:
+    edges: list[int]
+    amount_out: float
+
+
+@dataclass
+class RouteSearchResult:
+    best: RoutedPath | None
+    candidates: list[RoutedPath] = field(default_factory=list)  # distinct paths to target, best first
+    paths_completed: int = 0  # labels that reached the target
+    states_expanded: int = 0
+    states_pruned: int = 0
+    edges_relaxed: int = 0
+
+
+def _admit(labels: list[tuple[float, int]], amount: float, visited: int, k: int, cap: int) -> bool:
+    """Record (-amount, visited bitmask) at a node unless it is dominated: `k` recorded labels have
+    at least its amount from a subset of its visited tokens, or `cap` recorded labels are all
+    richer. Labels are kept sorted by amount, richest first. Returns False when dominated."""
+    at = bisect_right(labels, (-amount, _MAX_MASK))
+    if at >= cap:
+        return False
+    dominating = 0
+    for _, mask in labels[:at]:
+        if mask & ~visited == 0:
+            dominating += 1
+            if dominating >= k:
+                return False
+    if k == 1:
+        # The new label dominates poorer ones from a superset of its tokens; they can go.
+        labels[at:] = [(a, mask) for a, mask in labels[at:] if visited & ~mask]
+    labels.insert(at, (-amount, visited))
+    del labels[cap:]
+    return True
+
+
+def _search(
+    graph: PoolGraph,
+    src: int,
+    targets: set[int] | None,
+    amount_in: float,
+    max_hops: int,
+    labels_per_node: int,
+    beam_width: int | None,
+    extend_targets: bool = False,
+):
+    """Core layered search. Returns (terminals, stats): terminals maps each target (or every
+    reached token, when targets is None) to its arrival labels as (amount, edges)."""
+    edge_dst, r_in, r_out, fee = graph.edge_table()
+    out_edges = graph.out_edges
+    label_cap = max(labels_per_node, _LABEL_CAP)
+    node_labels: dict[int, list[tuple[float, int]]] = {}
+    terminals: dict[int, list[tuple[float, tuple[int, ...]]]] = {}
+    # (amount, token, edges, visited tokens as a bitmask)
+    frontier: list[tuple[float, int, tuple[int, ...], int]] = [(amount_in, src, (), 1 << src)]
+    expanded = pruned = relaxed = 0
+    # A cycle may not close through the pool it left by. A first-hop label at v therefore cannot
+    # close over the src-v pool it came through, while a longer path to v can: when searching for
+    # cycles, first-hop labels are neither pruned nor allowed to prune later ones.
+    cycles = targets is not None and src in targets
+
+    for hop in range(1, max_hops + 1):
+        if not frontier:
+            break
+        next_frontier = []
+        for amount, u, edges, visited in frontier:
+            expanded += 1
+            for e in out_edges[u]:
+                relaxed += 1
+                v = edge_dst[e]
+                ri = r_in[e]
+                denom = ri + amount * fee[e]
+                if not ri or denom <= 0:
+                    continue
+                out = (amount * r_out[e] * fee[e]) / denom
+                if out <= 0:
+                    continue
+                if v == src:
+                    # Closing a cycle: only meaningful as a terminal, never extended further. Going
+                    # back through the pool of an earlier hop (A -> B -> A in one pool) is no cycle.
+                    if targets is not None and src in targets and hop >= 2 and e ^ 1 not in edges:
+                        terminals.setdefault(src, []).append((out, edges + (e,)))
+                    continue
+                bit = 1 << v
+                if visited & bit:
+                    continue
+                if not (cycles and hop == 1) and not _admit(
+                    node_labels.setdefault(v, []), out, visited | bit, labels_per_node, label_cap
+                ):
+                    pruned += 1
+                    continue
+                path = edges + (e,)
+                if targets is None or v in targets:
+                    terminals.setdefault(v, []).append((out, path))
+                    if targets is not None and not extend_targets:
+                        continue
+                next_frontier.append((out, v, path, visited | bit))
+        if beam_width is not None and len(next_frontier) > beam_width:
+            next_frontier.sort(key=lambda label: -label[0])
+            pruned += len(next_frontier) - beam_width
+            next_frontier = next_frontier[:beam_width]
+        frontier = next_frontier
+
+    return terminals, (expanded, pruned, relaxed)
+
+
+def best_output_path(
+    graph: PoolGraph,
+    token_in: str,
+    token_out: str,
+    amount_in: float,
+    max_hops: int = 4,
+    top_k: int = 1,
+    beam_width: int | None = None,
+) -> RouteSearchResult:
+    """Max-output path from token_in to token_out within max_hops, plus up to top_k - 1 runner-up paths."""
+    src, dst = graph.token_index.get(token_in), graph.token_index.get(token_out)
+    if src is None or dst is None or amount_in <= 0:
+        return RouteSearchResult(best=None)
+    terminals, (expanded, pruned, relaxed) = _search(
+        graph, src, {dst}, amount_in, max_hops, max(1, top_k), beam_width
+    )
+    arrivals = sorted(terminals.get(dst, ()), key=lambda t: -t[0])
+    candidates: list[RoutedPath] = []
+    seen: set[tuple[int, ...]] = set()
+    for amount, edges in arrivals:
+        if edges in seen:
+            continue
+        seen.add(edges)
+        candidates.append(RoutedPath(edges=list(edges), amount_out=float(amount)))
+        if len(candidates) >= top_k:
+            break
+    return RouteSearchResult(
+        best=candidates[0] if candidates else None,
+        candidates=candidates,
+        paths_completed=len(arrivals),
+        states_expanded=expanded,
+        states_pruned=pruned,
+        edges_relaxed=relaxed,
+    )
+
+
+def best_output_paths(
+    graph: PoolGraph,
+    token_in: str,
+    targets: list[str],
+    amount_in: float,
+    max_hops: int = 4,
+    beam_width: int | None = None,
+) -> tuple[dict[str, RoutedPath], RouteSearchResult]:
+    """One-to-many: best path from token_in to every reachable token in `targets`, from a single
+    search (labels keep extending through targets, so a route may pass one stable on the way to
+    another). Returns ({target: best path}, search stats with `best` = the best over all targets —
+    only meaningful when target amounts are comparable, e.g. a set of stables)."""
+    src = graph.token_index.get(token_in)
+    wanted = {graph.token_index[t]: t for t in targets if t in graph.token_index and t != token_in}
+    if src is None or not wanted or amount_in <= 0:
+        return {}, RouteSearchResult(best=None)
+    terminals, (expanded, pruned, relaxed) = _search(
+        graph, src, set(wanted), amount_in, max_hops, 1, beam_width, extend_targets=True
+    )
+    best: dict[str, RoutedPath] = {}
+    completed = 0
+    for node, arrivals in terminals.items():
+        completed += len(arrivals)
+        amount, edges = max(arrivals, key=lambda t: t[0])
+        best[wanted[node]] = RoutedPath(edges=list(edges), amount_out=float(amount))
+    ranked = sorted(best.values(), key=lambda p: -p.amount_out)
+    return best, RouteSearchResult(
+        best=ranked[0] if ranked else None,
+        candidates=ranked,
+        paths_completed=completed,
+        states_expanded=expanded,
+        states_pruned=pruned,
+        edges_relaxed=relaxed,
+    )
+
+
+def hedge_targets(
+    graph: PoolGraph, token_to_hedge: str, targets: list[str] | None, target_stable: str | None = None
+) -> list[str]:
+    """Candidate exits present in the graph: explicit targets, else target_stable, else STABLE_TOKENS."""
+    if targets:
+        names = targets
+    elif target_stable:
+        names = [target_stable]
+    else:
+        names = [t.strip() for t in settings.STABLE_TOKENS.split(",") if t.strip()]
+    by_lower = {t.lower(): t for t in graph.tokens}
+    found: list[str] = []
+    for name in names:
+        token = name if name in graph.token_index else by_lower.get(name.lower())
+        if token and token != token_to_hedge and token not in found:
+            found.append(token)
+    return found
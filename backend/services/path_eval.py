@@ -0,0 +1,119 @@
+"""
+Vectorized constant-product evaluation of many swap paths at once.
+
+Candidate paths (lists of PoolGraph edge indices) are packed into a padded (P, H) index
+array; outputs for every path — and optionally every input amount in a sweep — are computed
+with one NumPy pass per hop instead of a Python loop per path. This is the inner kernel for
+arbitrage, hedge finder and trade-size search.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from services.pool_graph import PoolGraph
+
+
+@dataclass
+class PathBatch:
+    edges: np.ndarray  # (P, H) int64 edge indices, padded with -1
+    lengths: np.ndarray  # (P,) hops per path
+
+    @property
+    def num_paths(self) -> int:
+        return self.edges.shape[0]
+
+    def path(self, i: int) -> list[int]:
+        return self.edges[i, : self.lengths[i]].tolist()
+
+
+def pack_paths(paths: list[list[int]]) -> PathBatch:
+    """Pack variable-length edge paths into a padded index array."""
+    lengths = np.fromiter((len(p) for p in paths), dtype=np.int64, count=len(paths))
+    width = int(lengths.max()) if len(paths) else 0
+    edges = np.full((len(paths), width), -1, dtype=np.int64)
+    for i, p in enumerate(paths):
+        edges[i, : len(p)] = p
+    return PathBatch(edges=edges, lengths=lengths)
+
+
+def evaluate_paths(
+    graph: PoolGraph,
+    batch: PathBatch,
+    amounts,
+    reserve_in: np.ndarray | None = None,
+    reserve_out: np.ndarray | None = None,
+) -> np.ndarray:
+    """AMM output of every path in `batch`.
+
+    amounts: scalar -> returns (P,); 1-D array of A sizes -> returns (P, A) (a trade-size sweep).
+    reserve_in/reserve_out: optional per-edge overrides (e.g. reserves after earlier fills).
+    """
+    r_in = graph.reserve_in if reserve_in is None else reserve_in
+    r_out = graph.reserve_out if reserve_out is None else reserve_out
+    amounts_arr = np.asarray(amounts, dtype=np.float64)
+    scalar = amounts_arr.ndim == 0
+    amt = np.broadcast_to(np.atleast_1d(amounts_arr), (batch.num_paths, amounts_arr.size)).copy()
+    if batch.num_paths == 0:
+        return amt[:, 0] if scalar else amt
+
+    for hop in range(batch.edges.shape[1]):
+        col = batch.edges[:, hop]
+        live = col >= 0
+        e = np.where(live, col, 0)
+        f = graph.fee[e][:, None]
+        ri = r_in[e][:, None]
+        ro = r_out[e][:, None]
+        denom = ri + amt * f
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out = np.where((ri > 0) & (denom > 0), amt * ro * f / denom, 0.0)
+        amt = np.where(live[:, None], out, amt)
+
+    return amt[:, 0] if scalar else amt
+
+
+def best_of(graph: PoolGraph, paths: list[list[int]], amount: float) -> tuple[list[int], float]:
+    """Best path among `paths` for a single input amount; ([], 0.0) when there are none."""
+    if not paths:
+        return [], 0.0
+    batch = pack_paths(paths)
+    outputs = evaluate_paths(graph, batch, amount)
+    i = int(np.argmax(outputs))
+    return batch.path(i), float(outputs[i])
+
+
+def compose_paths(graph: PoolGraph, batch: PathBatch) -> tuple[np.ndarray, np.ndarray]:
+    """Collapse each path into one virtual constant-product curve out(a) = A*a / (1 + C*a).
+
+    A hop with reserves (r_in, r_out) and fee multiplier f is out = (r_out*f/r_in)*a / (1 + (f/r_in)*a);
+    composing two such maps stays in the same family with A = A1*A2 and C = C1 + A1*C2.
+    """
+    A = np.ones(batch.num_paths, dtype=np.float64)
+    C = np.zeros(batch.num_paths, dtype=np.float64)
+    for hop in range(batch.edges.shape[1]):
+        col = batch.edges[:, hop]
+        live = col >= 0
+        e = np.where(live, col, 0)
+        r_in = graph.reserve_in[e]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            a_h = np.where(r_in > 0, graph.reserve_out[e] * graph.fee[e] / r_in, 0.0)
+            c_h = np.where(r_in > 0, graph.fee[e] / r_in, 0.0)
+        C = np.where(live, C + A * c_h, C)
+        A = np.where(live, A * a_h, A)
+    return A, C
+
+
+def optimal_inputs(A: np.ndarray, C: np.ndarray, reference_rate: float, max_amount: float | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Profit-maximizing input per composed path, valuing output at `reference_rate` (out per in).
+
+    profit(a) = A*a / (1 + C*a) - p*a is concave; setting the derivative A / (1 + C*a)^2 = p gives
+    a* = (sqrt(A/p) - 1) / C. Paths whose marginal rate at zero (A) does not beat p get a* = 0.
+    Returns (amount_in, amount_out, profit).
+    """
+    p = float(reference_rate)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        a_star = np.where((A > p) & (C > 0), (np.sqrt(A / p) - 1.0) / C, 0.0)
+    if max_amount is not None:
+        a_star = np.minimum(a_star, max_amount)
+    out = A * a_star / (1.0 + C * a_star)
+    return a_star, out, out - p * a_star
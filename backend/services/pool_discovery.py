@@ -0,0 +1,222 @@
+"""
+On-chain pool discovery for a Uniswap-V2-style factory.
+
+1. enumerate: allPairsLength(), then allPairs(i) for indices not seen yet (newest
+   POOL_DISCOVERY_MAX_PAIRS only). Pair addresses never change, so each index is read once.
+2. metadata: token0()/token1() per new pair and decimals() per new token. Static, so it is cached
+   (in process and in Redis when available); a restart or a refresh only reads pairs and tokens
+   it has not seen. The caches are LRUs: pair metadata keeps POOL_DISCOVERY_MAX_PAIRS entries
+   (the current window always fits), token decimals twice that, and pairs that fall out of the
+   window are also dropped from Redis.
+3. reserves: getReserves() for every pair on every load, the only per-refresh reads.
+
+Every step is a list of eth_calls sent as JSON-RPC batches of RPC_BATCH_SIZE, fanned out
+concurrently (RPC_MAX_CONCURRENCY batches in flight) by services/rpc_client. Calls are ABI-encoded
+by hand (fixed selectors, static arguments), so no web3 contract objects are needed.
+"""
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+from core.config import settings
+from services.rpc_client import JsonRpcClient, RpcError, get_rpc_client
+
+try:
+    from eth_utils import to_checksum_address
+except ImportError:  # web3 not installed: keep lowercase hex addresses
+    def to_checksum_address(address: str) -> str:
+        return address
+
+SEL_ALL_PAIRS_LENGTH = "0x574f2ba3"  # allPairsLength()
+SEL_ALL_PAIRS = "0x1e3dd18b"  # allPairs(uint256)
+SEL_TOKEN0 = "0x0dfe1681"  # token0()
+SEL_TOKEN1 = "0xd21220a7"  # token1()
+SEL_GET_RESERVES = "0x0902f1ac"  # getReserves()
+SEL_DECIMALS = "0x313ce567"  # decimals()
+
+_META_KEY = "memequbit:pair_meta"
+_DEFAULT_DECIMALS = 18
+
+
+def encode_uint(value: int) -> str:
+    return format(value, "064x")
+
+
+def _words(data) -> list[int]:
+    if not isinstance(data, str) or len(data) < 66:
+        raise ValueError(f"short eth_call result: {data!r}")
+    body = data[2:]
+    return [int(body[i : i + 64], 16) for i in range(0, len(body) - 63, 64)]
+
+
+def decode_uint(data) -> int:
+    return _words(data)[0]
+
+
+def decode_address(data) -> str:
+    return to_checksum_address("0x" + format(_words(data)[0], "040x")[-40:])
+
+
+@dataclass
+class PairMeta:
+    address: str
+    token0: str
+    token1: str
+    fee: int  # basis points
+    decimals0: int = _DEFAULT_DECIMALS
+    decimals1: int = _DEFAULT_DECIMALS
+
+
+class PoolDiscovery:
+    def __init__(
+        self,
+        factory: str,
+        client: JsonRpcClient | None = None,
+        fee_bps: int | None = None,
+        max_pairs: int | None = None,
+    ):
+        self.factory = factory
+        self.client = client or get_rpc_client()
+        self.fee_bps = settings.POOL_FACTORY_FEE_BPS if fee_bps is None else fee_bps
+        self.max_pairs = max_pairs or settings.POOL_DISCOVERY_MAX_PAIRS
+        self.pair_at: dict[int, str] = {}  # factory index -> pair address
+        self.meta: OrderedDict[str, PairMeta] = OrderedDict()  # pair address -> static metadata (LRU)
+        self.decimals: OrderedDict[str, int] = OrderedDict()  # token -> decimals (LRU)
+        self._evicted: list[str] = []  # pairs dropped from meta since the last Redis sync
+        self._warmed = False
+        self.last_load: dict = {}
+
+    async def _calls(self, calls: list[tuple[str, str]]) -> list:
+        """eth_call (to, data) pairs through the batched client; failures (reverts, empty results
+        from non-contracts) come back as RpcError."""
+        results = await self.client.batched([("eth_call", [{"to": to, "data": data}, "latest"]) for to, data in calls])
+        return [
+            r if isinstance(r, RpcError) or (isinstance(r, str) and len(r) >= 66) else RpcError(f"empty eth_call result: {r!r}")
+            for r in results
+        ]
+
+    async def _warm(self, redis) -> None:
+        """Load metadata persisted by an earlier process."""
+        self._warmed = True
+        if not redis:
+            return
+        try:
+            raw = await redis.hgetall(_META_KEY)
+        except Exception:
+            return
+        for value in raw.values():
+            try:
+                m = PairMeta(**json.loads(value))
+            except (TypeError, ValueError):
+                continue
+            self.meta[m.address] = m
+            self.decimals.setdefault(m.token0, m.decimals0)
+            self.decimals.setdefault(m.token1, m.decimals1)
+
+    async def enumerate(self) -> list[str]:
+        """Pair addresses for the newest max_pairs factory indices; only unseen indices are read."""
+        total = decode_uint(await self.client.eth_call(self.factory, SEL_ALL_PAIRS_LENGTH))
+        indices = range(max(0, total - self.max_pairs), total)
+        new = [i for i in indices if i not in self.pair_at]
+        results = await self._calls([(self.factory, SEL_ALL_PAIRS + encode_uint(i)) for i in new])
+        for i, result in zip(new, results):
+            if not isinstance(result, RpcError):
+                self.pair_at[i] = decode_address(result)
+        for i in [i for i in self.pair_at if i < indices.start]:
+            del self.pair_at[i]
+        return [self.pair_at[i] for i in indices if i in self.pair_at]
+
+    def _trim(self) -> None:
+        """Evict least recently used metadata beyond max_pairs pairs and 2 * max_pairs tokens."""
+        while len(self.meta) > self.max_pairs:
+            self._evicted.append(self.meta.popitem(last=False)[0])
+        while len(self.decimals) > 2 * self.max_pairs:
+            self.decimals.popitem(last=False)
+
+    async def load_metadata(self, pairs: list[str]) -> list[PairMeta]:
+        """token0/token1 for pairs without metadata, decimals for tokens not seen yet."""
+        new = []
+        for p in pairs:
+            m = self.meta.get(p)
+            if m is None:
+                new.append(p)
+                continue
+            self.meta.move_to_end(p)
+            for token in (m.token0, m.token1):
+                if token in self.decimals:
+                    self.decimals.move_to_end(token)
+        if new:
+            results = await self._calls([(p, sel) for p in new for sel in (SEL_TOKEN0, SEL_TOKEN1)])
+            tokens: dict[str, tuple[str, str]] = {}
+            for k, pair in enumerate(new):
+                t0, t1 = results[2 * k], results[2 * k + 1]
+                if not isinstance(t0, RpcError) and not isinstance(t1, RpcError):
+                    tokens[pair] = (decode_address(t0), decode_address(t1))
+            unseen = sorted({t for pair_tokens in tokens.values() for t in pair_tokens} - self.decimals.keys())
+            for token, result in zip(unseen, await self._calls([(t, SEL_DECIMALS) for t in unseen])):
+                self.decimals[token] = _DEFAULT_DECIMALS if isinstance(result, RpcError) else decode_uint(result)
+            for pair, (t0, t1) in tokens.items():
+                self.meta[pair] = PairMeta(pair, t0, t1, self.fee_bps, self.decimals[t0], self.decimals[t1])
+                self.decimals.move_to_end(t0)
+                self.decimals.move_to_end(t1)
+        metas = [self.meta[p] for p in pairs if p in self.meta]
+        self._trim()
+        return metas
+
+    async def load_reserves(self, metas: list[PairMeta]) -> list[dict]:
+        """Current reserves (token units) as fetcher pool dicts; empty or failed pairs are skipped."""
+        results = await self._calls([(m.address, SEL_GET_RESERVES) for m in metas])
+        pools = []
+        for m, result in zip(metas, results):
+            if isinstance(result, RpcError):
+                continue
+            words = _words(result)
+            r0, r1 = words[0] / 10 ** m.decimals0, words[1] / 10 ** m.decimals1
+            if r0 > 0 and r1 > 0:
+                pools.append({"address": m.address, "tokens": [m.token0, m.token1], "reserves": [r0, r1], "fee": m.fee})
+        return pools
+
+    async def load_pools(self, redis=None) -> list[dict]:
+        t0 = time.perf_counter()
+        calls0, requests0 = self.client.calls, self.client.requests
+        if not self._warmed:
+            await self._warm(redis)
+        known = set(self.meta)
+        pairs = await self.enumerate()
+        metas = await self.load_metadata(pairs)
+        fresh = [m for m in metas if m.address not in known]
+        evicted, self._evicted = self._evicted, []
+        if redis and fresh:
+            try:
+                await redis.hset(_META_KEY, mapping={m.address: json.dumps(asdict(m)) for m in fresh})
+            except Exception:
+                pass
+        if redis and evicted:
+            try:
+                await redis.hdel(_META_KEY, *evicted)
+            except Exception:
+                pass
+        pools = await self.load_reserves(metas)
+        self.last_load = {
+            "pairs": len(pairs),
+            "pools": len(pools),
+            "new_metadata": len(fresh),
+            "evicted_metadata": len(evicted),
+            "rpc_calls": self.client.calls - calls0,
+            "rpc_requests": self.client.requests - requests0,
+            "ms": round((time.perf_counter() - t0) * 1000, 2),
+        }
+        return pools
+
+
+_discovery: PoolDiscovery | None = None
+
+
+def get_pool_discovery() -> PoolDiscovery | None:
+    """Discovery for POOL_FACTORY_ADDRESS, or None when no factory is configured."""
+    global _discovery
+    if _discovery is None and settings.POOL_FACTORY_ADDRESS:
+        _discovery = PoolDiscovery(settings.POOL_FACTORY_ADDRESS)
+    return _discovery
@@ -0,0 +1,318 @@
+"""
+Array-backed token graph over AMM pools.
+
+One long-lived graph is owned by the process and synced from MemeQubitDataFetcher.get_pools()
+on every refresh; routing endpoints (arbitrage, hedge finder, ...) query it instead of
+rebuilding a networkx graph per call. When only reserves change, the arrays are updated in place.
+
+Only the event loop mutates the live graph. After each sync it publishes a read-only snapshot
+(frozen_copy: topology containers shared, reserve arrays copied), and solvers running in worker
+threads only ever see snapshots. Caller-supplied pool lists get a private graph per request,
+built from a cached layout for their topology.
+
+Edge layout: pool i contributes two directed edges, 2*i (tokens[0] -> tokens[1]) and
+2*i + 1 (tokens[1] -> tokens[0]), so edge // 2 is always the pool index.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Iterator
+
+import numpy as np
+
+
+def _pool_field(p, key: str, default=None):
+    if isinstance(p, dict):
+        return p.get(key, default)
+    return getattr(p, key, default)
+
+
+class PoolGraph:
+    """Directed token graph with reserves/fees stored in NumPy arrays indexed by edge."""
+
+    def __init__(self):
+        self.tokens: list[str] = []
+        self.token_index: dict[str, int] = {}
+        self.pool_addresses: list[str] = []
+        self.pool_index: dict[str, int] = {}
+        self.edge_src = np.empty(0, dtype=np.int64)
+        self.edge_dst = np.empty(0, dtype=np.int64)
+        self.reserve_in = np.empty(0, dtype=np.float64)
+        self.reserve_out = np.empty(0, dtype=np.float64)
+        self.fee = np.empty(0, dtype=np.float64)  # fee multiplier, e.g. 0.997 for 30 bps
+        self.out_edges: list[list[int]] = []
+        self.pair_edges: dict[tuple[int, int], list[int]] = {}
+        self._topology: tuple = ()
+        self._edge_table: tuple | None = None
+        self._edge_table_version = -1
+        self._snapshot_key: tuple[int, str] = (-1, "")
+        self.version = 0  # bumped on every rebuild or reserve change
+        self.topology_version = 0  # bumped only when tokens/pools change
+        self.frozen = False  # snapshots handed to workers refuse mutation
+
+    @classmethod
+    def from_pools(cls, pools: list) -> "PoolGraph":
+        graph = cls()
+        graph.sync(pools)
+        return graph
+
+    def _copy(self, frozen: bool) -> "PoolGraph":
+        """Same layout, own reserve arrays. The topology containers are shared: _rebuild replaces
+        them rather than editing them, so a copy never sees a later rebuild."""
+        graph = PoolGraph.__new__(PoolGraph)
+        graph.__dict__.update(self.__dict__)
+        graph.reserve_in = self.reserve_in.copy()
+        graph.reserve_out = self.reserve_out.copy()
+        graph._edge_table, graph._edge_table_version = None, -1
+        graph._snapshot_key = (-1, "")
+        graph.frozen = frozen
+        return graph
+
+    def frozen_copy(self) -> "PoolGraph":
+        """Read-only snapshot of the current reserves, safe to share with worker threads."""
+        return self._copy(frozen=True)
+
+    def with_reserves(self, pools: list) -> "PoolGraph":
+        """Private graph with this layout and the reserves of `pools` (same topology)."""
+        graph = self._copy(frozen=False)
+        for i, p in enumerate(pools):
+            graph._set_reserves(i, _pool_field(p, "reserves"))
+        return graph
+
+    @staticmethod
+    def topology_key(pools: list) -> tuple:
+        """Everything except reserves: two pool lists with the same key share one graph layout."""
+        return tuple(
+            (_pool_field(p, "address"), tuple(_pool_field(p, "tokens")[:2]), _pool_field(p, "fee", 300))
+            for p in pools
+        )
+
+    @property
+    def num_pools(self) -> int:
+        return len(self.pool_addresses)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.edge_src)
+
+    def _rebuild(self, pools: list, topology: tuple) -> None:
+        n = len(pools)
+        self.tokens = []
+        self.token_index = {}
+        self.pool_addresses = []
+        self.pool_index = {}
+        src = np.empty(2 * n, dtype=np.int64)
+        dst = np.empty(2 * n, dtype=np.int64)
+        fee = np.empty(2 * n, dtype=np.float64)
+        for i, (address, (t0, t1), fee_bps) in enumerate(topology):
+            a = self._token_id(t0)
+            b = self._token_id(t1)
+            self.pool_addresses.append(address)
+            self.pool_index[address] = i
+            src[2 * i], dst[2 * i] = a, b
+            src[2 * i + 1], dst[2 * i + 1] = b, a
+            fee[2 * i] = fee[2 * i + 1] = 1 - (fee_bps / 10000)
+        self.edge_src, self.edge_dst, self.fee = src, dst, fee
+        self.reserve_in = np.zeros(2 * n, dtype=np.float64)
+        self.reserve_out = np.zeros(2 * n, dtype=np.float64)
+        self.out_edges = [[] for _ in self.tokens]
+        self.pair_edges = {}
+        for e in range(2 * n):
+            u, v = int(src[e]), int(dst[e])
+            self.out_edges[u].append(e)
+            self.pair_edges.setdefault((u, v), []).append(e)
+        for i, p in enumerate(pools):
+            self._set_reserves(i, _pool_field(p, "reserves"))
+        self._topology = topology
+
+    def _token_id(self, token: str) -> int:
+        idx = self.token_index.get(token)
+        if idx is None:
+            idx = len(self.tokens)
+            self.tokens.append(token)
+            self.token_index[token] = idx
+        return idx
+
+    def _set_reserves(self, pool_idx: int, reserves) -> bool:
+        r0, r1 = float(reserves[0]), float(reserves[1])
+        e = 2 * pool_idx
+        if self.reserve_in[e] == r0 and self.reserve_out[e] == r1:
+            return False
+        self.reserve_in[e], self.reserve_out[e] = r0, r1
+        self.reserve_in[e + 1], self.reserve_out[e + 1] = r1, r0
+        return True
+
+    def sync(self, pools: list) -> list[int]:
+        """Bring the graph in line with `pools`. Returns indices of pools whose reserves changed
+        (all pools when the topology changed and the arrays had to be rebuilt)."""
+        self._check_mutable()
+        topology = self.topology_key(pools)
+        if topology != self._topology:
+            self._rebuild(pools, topology)
+            self.version += 1
+            self.topology_version += 1
+            return list(range(len(pools)))
+        changed = [i for i, p in enumerate(pools) if self._set_reserves(i, _pool_field(p, "reserves"))]
+        if changed:
+            self.version += 1
+        return changed
+
+    def update_reserves(self, address: str, reserves) -> bool:
+        """Update one pool's reserves in place. Returns False for unknown pools or no-op updates."""
+        self._check_mutable()
+        idx = self.pool_index.get(address)
+        if idx is None or not self._set_reserves(idx, reserves):
+            return False
+        self.version += 1
+        return True
+
+    def _check_mutable(self) -> None:
+        if self.frozen:
+            raise RuntimeError("pool graph snapshot is read-only")
+
+    def edge_table(self) -> tuple[list, list, list, list]:
+        """(edge_dst, reserve_in, reserve_out, fee) as plain lists for scalar-heavy Python loops;
+        converted once per graph version."""
+        if self._edge_table_version != self.version:
+            self._edge_table = (
+                self.edge_dst.tolist(),
+                self.reserve_in.tolist(),
+                self.reserve_out.tolist(),
+                self.fee.tolist(),
+            )
+            self._edge_table_version = self.version
+        return self._edge_table
+
+    def snapshot_key(self) -> str:
+        """Content digest of pools + reserves. Unlike `version` it is the same in every process
+        holding the same snapshot, so it can key shared (Redis) caches."""
+        if self._snapshot_key[0] != self.version:
+            h = hashlib.sha1(repr(self._topology).encode())
+            h.update(self.reserve_in.tobytes())
+            self._snapshot_key = (self.version, h.hexdigest())
+        return self._snapshot_key[1]
+
+    def has_token(self, token: str) -> bool:
+        return token in self.token_index
+
+    def edge_pool_address(self, edge: int) -> str:
+        return self.pool_addresses[edge // 2]
+
+    def swap_out(self, edge: int, amount: float) -> float:
+        """Constant-product output for `amount` sent along `edge`."""
+        f = self.fee[edge]
+        r_in = self.reserve_in[edge]
+        denom = r_in + amount * f
+        if not r_in or not denom:
+            return 0.0
+        return float((amount * self.reserve_out[edge] * f) / denom)
+
+    def apply_swap(self, edge: int, amount: float) -> float:
+        """Execute a swap along `edge`: the input (fee included) stays in the pool. Returns the output."""
+        out = self.swap_out(edge, amount)
+        r_in, r_out = self.reserve_in[edge] + amount, self.reserve_out[edge] - out
+        self.update_reserves(self.edge_pool_address(edge), (r_in, r_out) if edge % 2 == 0 else (r_out, r_in))
+        return out
+
+    def best_edge(self, token_a: str, token_b: str, amount: float) -> tuple[int | None, float]:
+        """Best pool edge for a direct a -> b swap of `amount` (parallel pools are compared)."""
+        a, b = self.token_index.get(token_a), self.token_index.get(token_b)
+        best, best_out = None, 0.0
+        for e in self.pair_edges.get((a, b), ()):
+            out = self.swap_out(e, amount)
+            if best is None or out > best_out:
+                best, best_out = e, out
+        return best, best_out
+
+    def path_output(self, edges: list[int], amount: float) -> float:
+        for e in edges:
+            amount = self.swap_out(e, amount)
+            if amount <= 0:
+                return 0.0
+        return amount
+
+    def path_tokens(self, edges: list[int]) -> list[str]:
+        if not edges:
+            return []
+        return [self.tokens[int(self.edge_src[edges[0]])]] + [self.tokens[int(self.edge_dst[e])] for e in edges]
+
+    def simple_paths(self, token_a: str, token_b: str, cutoff: int) -> Iterator[list[int]]:
+        """Yield every simple edge path from a to b with at most `cutoff` hops."""
+        src, dst = self.token_index.get(token_a), self.token_index.get(token_b)
+        if src is None or dst is None or src == dst:
+            return
+        visited = {src}
+        stack: list[int] = []
+
+        def _walk(u: int):
+            for e in self.out_edges[u]:
+                v = int(self.edge_dst[e])
+                if v in visited:
+                    continue
+                stack.append(e)
+                if v == dst:
+                    yield list(stack)
+                elif len(stack) < cutoff:
+                    visited.add(v)
+                    yield from _walk(v)
+                    visited.discard(v)
+                stack.pop()
+
+        yield from _walk(src)
+
+
+_live_graph: PoolGraph | None = None
+_live_snapshot: PoolGraph | None = None
+_request_graphs: "OrderedDict[tuple, PoolGraph]" = OrderedDict()
+_request_graphs_lock = threading.Lock()
+_REQUEST_GRAPH_CACHE_SIZE = 32
+
+
+def get_pool_graph() -> PoolGraph:
+    """Process-wide mutable graph of the fetcher's pools (synced by the refresh loop in main.py).
+    Event loop only; workers use get_live_pool_graph()."""
+    global _live_graph
+    if _live_graph is None:
+        _live_graph = PoolGraph()
+    return _live_graph
+
+
+def publish_live_graph() -> PoolGraph:
+    """Snapshot the live graph after a sync (event loop). Workers holding the previous snapshot
+    keep reading it unchanged."""
+    global _live_snapshot
+    graph = get_pool_graph()
+    if _live_snapshot is None or _live_snapshot.version != graph.version:
+        _live_snapshot = graph.frozen_copy()
+    return _live_snapshot
+
+
+async def get_live_pool_graph() -> PoolGraph:
+    """Read-only snapshot of the shared graph, populated from the fetcher on first use. Routers
+    await it on the event loop before dispatching a worker, so workers only read the snapshot."""
+    if _live_snapshot is None:
+        graph = get_pool_graph()
+        if graph.version == 0:
+            from services.memequbit_fetcher import get_memequbit_fetcher
+            graph.sync(await get_memequbit_fetcher().get_pools())
+        return publish_live_graph()
+    return _live_snapshot
+
+
+def graph_for_pools(pools: list) -> PoolGraph:
+    """Private graph for a caller-supplied pool list. Layouts are cached by topology (and never
+    mutated), so repeat requests over the same pools only copy in their reserves."""
+    key = PoolGraph.topology_key(pools)
+    with _request_graphs_lock:
+        layout = _request_graphs.get(key)
+        if layout is not None:
+            _request_graphs.move_to_end(key)
+    if layout is None:
+        graph = PoolGraph.from_pools(pools)
+        with _request_graphs_lock:
+            _request_graphs[key] = graph.frozen_copy()
+            if len(_request_graphs) > _REQUEST_GRAPH_CACHE_SIZE:
+                _request_graphs.popitem(last=False)
+        return graph
+    return layout.with_reserves(pools)
@@ -0,0 +1,206 @@
+"""
+In-memory position book for the liquidation optimizer.
+
+Positions are stored column-wise in NumPy arrays (health factor, liquidation bonus, gas estimate,
+total debt, one debt column per token) plus Python lists for the collateral/debt symbols. Rows
+of removed positions are recycled. A health-factor index (values and rows kept sorted) is
+patched on each upsert with searchsorted/insert instead of re-sorting, so "liquidatable now" is a
+binary search plus a slice, and selection under gas / liquidity constraints feeds the columns
+straight into the knapsack solver without materializing request models.
+"""
+
+import numpy as np
+
+from models.quantum import PositionToLiquidate
+from services.knapsack import KnapsackProblem, KnapsackResult, solve_knapsack
+
+_DEFAULT_GAS = 150_000
+_INITIAL_CAPACITY = 1024
+
+
+class PositionBook:
+    def __init__(self):
+        self.capacity = _INITIAL_CAPACITY
+        self.position_ids: list[str | None] = [None] * self.capacity
+        self.collateral: list[list[str]] = [[] for _ in range(self.capacity)]
+        self.debt: list[list[str]] = [[] for _ in range(self.capacity)]
+        self.health_factor = np.full(self.capacity, np.inf)
+        self.liquidation_bonus = np.zeros(self.capacity)
+        self.gas_estimate = np.zeros(self.capacity, dtype=np.int64)
+        self.debt_total = np.zeros(self.capacity)
+        self.debt_columns: dict[str, np.ndarray] = {}
+        self.row_of: dict[str, int] = {}
+        self._free: list[int] = list(range(self.capacity - 1, -1, -1))
+        self._hf_values = np.empty(0)  # sorted health factors of live rows
+        self._hf_rows = np.empty(0, dtype=np.int64)  # rows in the same order
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    def _grow(self) -> None:
+        old = self.capacity
+        self.capacity *= 2
+        extra = self.capacity - old
+        self.position_ids.extend([None] * extra)
+        self.collateral.extend([] for _ in range(extra))
+        self.debt.extend([] for _ in range(extra))
+        self.health_factor = np.concatenate([self.health_factor, np.full(extra, np.inf)])
+        self.liquidation_bonus = np.concatenate([self.liquidation_bonus, np.zeros(extra)])
+        self.gas_estimate = np.concatenate([self.gas_estimate, np.zeros(extra, dtype=np.int64)])
+        self.debt_total = np.concatenate([self.debt_total, np.zeros(extra)])
+        for token, col in self.debt_columns.items():
+            self.debt_columns[token] = np.concatenate([col, np.zeros(extra)])
+        self._free.extend(range(self.capacity - 1, old - 1, -1))
+
+    def _debt_column(self, token: str) -> np.ndarray:
+        col = self.debt_columns.get(token)
+        if col is None:
+            col = self.debt_columns[token] = np.zeros(self.capacity)
+        return col
+
+    def _clear_row(self, row: int) -> None:
+        self.position_ids[row] = None
+        self.collateral[row] = []
+        self.debt[row] = []
+        self.health_factor[row] = np.inf
+        self.liquidation_bonus[row] = 0.0
+        self.gas_estimate[row] = 0
+        self.debt_total[row] = 0.0
+        for col in self.debt_columns.values():
+            col[row] = 0.0
+
+    def upsert(self, positions: list, remove: list[str] | None = None) -> tuple[int, int]:
+        """Insert or replace positions by position_id and drop `remove`. Returns (upserted, removed)."""
+        touched: list[int] = []
+        removed = 0
+        for position_id in remove or []:
+            row = self.row_of.pop(position_id, None)
+            if row is not None:
+                self._clear_row(row)
+                self._free.append(row)
+                touched.append(row)
+                removed += 1
+        for p in positions:
+            row = self.row_of.get(p.position_id)
+            if row is None:
+                if not self._free:
+                    self._grow()
+                row = self._free.pop()
+                self.row_of[p.position_id] = row
+            else:
+                self._clear_row(row)
+            self.position_ids[row] = p.position_id
+            self.collateral[row] = list(p.collateral)
+            self.debt[row] = list(p.debt)
+            self.health_factor[row] = p.health_factor
+            self.liquidation_bonus[row] = p.liquidation_bonus if p.liquidation_bonus is not None else 0.1
+            self.gas_estimate[row] = p.gas_estimate or _DEFAULT_GAS
+            for token, amount in (p.debt_amounts or {}).items():
+                self._debt_column(token)[row] = amount
+            self.debt_total[row] = sum((p.debt_amounts or {}).values())
+            touched.append(row)
+        self._reindex(touched)
+        self.version += 1
+        return len(positions), removed
+
+    def _reindex(self, rows: list[int]) -> None:
+        """Patch the sorted health-factor index for changed rows: drop their old entries, merge new ones."""
+        if not rows:
+            return
+        rows_arr = np.unique(np.asarray(rows, dtype=np.int64))
+        keep = ~np.isin(self._hf_rows, rows_arr)
+        values, index_rows = self._hf_values[keep], self._hf_rows[keep]
+        live = np.array([self.position_ids[r] is not None for r in rows_arr], dtype=bool)
+        new_rows = rows_arr[live]
+        new_values = self.health_factor[new_rows]
+        order = np.argsort(new_values, kind="stable")
+        new_rows, new_values = new_rows[order], new_values[order]
+        at = np.searchsorted(values, new_values, side="right")
+        self._hf_values = np.insert(values, at, new_values)
+        self._hf_rows = np.insert(index_rows, at, new_rows)
+
+    def liquidatable_rows(self, threshold: float = 1.0) -> np.ndarray:
+        """Rows with health factor below `threshold`, worst first."""
+        return self._hf_rows[: int(np.searchsorted(self._hf_values, threshold, side="left"))]
+
+    def recovery_values(self, rows: np.ndarray) -> np.ndarray:
+        """Same valuation as the liquidation optimizer: (0.9 + bonus) x total debt (x 1 when unknown)."""
+        bonus = np.where(self.liquidation_bonus[rows] > 0, self.liquidation_bonus[rows], 0.1)
+        debt = self.debt_total[rows]
+        return (0.9 + bonus) * np.where(debt > 0, debt, 1.0)
+
+    def select_problem(
+        self,
+        threshold: float = 1.0,
+        max_gas: int | None = None,
+        liquidity: dict[str, float] | None = None,
+        time_budget_ms: int = 200,
+    ) -> tuple[np.ndarray, KnapsackProblem]:
+        """Liquidatable rows and the knapsack over them (recovery value under gas and per-token
+        liquidity). The problem holds copies, so it can be solved off the event loop while the
+        book keeps changing; its item i is rows[i]."""
+        rows = self.liquidatable_rows(threshold).copy()
+        weights, capacities = [], []
+        if max_gas is not None:
+            weights.append(self.gas_estimate[rows].astype(np.float64))
+            capacities.append(max_gas)
+        for token, cap in (liquidity or {}).items():
+            if cap is None:
+                continue
+            col = self.debt_columns.get(token)
+            weights.append(col[rows] if col is not None else np.zeros(len(rows)))
+            capacities.append(cap)
+        return rows, KnapsackProblem(
+            self.recovery_values(rows),
+            np.asarray(weights, dtype=np.float64).reshape(len(capacities), len(rows)),
+            capacities,
+            time_budget_ms,
+        )
+
+    def select(
+        self,
+        threshold: float = 1.0,
+        max_gas: int | None = None,
+        liquidity: dict[str, float] | None = None,
+        time_budget_ms: int = 200,
+    ) -> tuple[np.ndarray, KnapsackResult]:
+        """Liquidatable rows chosen to maximize recovery value under gas and per-token liquidity."""
+        rows, problem = self.select_problem(threshold, max_gas, liquidity, time_budget_ms)
+        result = solve_knapsack(problem.values, problem.weights, problem.capacities, problem.time_budget_ms)
+        return rows[result.selected], result
+
+    def to_models(self, rows: np.ndarray) -> list[PositionToLiquidate]:
+        out = []
+        for row in rows.tolist():
+            debts = {t: float(col[row]) for t, col in self.debt_columns.items() if col[row]}
+            out.append(PositionToLiquidate(
+                position_id=self.position_ids[row],
+                collateral=self.collateral[row],
+                debt=self.debt[row],
+                health_factor=float(self.health_factor[row]),
+                liquidation_bonus=float(self.liquidation_bonus[row]),
+                gas_estimate=int(self.gas_estimate[row]),
+                debt_amounts=debts or None,
+            ))
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "positions": len(self),
+            "capacity": self.capacity,
+            "tokens": sorted(self.debt_columns),
+            "liquidatable": int(len(self.liquidatable_rows(1.0))),
+            "min_health_factor": float(self._hf_values[0]) if len(self._hf_values) else None,
+            "version": self.version,
+        }
+
+
+_book: PositionBook | None = None
+
+
+def get_position_book() -> PositionBook:
+    global _book
+    if _book is None:
+        _book = PositionBook()
+    return _book
@@ -0,0 +1,294 @@
+"""
+Rolling price history and correlation index over pool reserve snapshots.
+
+Each refresh of the pool list records one sample per pool: the log price of token0 in token1,
+log(reserve1 / reserve0). Log returns live in a fixed-size ring buffer (window x pools) with a
+validity mask (a pool missing from a snapshot, or new, has no return for that row).
+
+Pairwise statistics are kept as running sums over rows where both pools have a return: counts N,
+sums Sx (Sx[i, j] = sum of r_i), Sxx and cross products Sxy. A new sample adds its outer
+products and the evicted row subtracts its own, so updating the covariance/correlation inputs is
+O(P^2) vectorized per snapshot; the sums are rebuilt from the ring once per window to stop
+floating-point drift.
+
+The sums are dense (P x P), so at most PRICE_HISTORY_MAX_POOLS pools are tracked. Pools already
+tracked keep their column; new pools take free columns in snapshot order and the rest are
+skipped (counted in stats()). A column whose pool has been absent for a whole window holds no
+returns any more and is freed for reuse.
+
+Correlation index: a pool's correlation row is computed from its row of the sums (O(P)) and
+argsorted on the first query after each new sample, so "most anti-correlated pools for token X"
+reads K entries off that order without building the P x P matrix. A token's price series is its
+deepest pool (largest reserve of that token), with the sign flipped when the token is token1 of
+that pool.
+
+record() runs off the event loop (record_prices through the solver executor, kind="thread");
+every read and write holds `lock`.
+"""
+
+import threading
+
+import numpy as np
+
+from core.config import settings
+
+_INITIAL_POOLS = 64
+
+
+class PriceHistory:
+    def __init__(self, window: int | None = None, min_samples: int | None = None, max_pools: int | None = None):
+        self.window = window or settings.PRICE_HISTORY_WINDOW
+        self.min_samples = min_samples or settings.PRICE_HISTORY_MIN_SAMPLES
+        self.max_pools = max_pools or settings.PRICE_HISTORY_MAX_POOLS
+        self.lock = threading.RLock()
+        self.pool_ids: list[str | None] = []  # column -> pool address; None = free column
+        self.pool_tokens: list[tuple[str, str] | None] = []
+        self.col_of: dict[str, int] = {}
+        self.reference: dict[str, tuple[int, int]] = {}  # token -> (pool column, sign)
+        self.untracked = 0  # pools skipped in the last snapshot (no free column)
+        cap = min(_INITIAL_POOLS, self.max_pools)
+        self._last = np.full(cap, np.nan)  # last log price per pool
+        self._seen = np.full(cap, -1, dtype=np.int64)  # sample in which the column's pool last appeared
+        self._free: list[int] = []
+        self._ret = np.zeros((self.window, cap))
+        self._mask = np.zeros((self.window, cap), dtype=bool)
+        self._n = np.zeros((cap, cap))
+        self._sx = np.zeros((cap, cap))
+        self._sxx = np.zeros((cap, cap))
+        self._sxy = np.zeros((cap, cap))
+        self._head = 0
+        self.samples = 0  # snapshots recorded
+        self._index_version = -1
+        self._rows: dict[int, np.ndarray] = {}  # column -> correlation row for the current sample
+        self._orders: dict[int, tuple[np.ndarray, int]] = {}  # column -> (argsort of row, finite count)
+
+    def __len__(self) -> int:
+        return len(self.col_of)
+
+    def _grow(self) -> None:
+        old = self._last.shape[0]
+        cap = min(old * 2, self.max_pools)
+        extra = cap - old
+        self._last = np.concatenate([self._last, np.full(extra, np.nan)])
+        self._seen = np.concatenate([self._seen, np.full(extra, -1, dtype=np.int64)])
+        self._ret = np.concatenate([self._ret, np.zeros((self.window, extra))], axis=1)
+        self._mask = np.concatenate([self._mask, np.zeros((self.window, extra), dtype=bool)], axis=1)
+        for name in ("_n", "_sx", "_sxx", "_sxy"):
+            m = np.zeros((cap, cap))
+            m[:old, :old] = getattr(self, name)
+            setattr(self, name, m)
+
+    def _release_stale(self) -> None:
+        """Free columns whose pool has not appeared for a whole window (no return left in the ring)."""
+        p = len(self.pool_ids)
+        stale = [
+            int(col) for col in np.flatnonzero(self._seen[:p] < self.samples - self.window)
+            if self.pool_ids[col] is not None
+        ]
+        if not stale:
+            return
+        for col in stale:
+            del self.col_of[self.pool_ids[col]]
+            self.pool_ids[col] = None
+            self.pool_tokens[col] = None
+            self._last[col] = np.nan
+            for m in (self._n, self._sx, self._sxx, self._sxy):
+                m[col, :] = 0.0
+                m[:, col] = 0.0
+        freed = set(stale)
+        self.reference = {t: ref for t, ref in self.reference.items() if ref[0] not in freed}
+        self._free.extend(sorted(stale, reverse=True))
+
+    def _column(self, address: str, tokens) -> int | None:
+        col = self.col_of.get(address)
+        if col is not None:
+            return col
+        if self._free:
+            col = self._free.pop()
+            self.pool_ids[col] = address
+            self.pool_tokens[col] = (tokens[0], tokens[1])
+        elif len(self.pool_ids) < self.max_pools:
+            col = len(self.pool_ids)
+            if col == self._last.shape[0]:
+                self._grow()
+            self.pool_ids.append(address)
+            self.pool_tokens.append((tokens[0], tokens[1]))
+        else:
+            return None
+        self.col_of[address] = col
+        return col
+
+    def _accumulate(self, r: np.ndarray, m: np.ndarray, sign: float) -> None:
+        mf = m.astype(np.float64)
+        self._n += sign * np.outer(mf, mf)
+        self._sx += sign * np.outer(r, mf)
+        self._sxx += sign * np.outer(r * r, mf)
+        self._sxy += sign * np.outer(r, r)
+
+    def _rebuild_sums(self) -> None:
+        r, mf = self._ret, self._mask.astype(np.float64)
+        self._n = mf.T @ mf
+        self._sx = r.T @ mf
+        self._sxx = (r * r).T @ mf
+        self._sxy = r.T @ r
+
+    def record(self, pools: list) -> None:
+        """Add one snapshot (fetcher pool dicts or PoolInput models)."""
+        with self.lock:
+            self._record(pools)
+
+    def _record(self, pools: list) -> None:
+        if len(self.pool_ids) >= self.max_pools:
+            self._release_stale()
+        depth: dict[str, float] = {}
+        prices = []
+        untracked = 0
+        for p in pools:
+            address, tokens, reserves = (p["address"], p["tokens"], p["reserves"]) if isinstance(p, dict) else (p.address, p.tokens, p.reserves)
+            r0, r1 = float(reserves[0]), float(reserves[1])
+            if r0 <= 0 or r1 <= 0:
+                continue
+            col = self._column(address, tokens)
+            if col is None:
+                untracked += 1
+                continue
+            self._seen[col] = self.samples
+            prices.append((col, np.log(r1 / r0)))
+            for side, (token, reserve) in enumerate(((tokens[0], r0), (tokens[1], r1))):
+                if reserve > depth.get(token, 0.0):
+                    depth[token] = reserve
+                    self.reference[token] = (col, 1 if side == 0 else -1)
+        self.untracked = untracked
+        cap = self._last.shape[0]
+        r = np.zeros(cap)
+        m = np.zeros(cap, dtype=bool)
+        for col, lp in prices:
+            if np.isfinite(self._last[col]):
+                r[col] = lp - self._last[col]
+                m[col] = True
+            self._last[col] = lp
+        if self.samples >= self.window:
+            self._accumulate(self._ret[self._head], self._mask[self._head], -1.0)
+        self._ret[self._head], self._mask[self._head] = r, m
+        self._accumulate(r, m, 1.0)
+        self._head = (self._head + 1) % self.window
+        self.samples += 1
+        if self.samples % self.window == 0:
+            self._rebuild_sums()
+
+    def _row(self, col: int) -> np.ndarray:
+        """Correlation of pool `col` with every column over the rows both have; NaN below
+        min_samples and for free columns. Cached until the next sample."""
+        if self._index_version != self.samples:
+            self._rows.clear()
+            self._orders.clear()
+            self._index_version = self.samples
+        row = self._rows.get(col)
+        if row is not None:
+            return row
+        p = len(self.pool_ids)
+        n = self._n[col, :p]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_i = self._sx[col, :p] / n
+            mean_j = self._sx[:p, col] / n
+            cov = self._sxy[col, :p] / n - mean_i * mean_j
+            var_i = self._sxx[col, :p] / n - mean_i * mean_i
+            var_j = self._sxx[:p, col] / n - mean_j * mean_j
+            row = cov / np.sqrt(var_i * var_j)
+        row[(n < self.min_samples) | (var_i <= 1e-18) | (var_j <= 1e-18)] = np.nan
+        row = np.clip(row, -1.0, 1.0)
+        row[col] = 1.0
+        self._rows[col] = row
+        return row
+
+    def _order(self, col: int) -> tuple[np.ndarray, int]:
+        row = self._row(col)
+        entry = self._orders.get(col)
+        if entry is None:
+            finite = np.isfinite(row)
+            entry = (np.argsort(np.where(finite, row, np.inf), kind="stable"), int(finite.sum()))
+            self._orders[col] = entry
+        return entry
+
+    def reference_pool(self, token: str) -> str | None:
+        """Address of the pool whose price stands for `token`."""
+        with self.lock:
+            ref = self.reference.get(token)
+            return self.pool_ids[ref[0]] if ref else None
+
+    def token_correlation(self, token_a: str, token_b: str) -> float | None:
+        with self.lock:
+            ra, rb = self.reference.get(token_a), self.reference.get(token_b)
+            if ra is None or rb is None:
+                return None
+            c = self._row(ra[0])[rb[0]]
+            return None if not np.isfinite(c) else float(ra[1] * rb[1] * c)
+
+    def correlations_with(self, token: str, others) -> dict[str, float]:
+        """Correlation of `token` with each of `others` that has enough shared history."""
+        out = {}
+        with self.lock:
+            for other in others:
+                if other != token:
+                    c = self.token_correlation(token, other)
+                    if c is not None:
+                        out[other] = c
+        return out
+
+    def anti_correlated(self, token: str, k: int = 10) -> list[dict]:
+        """Up to k pools (not containing `token`) whose token0 price is most negatively correlated
+        with `token`, read off the sorted row of its reference pool."""
+        with self.lock:
+            ref = self.reference.get(token)
+            if ref is None or k <= 0:
+                return []
+            col, sign = ref
+            corr = self._row(col)
+            row, finite = self._order(col)
+            # sign +1: ascending correlations are most negative first; sign -1: read from the top down.
+            positions = range(finite) if sign > 0 else range(finite - 1, -1, -1)
+            out = []
+            for pos in positions:
+                q = int(row[pos])
+                c = sign * float(corr[q])
+                if c >= 0:
+                    break
+                if token in self.pool_tokens[q]:
+                    continue
+                out.append({
+                    "pool": self.pool_ids[q],
+                    "tokens": list(self.pool_tokens[q]),
+                    "correlation": round(c, 6),
+                    "samples": int(self._n[col, q]),
+                })
+                if len(out) >= k:
+                    break
+            return out
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "pools": len(self),
+                "max_pools": self.max_pools,
+                "untracked_pools": self.untracked,
+                "tokens": len(self.reference),
+                "samples": self.samples,
+                "window": self.window,
+                "filled": min(self.samples, self.window),
+                "min_samples": self.min_samples,
+            }
+
+
+_history: PriceHistory | None = None
+
+
+def get_price_history() -> PriceHistory:
+    global _history
+    if _history is None:
+        _history = PriceHistory()
+    return _history
+
+
+async def record_prices(pools: list) -> None:
+    """Executor entry for the refresh loop; run with kind="thread" (the history is process-local)."""
+    get_price_history().record(pools)
@@ -3,7 +3,7 @@ Quantum simulation service using classical simulators (QUBO + simulated annealin
 
 Three modules (see README "Functions and Algorithms" for full description):
 
-1. Arbitrage Pathfinder: best swap path across pools (graph + AMM formula + optional neal).
+1. Arbitrage Pathfinder: best swap path across pools (graph + AMM formula + path-selection QUBO via neal).
 2. Transaction Scheduler: assign orders to slots to avoid conflicts (conflict matrix + greedy graph coloring).
 3. Liquidation Optimizer: select positions to liquidate (sort by health factor, take top K).
 
@@ -13,153 +13,156 @@ Proof-of-concept: same interface as future real quantum backend.
 import time
 from typing import Optional
 
+import numpy as np
+
 from models.quantum import (
     ArbitrageRequest,
     ArbitrageResponse,
     ArbitrageComparison,
+    SplitAllocation,
+    TradeSizeCandidate,
     TransactionRef,
+    CycleScanRequest,
+    CycleScanResponse,
+    ArbitrageCycleEntry,
     SchedulerRequest,
     SchedulerResponse,
     SchedulerComparison,
+    ColoringStrategyResult,
     LiquidationRequest,
     LiquidationResponse,
     LiquidationComparison,
 )
+from services.coloring import STRATEGIES, SlotCapacity, color_graph, improve_coloring, order_gas, pipeline_schedule
+from services.conflict_graph import ConflictGraph, DependencyDAG
+from services.cycle_scanner import get_cycle_scanner
+from services.knapsack import KnapsackResult, solve_knapsack
 from services.demo_pools import get_extended_demo_pools
+from services.path_engine import RouteSearchResult, best_output_path
+from services.path_eval import best_of, compose_paths, optimal_inputs, pack_paths
+from services.pool_graph import PoolGraph, get_live_pool_graph, graph_for_pools
+from services.qubo_solver import knapsack_qubo, one_hot_index, path_selection_qubo, solve_qubo
+from services.split_router import SplitRoute, split_route
 
+_PATH_QUBO_CANDIDATES = 5
+_KNAPSACK_QUBO_MAX_ITEMS = 48
 
-def _arbitrage_qubo_classical(pools: list, token_in: str, token_out: str, amount_in: float) -> tuple[list[str], float, float]:
-    """Classical pathfinding: best path and profit. Used as baseline and for 'quantum' result in PoC."""
-    import networkx as nx
-
-    G = nx.DiGraph()
-    for p in pools:
-        t0, t1 = p["tokens"][0], p["tokens"][1]
-        r0, r1 = p["reserves"][0], p["reserves"][1]
-        fee = 1 - (p.get("fee", 300) / 10000)
-        # swap t0 -> t1: amount_out = (amount_in * r1 * fee) / (r0 + amount_in * fee)
-        def out_a_b(a, r_a, r_b, f):
-            return (a * r_b * f) / (r_a + a * f) if r_a and (r_a + a * f) else 0
-        G.add_edge(t0, t1, pool=p["address"], reserve_in=r0, reserve_out=r1, fee=fee)
-        G.add_edge(t1, t0, pool=p["address"], reserve_in=r1, reserve_out=r0, fee=fee)
-
-    try:
-        paths = list(nx.all_simple_paths(G, token_in, token_out, cutoff=5))
-    except (nx.NodeNotFound, nx.NetworkXNoPath):
-        return [token_in, token_out], 0.0, 0.0
-
-    best_path = [token_in]
-    best_profit = 0.0
-    best_amount_out = 0.0
-
-    for path in paths:
-        if len(path) < 2:
-            continue
-        amt = amount_in
-        for i in range(len(path) - 1):
-            u, v = path[i], path[i + 1]
-            edge = G[u][v]
-            amt = (amt * edge["reserve_out"] * edge["fee"]) / (edge["reserve_in"] + amt * edge["fee"])
-        if amt > best_amount_out:
-            best_amount_out = amt
-            best_path = path
+
+def _arbitrage_qubo_classical(graph: PoolGraph, token_in: str, token_out: str, amount_in: float, max_hops: int = 5, top_k: int = 1) -> tuple[list[str], float, float, list[int], RouteSearchResult]:
+    """Full path search (bounded label-setting, see services/path_engine). Used for the 'quantum' result in PoC.
+    Returns (path, profit, amount_out, edges, search)."""
+    search = best_output_path(graph, token_in, token_out, amount_in, max_hops=max_hops, top_k=top_k)
+    if search.best is None:
+        return [token_in, token_out], 0.0, 0.0, [], search
+    best_edges = search.best.edges
+    best_amount_out = search.best.amount_out
 
     # "Profit" vs direct swap if exists
-    direct_out = 0.0
-    if G.has_edge(token_in, token_out):
-        e = G[token_in][token_out]
-        direct_out = (amount_in * e["reserve_out"] * e["fee"]) / (e["reserve_in"] + amount_in * e["fee"])
+    _, direct_out = graph.best_edge(token_in, token_out, amount_in)
     profit = best_amount_out - direct_out if direct_out else best_amount_out
 
-    return best_path, float(profit), float(best_amount_out)
+    return graph.path_tokens(best_edges), float(profit), float(best_amount_out), best_edges, search
 
 
-def _arbitrage_classical_baseline(pools: list, token_in: str, token_out: str, amount_in: float) -> tuple[list[str], float, float]:
+def _arbitrage_classical_baseline(graph: PoolGraph, token_in: str, token_out: str, amount_in: float) -> tuple[list[str], float, float, list[int]]:
     """Classical baseline: only direct swap or 2-hop paths (greedy local optimum; no 3+ hop search)."""
-    import networkx as nx
-    G = nx.DiGraph()
-    for p in pools:
-        t0, t1 = p["tokens"][0], p["tokens"][1]
-        r0, r1 = p["reserves"][0], p["reserves"][1]
-        fee = 1 - (p.get("fee", 300) / 10000)
-        G.add_edge(t0, t1, pool=p["address"], reserve_in=r0, reserve_out=r1, fee=fee)
-        G.add_edge(t1, t0, pool=p["address"], reserve_in=r1, reserve_out=r0, fee=fee)
     # Classical: only direct or 2-hop (max path length = 3 nodes) — local optimum
-    if G.has_edge(token_in, token_out):
-        e = G[token_in][token_out]
-        direct_out = (amount_in * e["reserve_out"] * e["fee"]) / (e["reserve_in"] + amount_in * e["fee"])
-        direct_out = float(direct_out)
-        # Still consider 2-hop; take best of direct vs best 2-hop
-        best_out = direct_out
-        best_path = [token_in, token_out]
-    else:
-        best_out = 0.0
-        best_path = [token_in, token_out]
-    try:
-        paths_2hop = list(nx.all_simple_paths(G, token_in, token_out, cutoff=2))
-    except (nx.NodeNotFound, nx.NetworkXNoPath):
-        paths_2hop = []
-    for path in paths_2hop:
-        if len(path) < 2:
-            continue
-        amt = amount_in
-        for i in range(len(path) - 1):
-            u, v = path[i], path[i + 1]
-            edge = G[u][v]
-            amt = (amt * edge["reserve_out"] * edge["fee"]) / (edge["reserve_in"] + amt * edge["fee"])
-            if amt <= 0:
-                break
-        if amt > best_out:
-            best_out = amt
-            best_path = path
-    direct_out = 0.0
-    if G.has_edge(token_in, token_out):
-        e = G[token_in][token_out]
-        direct_out = (amount_in * e["reserve_out"] * e["fee"]) / (e["reserve_in"] + amount_in * e["fee"])
+    _, direct_out = graph.best_edge(token_in, token_out, amount_in)
+    best_edges, best_out = best_of(graph, list(graph.simple_paths(token_in, token_out, cutoff=2)), amount_in)
+    best_path = graph.path_tokens(best_edges) if best_out > 0 else [token_in, token_out]
     profit = best_out - direct_out if direct_out else best_out
-    return best_path, float(profit), float(best_out)
+    return best_path, float(profit), float(best_out), best_edges
+
+
+def _reference_rate(graph: PoolGraph, req: ArbitrageRequest) -> float | None:
+    """token_out per token_in used to value profit when sizing: explicit, 1 for cycles, else direct pool mid price."""
+    if req.reference_rate is not None:
+        return req.reference_rate if req.reference_rate > 0 else None
+    if req.token_in == req.token_out:
+        return 1.0
+    edge, _ = graph.best_edge(req.token_in, req.token_out, req.amount_in)
+    if edge is None or not graph.reserve_in[edge]:
+        return None
+    return float(graph.reserve_out[edge] / graph.reserve_in[edge])
+
+
+def _optimize_trade_sizes(graph: PoolGraph, candidates: list, reference_rate: float, max_amount: float | None) -> list[TradeSizeCandidate]:
+    """Closed-form profit-maximizing input for each candidate path (see path_eval.compose_paths)."""
+    if not candidates:
+        return []
+    batch = pack_paths([c.edges for c in candidates])
+    A, C = compose_paths(graph, batch)
+    amounts_in, amounts_out, profits = optimal_inputs(A, C, reference_rate, max_amount)
+    sized = []
+    for i in np.argsort(-profits):
+        edges = batch.path(int(i))
+        amount_in = float(amounts_in[i])
+        sized.append(TradeSizeCandidate(
+            path=graph.path_tokens(edges),
+            optimal_amount_in=round(amount_in, 6),
+            amount_out=round(float(amounts_out[i]), 6),
+            profit=round(float(profits[i]), 6),
+            transactions=[
+                TransactionRef(pool=graph.edge_pool_address(e), action="swap", amount=amount_in if h == 0 else 0)
+                for h, e in enumerate(edges)
+            ],
+        ))
+    return sized
+
+
+def _split_allocations(graph: PoolGraph, route: SplitRoute | None) -> list[SplitAllocation]:
+    """Per-leg allocations of a split route as TransactionRef lists (amount on each leg's first hop)."""
+    if route is None:
+        return []
+    return [
+        SplitAllocation(
+            path=graph.path_tokens(leg.edges),
+            amount_in=round(leg.amount_in, 6),
+            amount_out=round(leg.amount_out, 6),
+            transactions=[
+                TransactionRef(pool=graph.edge_pool_address(e), action="swap", amount=leg.amount_in if h == 0 else 0)
+                for h, e in enumerate(leg.edges)
+            ],
+        )
+        for leg in route.legs
+    ]
+
+
+async def _arbitrage_graph(req: ArbitrageRequest) -> PoolGraph:
+    """Pool graph for an arbitrage request: extended demo, caller pools, or the shared live graph."""
+    if req.use_extended_demo:
+        return graph_for_pools(get_extended_demo_pools())
+    if req.pools:
+        return graph_for_pools(req.pools)
+    return await get_live_pool_graph()
 
 
 async def solve_arbitrage(req: ArbitrageRequest) -> ArbitrageResponse:
     """Arbitrage: compare classical (greedy 2-hop = local optimum) vs quantum (full path = global optimum)."""
-    if req.use_extended_demo:
-        pools = get_extended_demo_pools()
-    else:
-        pools = [p.model_dump() for p in req.pools]
+    graph = await _arbitrage_graph(req)
+    max_hops = min(5, req.max_hops)
 
     # Classical: direct or first 2-hop only
     t_classical = time.perf_counter()
-    classical_path, classical_profit, classical_amount_out = _arbitrage_classical_baseline(
-        pools, req.token_in, req.token_out, req.amount_in
+    classical_path, classical_profit, classical_amount_out, _ = _arbitrage_classical_baseline(
+        graph, req.token_in, req.token_out, req.amount_in
     )
     classical_time_ms = (time.perf_counter() - t_classical) * 1000
 
-    # Quantum: full path search (all simple paths up to max_hops)
+    # Quantum: full path search (best-output label-setting up to max_hops)
     t_quantum = time.perf_counter()
-    path, profit, quantum_amount_out = _arbitrage_qubo_classical(
-        pools, req.token_in, req.token_out, req.amount_in
+    path, profit, quantum_amount_out, edges, search = _arbitrage_qubo_classical(
+        graph, req.token_in, req.token_out, req.amount_in, max_hops,
+        top_k=max(req.size_candidates if req.optimize_amount else 1, _PATH_QUBO_CANDIDATES if req.path_qubo else 1),
     )
-    paths_evaluated = 0
-    try:
-        import networkx as nx
-        G = nx.DiGraph()
-        for p in pools:
-            t0, t1 = p["tokens"][0], p["tokens"][1]
-            G.add_edge(t0, t1)
-            G.add_edge(t1, t0)
-        paths_evaluated = len(list(nx.all_simple_paths(G, req.token_in, req.token_out, cutoff=min(5, req.max_hops))))
-    except Exception:
-        pass
-    try:
-        import dimod
-        import neal
-        bqm = dimod.AdjVectorBQM(dimod.BINARY)
-        for i in range(min(10, len(path) * 2)):
-            bqm.linear[i] = 0.1
-        sampler = neal.SimulatedAnnealingSampler()
-        _ = sampler.sample(bqm, num_reads=100)
-    except Exception:
-        pass
+    qubo = None
+    chosen = None
+    if req.path_qubo and len(search.candidates) > 1:
+        # Opt-in path selection QUBO over the engine's candidates: one-hot choice maximizing output.
+        # The annealer works on normalized outputs and may be unseeded, so its pick is only
+        # reported; the route stays the search's best.
+        qubo = solve_qubo(*path_selection_qubo([c.amount_out for c in search.candidates]), options=req.solver)
+        chosen = one_hot_index(qubo.sample)
     quantum_time_ms = (time.perf_counter() - t_quantum) * 1000
 
     # Compare by output amount (apples to apples)
@@ -168,12 +171,10 @@ async def solve_arbitrage(req: ArbitrageRequest) -> ArbitrageResponse:
         improvement_pct = round((quantum_amount_out - classical_amount_out) / classical_amount_out * 100, 2)
     winner = "quantum" if quantum_amount_out >= classical_amount_out else "classical"
 
-    transactions = []
-    for i in range(len(path) - 1):
-        for p in req.pools:
-            if {path[i], path[i + 1]} == set(p.tokens):
-                transactions.append(TransactionRef(pool=p.address, action="swap", amount=req.amount_in if i == 0 else 0))
-                break
+    transactions = [
+        TransactionRef(pool=graph.edge_pool_address(e), action="swap", amount=req.amount_in if i == 0 else 0)
+        for i, e in enumerate(edges)
+    ]
 
     comparison = ArbitrageComparison(
         classical_path=classical_path,
@@ -185,22 +186,46 @@ async def solve_arbitrage(req: ArbitrageRequest) -> ArbitrageResponse:
         improvement_pct=improvement_pct,
         winner=winner,
     )
-    if not transactions and path and len(path) >= 2 and pools:
-        for i in range(len(path) - 1):
-            for p in pools:
-                if {path[i], path[i + 1]} == set(p["tokens"]):
-                    transactions.append(TransactionRef(pool=p["address"], action="swap", amount=req.amount_in if i == 0 else 0))
-                    break
     if not transactions and req.pools:
         transactions = [TransactionRef(pool=req.pools[0].address, action="swap", amount=req.amount_in)]
 
+    trade_sizes = None
+    reference_rate = None
+    if req.optimize_amount:
+        reference_rate = _reference_rate(graph, req)
+        trade_sizes = (
+            _optimize_trade_sizes(graph, search.candidates[:max(1, req.size_candidates)], reference_rate, req.max_amount_in)
+            if reference_rate is not None else []
+        )
+
+    split_allocations = None
+    split_amount_out = None
+    route = None
+    if req.split_routes:
+        route = split_route(graph, req.token_in, req.token_out, req.amount_in, max_hops, req.max_splits)
+        split_allocations = _split_allocations(graph, route)
+        split_amount_out = round(route.amount_out, 2) if route else 0.0
+
     quantum_metrics = {
-        "paths_evaluated": paths_evaluated,
-        "max_hops": min(5, req.max_hops),
+        "paths_evaluated": search.paths_completed,
+        "states_expanded": search.states_expanded,
+        "states_pruned": search.states_pruned,
+        "max_hops": max_hops,
         "solver_ms": round(quantum_time_ms, 2),
-        "qubo_approx_vars": min(10, len(path) * 2),
-        "annealing_reads": 100,
+        "qubo_approx_vars": qubo.num_vars if qubo else 0,
+        "annealing_reads": qubo.num_reads if qubo else 0,
     }
+    if qubo is not None:
+        quantum_metrics.update(qubo.metrics())
+        quantum_metrics["qubo_choice_rank"] = chosen + 1 if chosen is not None else None
+        quantum_metrics["qubo_choice_amount_out"] = round(search.candidates[chosen].amount_out, 6) if chosen is not None else None
+    if req.optimize_amount:
+        quantum_metrics["reference_rate"] = reference_rate
+        quantum_metrics["paths_sized"] = len(trade_sizes)
+    if route is not None:
+        quantum_metrics["split_legs"] = len(route.legs)
+        quantum_metrics["split_candidates"] = route.candidates_considered
+        quantum_metrics["split_gain_pct"] = round((route.amount_out - route.single_path_out) / max(route.single_path_out, 1e-12) * 100, 4)
     return ArbitrageResponse(
         optimal_path=path,
         expected_profit=round(quantum_amount_out, 2),
@@ -209,64 +234,74 @@ async def solve_arbitrage(req: ArbitrageRequest) -> ArbitrageResponse:
         classical_baseline=round(classical_profit, 2),
         comparison=comparison,
         quantum_metrics=quantum_metrics,
+        trade_sizes=trade_sizes,
+        split_allocations=split_allocations,
+        split_amount_out=split_amount_out,
     )
 
 
-def _build_conflict_matrix(orders: list) -> list[list[int]]:
-    """Build conflict matrix: 1 if two orders share a write."""
-    n = len(orders)
-    M = [[0] * n for _ in range(n)]
-    for i in range(n):
-        wi = getattr(orders[i], "writes", None) or []
-        for j in range(i + 1, n):
-            wj = getattr(orders[j], "writes", None) or []
-            if set(wi) & set(wj):
-                M[i][j] = M[j][i] = 1
-    return M
-
-
-def _schedule_orders_classical(orders: list, conflict_matrix: list[list[int]]) -> dict[str, list[str]]:
-    """Greedy graph coloring to assign orders to slots (minimize conflicts)."""
-    n = len(orders)
-    if n == 0:
+async def solve_cycle_scan(req: CycleScanRequest) -> CycleScanResponse:
+    """Profitable cycles over the live pool graph (kept current by the refresh loop in main.py)."""
+    graph = await get_live_pool_graph()
+    scanner = get_cycle_scanner()
+    with scanner.lock:  # the refresh loop updates the same scanner
+        if req.rescan or scanner.graph_version != graph.version:
+            scanner.refresh(graph, None, budget_ms=req.budget_ms)
+        return CycleScanResponse(
+            cycles=[ArbitrageCycleEntry(**c) for c in scanner.top(graph, max(0, req.top_k))],
+            cycles_tracked=len(scanner.cycles),
+            complete=scanner.complete,
+            graph_version=scanner.graph_version,
+            scan_ms=round(scanner.last_scan_ms, 2),
+            sources_scanned=scanner.last_sources_scanned,
+        )
+
+
+def _build_conflict_graph(orders: list, conflict_matrix: list[list[int]] | None = None, hazards: str = "rw") -> ConflictGraph:
+    """Sparse conflict graph: two orders conflict if they share a key one of them writes (or per the given matrix)."""
+    if conflict_matrix is not None:
+        return ConflictGraph.from_matrix(conflict_matrix)
+    return ConflictGraph.from_orders(orders, hazards)
+
+
+def _schedule_from_colors(orders: list, colors: list[int]) -> dict[str, list[str]]:
+    """Group order ids by slot (color); slot ids are 1-based."""
+    if not orders:
         return {"slot_1": []}
-    # Greedy coloring
-    color = [-1] * n
-    for u in range(n):
-        used = set()
-        for v in range(n):
-            if conflict_matrix[u][v] == 1 and color[v] != -1:
-                used.add(color[v])
-        c = 0
-        while c in used:
-            c += 1
-        color[u] = c
-    slots: dict[str, list[str]] = {}
-    for u in range(n):
-        slot_id = f"slot_{color[u] + 1}"
-        if slot_id not in slots:
-            slots[slot_id] = []
-        order_id = getattr(orders[u], "id", None) or f"order_{u + 1}"
-        slots[slot_id].append(order_id)
-    return slots
+    by_slot: list[list[str]] = [[] for _ in range(max(colors) + 1)]
+    for u, c in enumerate(colors):
+        by_slot[c].append(getattr(orders[u], "id", None) or f"order_{u + 1}")
+    return {f"slot_{c + 1}": ids for c, ids in enumerate(by_slot) if ids}
 
 
 async def solve_scheduler(req: SchedulerRequest) -> SchedulerResponse:
     """Scheduler: compare classical (sequential = 1 order per slot) vs quantum (graph coloring = fewer slots)."""
     orders = req.pending_orders
-    if req.conflict_matrix is not None:
-        conflict_matrix = req.conflict_matrix
-    else:
-        conflict_matrix = _build_conflict_matrix(orders)
+    t0 = time.perf_counter()
+    graph = _build_conflict_graph(orders, req.conflict_matrix, req.hazards)
+    dag = None
+    if req.pipelined:
+        dag = DependencyDAG.from_graph(graph) if req.conflict_matrix is not None else DependencyDAG.from_orders(orders, req.hazards)
+    build_ms = (time.perf_counter() - t0) * 1000
     n = len(orders)
-    total_conflicts = sum(sum(row) for row in conflict_matrix) // 2
+    total_conflicts = graph.num_edges
 
     # Classical: sequential execution = each order in its own slot (N slots, no parallelism)
     classical_slots = n if n > 0 else 1
     classical_conflicts_remaining = 0
 
-    # Quantum: graph coloring = batch non-conflicting orders, fewer slots
-    schedule = _schedule_orders_classical(orders, conflict_matrix)
+    # Quantum: graph coloring = batch non-conflicting orders, fewer slots (bounded by slot capacity)
+    gas = [order_gas(o) for o in orders]
+    capacity = SlotCapacity(max_orders=req.max_orders_per_slot, max_gas=req.max_gas_per_slot)
+    colorings = {s: color_graph(graph, s, gas, capacity) for s in STRATEGIES}
+    chosen = colorings[req.strategy]
+    if req.local_search_ms:
+        chosen = improve_coloring(graph, chosen, req.local_search_ms, gas, capacity, seed=req.seed)
+        colorings[chosen.strategy] = chosen
+    if dag is not None:
+        # Slots are ordered: dependencies run in earlier slots, so write-after-read pairs can share one.
+        chosen = colorings["pipelined"] = pipeline_schedule(dag, gas, capacity)
+    schedule = _schedule_from_colors(orders, chosen.colors)
     quantum_slots = len(schedule)
     quantum_conflicts_remaining = 0
 
@@ -281,6 +316,7 @@ async def solve_scheduler(req: SchedulerRequest) -> SchedulerResponse:
         quantum_conflicts_remaining=quantum_conflicts_remaining,
         slots_reduction_pct=slots_reduction_pct,
         winner=winner,
+        strategies={name: ColoringStrategyResult(slots=c.num_slots, ms=round(c.ms, 2)) for name, c in colorings.items()},
     )
     quantum_metrics = {
         "graph_nodes": n,
@@ -288,12 +324,21 @@ async def solve_scheduler(req: SchedulerRequest) -> SchedulerResponse:
         "conflict_pairs": total_conflicts,
         "coloring_slots": quantum_slots,
         "classical_slots_baseline": classical_slots,
+        "conflict_build_ms": round(build_ms, 2),
+        "coloring_strategy": chosen.strategy,
+        "coloring_ms": round(chosen.ms, 2),
+        "hazards": req.hazards,
     }
+    if dag is not None:
+        quantum_metrics["dag_edges"] = dag.num_edges
+        quantum_metrics["hazard_counts"] = dag.hazards
     return SchedulerResponse(
         schedule=schedule,
         total_slots=quantum_slots,
         conflict_reduction=conflict_reduction,
-        conflict_matrix=conflict_matrix,
+        conflict_matrix=graph.to_matrix() if req.include_matrix else None,
+        conflict_edges=graph.edge_list() if req.include_edges else None,
+        dependency_edges=dag.edge_list() if dag is not None and req.include_edges else None,
         total_conflicts=total_conflicts,
         comparison=comparison,
         quantum_metrics=quantum_metrics,
@@ -304,6 +349,12 @@ def _recovery_score(p) -> float:
     return 0.9 + (p.liquidation_bonus or 0.1)
 
 
+def _recovery_value(p) -> float:
+    """Value recovered by liquidating p: recovery score times total debt repaid (score alone if unknown)."""
+    debt = sum(_debt_amounts(p).values())
+    return _recovery_score(p) * (debt if debt > 0 else 1.0)
+
+
 def _gas_est(p) -> int:
     return getattr(p, "gas_estimate", None) or 150_000
 
@@ -342,8 +393,26 @@ def _select_under_constraints(positions: list, max_gas: int | None, liquidity: d
     return selected, recovery, total_gas, violation
 
 
+def _liquidation_knapsack(positions: list, max_gas: int | None, liquidity: dict | None, time_budget_ms: int) -> KnapsackResult:
+    """Maximize total recovery value under the gas budget and every capped token's available liquidity."""
+    weights, capacities = [], []
+    if max_gas is not None:
+        weights.append([_gas_est(p) for p in positions])
+        capacities.append(max_gas)
+    for token, cap in (liquidity or {}).items():
+        if cap is not None:
+            weights.append([_debt_amounts(p).get(token, 0.0) for p in positions])
+            capacities.append(cap)
+    return solve_knapsack(
+        [_recovery_value(p) for p in positions],
+        np.asarray(weights, dtype=np.float64).reshape(len(capacities), len(positions)),
+        capacities,
+        time_budget_ms=time_budget_ms,
+    )
+
+
 async def solve_liquidation(req: LiquidationRequest) -> LiquidationResponse:
-    """Liquidation: classical = sort by health (first-fit under constraints); quantum = maximize recovery under constraints (knapsack-style)."""
+    """Liquidation: classical = sort by health (first-fit under constraints); quantum = maximize recovery value under gas and per-token liquidity (multi-dimensional knapsack: DP or branch and bound)."""
     t0 = time.perf_counter()
     positions = req.positions_to_liquidate
     max_gas = None
@@ -361,6 +430,29 @@ async def solve_liquidation(req: LiquidationRequest) -> LiquidationResponse:
     quantum_selected_list, quantum_recovery, quantum_gas, _ = _select_under_constraints(
         positions, max_gas, liquidity, order_key=lambda p: -_recovery_score(p)
     )
+    candidates = [quantum_selected_list]
+    qubo = None
+    if max_gas and positions:
+        # Knapsack QUBO over the gas budget; its pick seeds a constraint-checked pass (repairs liquidity/gas overshoot).
+        ranked = sorted(positions, key=lambda p: -_recovery_value(p) / _gas_est(p))[:_KNAPSACK_QUBO_MAX_ITEMS]
+        qubo = solve_qubo(*knapsack_qubo(
+            [_recovery_value(p) for p in ranked], [_gas_est(p) for p in ranked], float(max_gas)
+        ), options=req.solver)
+        picked = {id(p) for i, p in enumerate(ranked) if qubo.sample[i] > 0.5}
+        seeded = _select_under_constraints(
+            positions, max_gas, liquidity,
+            order_key=lambda p: (id(p) not in picked, -_recovery_value(p) / _gas_est(p)),
+        )
+        candidates.append(seeded[0])
+
+    # Exact / branch-and-bound multi-dimensional knapsack: gas plus one dimension per capped debt token.
+    knapsack = _liquidation_knapsack(positions, max_gas, liquidity, req.time_budget_ms)
+    candidates.append([positions[i] for i in knapsack.selected])
+    quantum_selected_list = max(candidates, key=lambda sel: sum(_recovery_value(p) for p in sel))
+    quantum_recovery = sum(_recovery_score(p) for p in quantum_selected_list) / max(len(quantum_selected_list), 1)
+    quantum_gas = sum(_gas_est(p) for p in quantum_selected_list)
+    recovery_value = sum(_recovery_value(p) for p in quantum_selected_list)
+    gap = max(0.0, (knapsack.upper_bound - recovery_value) / knapsack.upper_bound) if knapsack.upper_bound > 0 else 0.0
     selected = [p.position_id for p in quantum_selected_list]
     strategy = [
         {"position": p.position_id, "action": "liquidate", "priority": i + 1}
@@ -368,17 +460,21 @@ async def solve_liquidation(req: LiquidationRequest) -> LiquidationResponse:
     ]
     elapsed = (time.perf_counter() - t0) * 1000
 
+    # Compare on the objective both selections are constrained by: total recovery value.
+    classical_value = sum(_recovery_value(p) for p in classical_selected_list)
     improvement_pct = 0.0
-    if classical_recovery > 0:
-        improvement_pct = round((quantum_recovery - classical_recovery) / classical_recovery * 100, 2)
-    winner = "quantum" if quantum_recovery >= classical_recovery else "classical"
+    if classical_value > 0:
+        improvement_pct = round((recovery_value - classical_value) / classical_value * 100, 2)
+    winner = "quantum" if recovery_value >= classical_value else "classical"
 
     comparison = LiquidationComparison(
         classical_recovery=round(classical_recovery, 4),
+        classical_recovery_value=round(classical_value, 4),
         classical_selected=classical_selected,
         classical_gas_used=classical_gas if max_gas else None,
         classical_constraint_violation=classical_violation,
         quantum_recovery=round(quantum_recovery, 4),
+        quantum_recovery_value=round(recovery_value, 4),
         quantum_selected=selected,
         quantum_gas_used=quantum_gas if max_gas else None,
         improvement_pct=improvement_pct,
@@ -389,12 +485,22 @@ async def solve_liquidation(req: LiquidationRequest) -> LiquidationResponse:
         "positions_selected": len(selected),
         "solver_ms": round(elapsed, 2),
         "constraints_checked": "gas,liquidity" if (max_gas or liquidity) else "none",
+        "recovery_value": round(recovery_value, 4),
+        "knapsack_method": knapsack.method,
+        "knapsack_upper_bound": round(knapsack.upper_bound, 4),
+        "knapsack_nodes": knapsack.nodes,
+        "knapsack_ms": round(knapsack.ms, 2),
+        "optimality_gap": round(gap, 6),
     }
+    if qubo is not None:
+        quantum_metrics.update(qubo.metrics())
     return LiquidationResponse(
         selected_positions=selected,
         strategy=strategy,
         estimated_recovery=round(quantum_recovery, 4),
+        recovery_value=round(recovery_value, 4),
         simulation_time=round(elapsed, 2),
+        optimality_gap=round(gap, 6),
         comparison=comparison,
         quantum_metrics=quantum_metrics,
     )
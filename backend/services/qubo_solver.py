@@ -0,0 +1,164 @@
+"""
+QUBO formulations and a shared simulated-annealing sampler.
+
+Builders return a dense upper-triangular QUBO matrix Q plus a constant offset, so that
+energy(x) = x^T Q x + offset for binary x. solve_qubo() samples it with dwave-neal, reusing one
+sampler instance per thread, honoring num_reads / num_sweeps / seed and a wall-clock budget
+(through neal's interrupt_function). Without dimod/neal a small NumPy annealer is used instead.
+
+Formulations:
+- path selection: pick exactly one candidate path, maximizing normalized output (one-hot penalty)
+- top-K selection: pick exactly K sniper candidates, maximizing total score (cardinality penalty)
+- knapsack: maximize value under one capacity, with binary slack bits (log encoding)
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from models.quantum import SolverOptions
+
+_local = threading.local()
+
+
+@dataclass
+class QuboResult:
+    sample: np.ndarray  # best 0/1 assignment found
+    energy: float
+    num_vars: int
+    num_reads: int  # reads actually completed (fewer than requested if the budget ran out)
+    num_sweeps: int
+    solve_ms: float
+    sampler: str  # "neal" or "numpy"
+
+    def metrics(self, prefix: str = "qubo") -> dict:
+        return {
+            f"{prefix}_vars": self.num_vars,
+            f"{prefix}_energy": round(self.energy, 6),
+            f"{prefix}_ms": round(self.solve_ms, 2),
+            "annealing_reads": self.num_reads,
+            "annealing_sweeps": self.num_sweeps,
+            "sampler": self.sampler,
+        }
+
+
+def _neal_sampler():
+    sampler = getattr(_local, "sampler", None)
+    if sampler is None:
+        import neal
+        sampler = neal.SimulatedAnnealingSampler()
+        _local.sampler = sampler
+    return sampler
+
+
+def _energies(Q: np.ndarray, X: np.ndarray) -> np.ndarray:
+    return np.einsum("ri,ij,rj->r", X, Q, X)
+
+
+def _numpy_anneal(Q: np.ndarray, num_reads: int, num_sweeps: int, seed: int | None, deadline: float | None) -> tuple[np.ndarray, int]:
+    """Single-flip Metropolis annealing over all reads in parallel; fallback when neal is missing."""
+    rng = np.random.default_rng(seed)
+    n = Q.shape[0]
+    S = Q + Q.T - np.diag(np.diag(Q))  # symmetric couplings, diagonal = linear terms
+    X = rng.integers(0, 2, size=(num_reads, n)).astype(np.float64)
+    scale = max(float(np.abs(S).max()), 1e-12)
+    betas = np.geomspace(0.1 / scale, 10.0 / scale, num_sweeps)
+    rows = np.arange(num_reads)
+    for beta in betas:
+        for i in rng.permutation(n):
+            # Energy change of flipping bit i: (1 - 2x_i) * (Q_ii + sum_{j != i} S_ij x_j)
+            field = X @ S[i] - S[i, i] * X[:, i] + Q[i, i]
+            delta = (1 - 2 * X[:, i]) * field
+            accept = (delta <= 0) | (rng.random(num_reads) < np.exp(-beta * np.clip(delta, 0, None)))
+            X[rows[accept], i] = 1 - X[rows[accept], i]
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+    return X, num_reads
+
+
+def solve_qubo(Q: np.ndarray, offset: float = 0.0, options: SolverOptions | None = None) -> QuboResult:
+    """Sample the QUBO and return the lowest-energy assignment."""
+    options = options or SolverOptions()
+    t0 = time.perf_counter()
+    n = Q.shape[0]
+    if n == 0:
+        return QuboResult(np.zeros(0), offset, 0, 0, 0, 0.0, "none")
+    deadline = t0 + options.time_budget_ms / 1000 if options.time_budget_ms else None
+    try:
+        import dimod
+        bqm = dimod.BinaryQuadraticModel(Q, "BINARY")
+        sampleset = _neal_sampler().sample(
+            bqm,
+            num_reads=options.num_reads,
+            num_sweeps=options.num_sweeps,
+            seed=options.seed,
+            interrupt_function=(lambda: time.perf_counter() > deadline) if deadline else None,
+        )
+        best = sampleset.first
+        sample = np.array([best.sample[i] for i in range(n)], dtype=np.float64)
+        reads, sampler = len(sampleset), "neal"
+    except ImportError:
+        X, reads = _numpy_anneal(Q, options.num_reads, min(options.num_sweeps, 200), options.seed, deadline)
+        sample = X[int(np.argmin(_energies(Q, X)))]
+        sampler = "numpy"
+    energy = float(sample @ Q @ sample) + offset
+    return QuboResult(
+        sample=sample,
+        energy=energy,
+        num_vars=n,
+        num_reads=reads,
+        num_sweeps=options.num_sweeps,
+        solve_ms=(time.perf_counter() - t0) * 1000,
+        sampler=sampler,
+    )
+
+
+def _normalize(values) -> np.ndarray:
+    v = np.asarray(values, dtype=np.float64)
+    top = float(np.abs(v).max()) if v.size else 0.0
+    return v / top if top > 0 else v
+
+
+def _cardinality_qubo(values, k: int, penalty: float) -> tuple[np.ndarray, float]:
+    """-sum v_i x_i + P (sum x_i - k)^2 as (Q, offset). Values are min-max scaled to [0, 1]: with a
+    fixed cardinality a constant shift leaves the optimum unchanged but widens the energy gaps."""
+    v = np.asarray(values, dtype=np.float64)
+    if v.size:
+        spread = float(v.max() - v.min())
+        v = (v - v.min()) / spread if spread > 0 else np.ones_like(v)
+    n = len(v)
+    Q = np.triu(np.full((n, n), 2.0 * penalty), 1)
+    Q[np.diag_indices(n)] = -v + penalty * (1 - 2 * k)
+    return Q, penalty * k * k
+
+
+def path_selection_qubo(outputs) -> tuple[np.ndarray, float]:
+    """Choose exactly one path; outputs are the candidates' amounts out."""
+    return _cardinality_qubo(outputs, 1, penalty=1.5)
+
+
+def top_k_qubo(scores, k: int) -> tuple[np.ndarray, float]:
+    """Choose exactly k candidates maximizing total score."""
+    return _cardinality_qubo(scores, k, penalty=1.5)
+
+
+def knapsack_qubo(values, weights, capacity: float, slack_bits: int = 6) -> tuple[np.ndarray, float]:
+    """max sum v_i x_i s.t. sum w_i x_i <= capacity, as -v.x + P (w'.x + c.s - 1)^2 with w' = w / capacity
+    and slack bits s weighted c_j = 2^j / (2^m - 1). Item variables come first; slack bits follow."""
+    v = _normalize(values)
+    w = np.asarray(weights, dtype=np.float64) / capacity
+    c = 2.0 ** np.arange(slack_bits) / (2 ** slack_bits - 1)
+    a = np.concatenate([w, c])
+    penalty = 2.0 * max(1.0, float(v.max(initial=0.0)))
+    Q = np.triu(2.0 * penalty * np.outer(a, a), 1)
+    Q[np.diag_indices(len(a))] = penalty * (a * a - 2 * a)
+    Q[np.arange(len(v)), np.arange(len(v))] -= v
+    return Q, penalty
+
+
+def one_hot_index(sample: np.ndarray) -> int | None:
+    """Index of the single selected variable, or None if the sample is not one-hot."""
+    chosen = np.flatnonzero(sample > 0.5)
+    return int(chosen[0]) if len(chosen) == 1 else None
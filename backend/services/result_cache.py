@@ -0,0 +1,164 @@
+"""
+Request-level result cache for solver endpoints.
+
+Key = sha256(endpoint, canonical JSON of the request, pool snapshot key). For requests routed over
+the live pool graph the snapshot key is its content digest (PoolGraph.snapshot_key), so a pool
+refresh that changes reserves naturally misses; requests that carry their own pools are keyed on
+the body alone. Results of unseeded samplers are not reproducible, so callers pass
+deterministic=False and those requests are computed every time (counted as bypassed). Entries
+expire after POOL_CACHE_TTL_SECONDS. Tiers: an
+in-process LRU, then Redis when configured (shared by all workers). Concurrent identical
+requests are single-flighted: the first computes, the rest await the same task.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from pydantic import BaseModel
+
+from core.config import settings
+from services.memequbit_fetcher import get_redis
+from services.pool_graph import get_pool_graph
+
+_REDIS_PREFIX = "memequbit:result:"
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    redis_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0  # requests that waited on an identical in-flight computation
+    bypassed: int = 0  # nondeterministic requests computed without the cache
+    errors: int = 0
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.redis_hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "bypassed": self.bypassed,
+            "errors": self.errors,
+            "hit_rate": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def request_key(name: str, req: BaseModel, snapshot: str) -> str:
+    body = json.dumps(req.model_dump(mode="json"), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{name}\0{snapshot}\0{body}".encode()).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, max_entries: int | None = None, ttl_seconds: int | None = None):
+        self.max_entries = max_entries or settings.RESULT_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds or settings.POOL_CACHE_TTL_SECONDS
+        self._entries: OrderedDict[str, tuple[float, BaseModel]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._stats: dict[str, CacheStats] = {}
+        self.evictions = 0
+
+    def _get_local(self, key: str) -> BaseModel | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_local(self, key: str, value: BaseModel) -> None:
+        self._entries[key] = (time.time() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_compute(
+        self,
+        name: str,
+        req: BaseModel,
+        response_model: type[BaseModel],
+        compute: Callable[[], Awaitable[BaseModel]],
+        live_pools: bool = True,
+        deterministic: bool = True,
+    ) -> BaseModel:
+        """Cached result for (name, req[, current pool snapshot]), computing it at most once.
+        live_pools=False: req carries its own pools, so the live snapshot is not part of the key.
+        deterministic=False: the result depends on an unseeded sampler and is never cached."""
+        if not settings.RESULT_CACHE_ENABLED:
+            return await compute()
+        stats = self._stats.setdefault(name, CacheStats())
+        if not deterministic:
+            stats.bypassed += 1
+            return await compute()
+        key = request_key(name, req, get_pool_graph().snapshot_key() if live_pools else "")
+
+        value = self._get_local(key)
+        if value is not None:
+            stats.hits += 1
+            return value
+        task = self._inflight.get(key)
+        if task is not None:
+            stats.coalesced += 1
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(self._fill(key, response_model, compute, stats))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _fill(self, key: str, response_model: type[BaseModel], compute, stats: CacheStats) -> BaseModel:
+        redis = await get_redis()
+        if redis:
+            try:
+                raw = await redis.get(_REDIS_PREFIX + key)
+                if raw:
+                    value = response_model.model_validate_json(raw)
+                    stats.redis_hits += 1
+                    self._put_local(key, value)
+                    return value
+            except Exception:
+                pass
+        stats.misses += 1
+        try:
+            value = await compute()
+        except Exception:
+            stats.errors += 1
+            raise
+        self._put_local(key, value)
+        if redis:
+            try:
+                await redis.set(_REDIS_PREFIX + key, value.model_dump_json(), ex=self.ttl_seconds)
+            except Exception:
+                pass
+        return value
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.RESULT_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "evictions": self.evictions,
+            "in_flight": len(self._inflight),
+            "endpoints": {name: s.as_dict() for name, s in sorted(self._stats.items())},
+        }
+
+
+_cache: ResultCache | None = None
+
+
+def get_result_cache() -> ResultCache:
+    global _cache
+    if _cache is None:
+        _cache = ResultCache()
+    return _cache
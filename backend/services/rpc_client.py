@@ -0,0 +1,113 @@
+"""
+Async JSON-RPC client for the chain RPC.
+
+One pooled httpx.AsyncClient (keep-alive connections, at most RPC_MAX_CONCURRENCY in flight).
+batch() packs many calls into one JSON-RPC batch request; batched() splits a long call list into
+batches of RPC_BATCH_SIZE and sends them concurrently under a semaphore. Per-call errors come back
+as RpcError values in the result list, so one reverted eth_call does not fail its whole batch.
+The transport is injectable (httpx.MockTransport) to run against a local JSON-RPC stand-in.
+"""
+
+import asyncio
+import itertools
+from typing import Any
+
+import httpx
+
+from core.config import settings
+
+
+class RpcError(Exception):
+    def __init__(self, message: str, code: int | None = None):
+        super().__init__(message)
+        self.code = code
+
+
+class JsonRpcClient:
+    def __init__(
+        self,
+        url: str,
+        batch_size: int | None = None,
+        max_concurrency: int | None = None,
+        timeout: float | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.url = url
+        self.batch_size = max(1, batch_size or settings.RPC_BATCH_SIZE)
+        self.max_concurrency = max(1, max_concurrency or settings.RPC_MAX_CONCURRENCY)
+        self._client = httpx.AsyncClient(
+            timeout=timeout or settings.RPC_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency),
+            transport=transport,
+        )
+        self._ids = itertools.count(1)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.requests = 0  # HTTP round trips
+        self.calls = 0  # JSON-RPC calls
+
+    async def _post(self, payload: Any) -> Any:
+        async with self._semaphore:
+            r = await self._client.post(self.url, json=payload)
+        self.requests += 1
+        r.raise_for_status()
+        return r.json()
+
+    @staticmethod
+    def _result(item: dict) -> Any:
+        error = item.get("error")
+        if error:
+            return RpcError(error.get("message", "RPC error"), error.get("code"))
+        return item.get("result")
+
+    async def call(self, method: str, params: list | None = None) -> Any:
+        self.calls += 1
+        data = await self._post({"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params or []})
+        result = self._result(data)
+        if isinstance(result, RpcError):
+            raise result
+        return result
+
+    async def batch(self, calls: list[tuple[str, list]]) -> list[Any]:
+        """One JSON-RPC batch request; results (or RpcError) in call order."""
+        if not calls:
+            return []
+        ids = [next(self._ids) for _ in calls]
+        self.calls += len(calls)
+        data = await self._post([
+            {"jsonrpc": "2.0", "id": i, "method": method, "params": params}
+            for i, (method, params) in zip(ids, calls)
+        ])
+        if isinstance(data, dict):  # the whole batch was rejected
+            raise RpcError(data.get("error", {}).get("message", "batch rejected"), data.get("error", {}).get("code"))
+        by_id = {item.get("id"): item for item in data}
+        missing = RpcError("no response for call")
+        return [self._result(by_id[i]) if i in by_id else missing for i in ids]
+
+    async def batched(self, calls: list[tuple[str, list]]) -> list[Any]:
+        """Split into batch_size batches sent concurrently (bounded by max_concurrency)."""
+        chunks = [calls[i : i + self.batch_size] for i in range(0, len(calls), self.batch_size)]
+        results = await asyncio.gather(*(self.batch(chunk) for chunk in chunks))
+        return [r for chunk in results for r in chunk]
+
+    async def eth_call(self, to: str, data: str, block: str = "latest") -> Any:
+        return await self.call("eth_call", [{"to": to, "data": data}, block])
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_client: JsonRpcClient | None = None
+
+
+def get_rpc_client() -> JsonRpcClient:
+    global _client
+    if _client is None:
+        _client = JsonRpcClient(settings.MEMEQUBIT_RPC_URL)
+    return _client
+
+
+async def close_rpc_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,271 @@
+"""
+Stateful scheduler sessions for a continuous stream of pending orders.
+
+A session keeps the key index (key -> writers / readers), each order's conflict neighbors and
+its slot. Adding an order looks up its neighbors through the index and takes the first slot
+that none of them use and that still has capacity; removing one only touches its neighbors.
+Per-order work is O(degree + slots probed), independent of how many orders are pending.
+rebuild() recolors the whole set with DSATUR when incremental first-fit has drifted; the API runs
+the coloring in the solver executor on a snapshot (rebuild_job / recolor / apply_rebuild).
+
+Every assignment/removal is published to subscribers (the SSE stream endpoint) through bounded
+queues; a subscriber that falls behind is dropped with an "overflow" event. Sessions live
+in process memory and expire after SCHEDULER_SESSION_TTL_SECONDS without activity; reads and
+attached subscribers count as activity.
+"""
+
+import asyncio
+import time
+import uuid
+from dataclasses import dataclass
+
+from core.config import settings
+from models.quantum import SchedulerSessionState
+from services.coloring import SlotCapacity, color_graph, order_gas
+from services.conflict_graph import ConflictGraph
+
+_SUBSCRIBER_QUEUE_SIZE = 256
+
+
+@dataclass
+class RebuildJob:
+    version: int  # session version the snapshot was taken at
+    ids: list[str]
+    graph: ConflictGraph
+    gas: list[int]
+    capacity: SlotCapacity
+
+
+async def recolor(job: RebuildJob) -> list[int]:
+    """Executor entry: DSATUR colors for a rebuild snapshot."""
+    return color_graph(job.graph, "dsatur", job.gas, job.capacity).colors
+
+
+class SchedulerSession:
+    def __init__(self, hazards: str = "rw", capacity: SlotCapacity | None = None):
+        self.id = uuid.uuid4().hex
+        self.hazards = hazards
+        self.capacity = capacity or SlotCapacity()
+        self.orders: dict[str, object] = {}
+        self.slot: dict[str, int] = {}
+        self.neighbors: dict[str, set[str]] = {}
+        self.writers: dict[str, set[str]] = {}
+        self.readers: dict[str, set[str]] = {}
+        self.slot_members: list[set[str]] = []
+        self.slot_gas: list[int] = []
+        self.num_conflicts = 0
+        self.version = 0
+        self.touched_at = time.time()
+        self._subscribers: set[asyncio.Queue] = set()
+
+    def _keys(self, o) -> tuple[set[str], set[str]]:
+        writes = set(getattr(o, "writes", None) or [])
+        reads = set(getattr(o, "reads", None) or []) if self.hazards == "rw" else set()
+        return writes, reads - writes
+
+    def _fits(self, c: int, gas: int) -> bool:
+        if c >= len(self.slot_members):
+            return True
+        count = len(self.slot_members[c])
+        if self.capacity.max_orders is not None and count >= self.capacity.max_orders:
+            return False
+        if self.capacity.max_gas is not None and count and self.slot_gas[c] + gas > self.capacity.max_gas:
+            return False
+        return True
+
+    def _place(self, order_id: str, c: int) -> None:
+        while c >= len(self.slot_members):
+            self.slot_members.append(set())
+            self.slot_gas.append(0)
+        self.slot[order_id] = c
+        self.slot_members[c].add(order_id)
+        self.slot_gas[c] += order_gas(self.orders[order_id])
+
+    def _unplace(self, order_id: str) -> None:
+        c = self.slot.pop(order_id)
+        self.slot_members[c].discard(order_id)
+        self.slot_gas[c] -= order_gas(self.orders[order_id])
+        while self.slot_members and not self.slot_members[-1]:
+            self.slot_members.pop()
+            self.slot_gas.pop()
+
+    def add(self, order) -> int:
+        """Index the order and assign it a slot. Re-adding an existing id replaces it."""
+        if order.id in self.orders:
+            self.remove(order.id)
+        writes, reads = self._keys(order)
+        found: set[str] = set()
+        for key in writes:
+            found |= self.writers.get(key, set())
+            found |= self.readers.get(key, set())
+        for key in reads:
+            found |= self.writers.get(key, set())
+        self.orders[order.id] = order
+        self.neighbors[order.id] = found
+        for other in found:
+            self.neighbors[other].add(order.id)
+        self.num_conflicts += len(found)
+        for key in writes:
+            self.writers.setdefault(key, set()).add(order.id)
+        for key in reads:
+            self.readers.setdefault(key, set()).add(order.id)
+
+        used = {self.slot[other] for other in found}
+        gas = order_gas(order)
+        c = 0
+        while c in used or not self._fits(c, gas):
+            c += 1
+        self._place(order.id, c)
+        self._changed({"type": "assigned", "order_id": order.id, "slot": f"slot_{c + 1}"})
+        return c
+
+    def remove(self, order_id: str) -> bool:
+        order = self.orders.get(order_id)
+        if order is None:
+            return False
+        writes, reads = self._keys(order)
+        for key in writes:
+            self._discard(self.writers, key, order_id)
+        for key in reads:
+            self._discard(self.readers, key, order_id)
+        others = self.neighbors.pop(order_id)
+        for other in others:
+            self.neighbors[other].discard(order_id)
+        self.num_conflicts -= len(others)
+        self._unplace(order_id)
+        del self.orders[order_id]
+        self._changed({"type": "removed", "order_id": order_id})
+        return True
+
+    @staticmethod
+    def _discard(index: dict[str, set[str]], key: str, order_id: str) -> None:
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(order_id)
+            if not ids:
+                del index[key]
+
+    def rebuild_job(self) -> "RebuildJob":
+        """Snapshot of the conflict graph for a full recolor off the event loop."""
+        ids = list(self.orders)
+        position = {order_id: i for i, order_id in enumerate(ids)}
+        graph = ConflictGraph(len(ids))
+        for order_id, others in self.neighbors.items():
+            for other in others:
+                graph.add_edge(position[order_id], position[other])
+        gas = [order_gas(self.orders[order_id]) for order_id in ids]
+        return RebuildJob(self.version, ids, graph, gas, self.capacity)
+
+    def apply_rebuild(self, job: "RebuildJob", colors: list[int]) -> bool:
+        """Install a recolor computed from `job`; False (nothing changed) if orders moved since."""
+        if job.version != self.version:
+            return False
+        self.slot.clear()
+        self.slot_members.clear()
+        self.slot_gas.clear()
+        for order_id, c in zip(job.ids, colors):
+            self._place(order_id, c)
+        self._changed({"type": "rebuilt", "total_slots": self.total_slots})
+        return True
+
+    def rebuild(self) -> None:
+        """Full DSATUR recolor of the current orders (compacts slots freed by removals)."""
+        job = self.rebuild_job()
+        self.apply_rebuild(job, color_graph(job.graph, "dsatur", job.gas, job.capacity).colors)
+
+    @property
+    def total_slots(self) -> int:
+        """Non-empty slots, as in schedule(); removals can leave interior slots empty until rebuild()."""
+        return sum(1 for members in self.slot_members if members)
+
+    def schedule(self) -> dict[str, list[str]]:
+        return {f"slot_{c + 1}": sorted(members) for c, members in enumerate(self.slot_members) if members}
+
+    def state(self) -> SchedulerSessionState:
+        return SchedulerSessionState(
+            session_id=self.id,
+            schedule=self.schedule(),
+            total_slots=self.total_slots,
+            total_orders=len(self.orders),
+            total_conflicts=self.num_conflicts,
+            version=self.version,
+        )
+
+    def touch(self) -> None:
+        self.touched_at = time.time()
+
+    def _changed(self, event: dict) -> None:
+        self.version += 1
+        self.touch()
+        event["version"] = self.version
+        for queue in list(self._subscribers):
+            if queue.full():
+                # Stalled consumer: drop its backlog and tell it to reconnect for a fresh snapshot.
+                self._subscribers.discard(queue)
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "overflow", "version": self.version})
+            else:
+                queue.put_nowait(event)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        self.touch()
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+        self.touch()  # the TTL restarts when the last watcher leaves
+
+    @property
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def close(self) -> None:
+        self._changed({"type": "closed"})
+
+
+class SchedulerSessionStore:
+    def __init__(self):
+        self._sessions: dict[str, SchedulerSession] = {}
+
+    def _expire(self) -> None:
+        cutoff = time.time() - settings.SCHEDULER_SESSION_TTL_SECONDS
+        for sid in [sid for sid, s in self._sessions.items() if s.touched_at < cutoff and not s.has_subscribers]:
+            self._sessions.pop(sid).close()
+
+    def create(self, hazards: str = "rw", capacity: SlotCapacity | None = None) -> SchedulerSession:
+        self._expire()
+        if len(self._sessions) >= settings.SCHEDULER_MAX_SESSIONS:
+            # Evict the least recently used session, sparing watched ones while any are unwatched.
+            oldest = min(self._sessions.values(), key=lambda s: (s.has_subscribers, s.touched_at))
+            self._sessions.pop(oldest.id).close()
+        session = SchedulerSession(hazards, capacity)
+        self._sessions[session.id] = session
+        return session
+
+    def get(self, session_id: str) -> SchedulerSession | None:
+        """The session (touched: a read keeps it alive), or None."""
+        self._expire()
+        session = self._sessions.get(session_id)
+        if session is not None:
+            session.touch()
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return False
+        session.close()
+        return True
+
+
+_store: SchedulerSessionStore | None = None
+
+
+def get_scheduler_sessions() -> SchedulerSessionStore:
+    global _store
+    if _store is None:
+        _store = SchedulerSessionStore()
+    return _store
@@ -0,0 +1,280 @@
+"""
+Sniper scoring-model registry.
+
+A model is a small JSON spec compiled once into a NumPy evaluator over SniperColumns, so scoring
+cost per candidate is the same as the hand-written formulas. Three kinds:
+
+- linear: score = scale * (bias + sum weight * f(feature)), where f optionally divides by `norm`,
+  applies a `decay` (max(0, 1 - x / decay)) and clips to `clip` = [lo, hi].
+- rules: per feature, tiers [op, value, points] where the first matching tier scores; the total is
+  capped at `max_score`.
+- tree: a decision tree {"feature", "threshold", "left" (x < threshold), "right"} with {"value"}
+  leaves, evaluated for all rows at once with masks.
+
+Features: velocity, uniqueness, age_sec, dev_active (0/1). Every model also has a fly_threshold.
+The built-in "classical" and "quantum" models are the original rule set and weighted sum, unchanged
+(scoring_models/quantum_dev_penalty.json is the weighted sum with the dev-wallet penalty applied).
+Files *.json in SNIPER_MODELS_DIR (a relative path is resolved against the backend package, not
+the working directory) are added or override built-ins by name ({"name": ..., "kind": ..., ...});
+the directory is re-scanned at most every SNIPER_MODELS_RELOAD_SEC and changed files are
+recompiled, so models can be swapped without a restart. A file that fails to compile keeps the previous version and is reported in describe().
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+
+from core.config import settings
+from services.sniper_scoring import SniperColumns
+
+FEATURES = ("velocity", "uniqueness", "age_sec", "dev_active")
+_OPS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "==": np.equal,
+}
+
+BUILTIN_MODELS = {
+    "classical": {
+        "kind": "rules",
+        "rules": [
+            {"feature": "velocity", "tiers": [[">", 0.5, 40], [">", 0.2, 20]]},
+            {"feature": "uniqueness", "tiers": [[">", 0.5, 35], [">", 0.3, 15]]},
+            {"feature": "age_sec", "tiers": [["<", 120, 15]]},  # fresh
+            {"feature": "dev_active", "tiers": [["==", 0, 10]]},  # dev not dumping
+        ],
+        "max_score": 100.0,
+    },
+    "quantum": {
+        "kind": "linear",
+        "terms": [
+            {"feature": "velocity", "weight": 0.35, "norm": 1.0, "clip": [0.0, 1.0]},
+            {"feature": "uniqueness", "weight": 0.35},
+            {"feature": "age_sec", "weight": 0.2, "decay": 300},  # decay over 5 min
+        ],
+        "bias": 0.2,  # constant terms of the original formula: w_dev (0.1) + 0.1
+        "scale": 100.0,
+    },
+}
+
+Evaluator = Callable[[SniperColumns], np.ndarray]
+
+
+class UnknownScoringModel(KeyError):
+    """No registered model has this name (raised by ScoringModelRegistry.get)."""
+
+
+@dataclass
+class ScoringModel:
+    name: str
+    kind: str
+    evaluate: Evaluator
+    fly_threshold: float = 50.0
+    source: str = "builtin"
+    mtime: float = 0.0
+
+
+def _feature(cols: SniperColumns, name: str) -> np.ndarray:
+    if name == "velocity":
+        return cols.velocity
+    if name == "uniqueness":
+        return cols.uniqueness
+    if name == "age_sec":
+        return cols.age_sec
+    if name == "dev_active":
+        return cols.dev_active.astype(np.float64)
+    raise ValueError(f"unknown feature {name!r}; expected one of {FEATURES}")
+
+
+def _check_feature(name) -> str:
+    if name not in FEATURES:
+        raise ValueError(f"unknown feature {name!r}; expected one of {FEATURES}")
+    return name
+
+
+def _compile_linear(spec: dict) -> Evaluator:
+    terms = []
+    for t in spec.get("terms", []):
+        clip = t.get("clip")
+        terms.append((
+            _check_feature(t["feature"]),
+            float(t["weight"]),
+            float(t.get("norm", 1.0)),
+            float(t["decay"]) if t.get("decay") else None,
+            (float(clip[0]), float(clip[1])) if clip else None,
+        ))
+    bias, scale = float(spec.get("bias", 0.0)), float(spec.get("scale", 1.0))
+
+    def evaluate(cols: SniperColumns) -> np.ndarray:
+        total = np.full(len(cols), bias)
+        for name, weight, norm, decay, clip in terms:
+            x = _feature(cols, name) / norm
+            if decay is not None:
+                x = np.maximum(0.0, 1.0 - x / decay)
+            if clip is not None:
+                x = np.clip(x, clip[0], clip[1])
+            total += weight * x
+        return scale * total
+
+    return evaluate
+
+
+def _compile_rules(spec: dict) -> Evaluator:
+    rules = []
+    for r in spec.get("rules", []):
+        tiers = [(_OPS[op], float(value), float(points)) for op, value, points in r["tiers"]]
+        rules.append((_check_feature(r["feature"]), tiers))
+    max_score = spec.get("max_score")
+
+    def evaluate(cols: SniperColumns) -> np.ndarray:
+        total = np.zeros(len(cols))
+        for name, tiers in rules:
+            x = _feature(cols, name)
+            total += np.select([op(x, value) for op, value, _ in tiers], [points for _, _, points in tiers], 0.0)
+        return total if max_score is None else np.minimum(float(max_score), total)
+
+    return evaluate
+
+
+def _compile_tree(spec: dict) -> Evaluator:
+    def check(node: dict, depth: int = 0) -> None:
+        if depth > 32:
+            raise ValueError("tree deeper than 32 levels")
+        if "value" in node:
+            float(node["value"])
+            return
+        _check_feature(node["feature"])
+        float(node["threshold"])
+        check(node["left"], depth + 1)
+        check(node["right"], depth + 1)
+
+    root = spec["tree"]
+    check(root)
+
+    def walk(node: dict, cols: SniperColumns, rows: np.ndarray, out: np.ndarray) -> None:
+        if "value" in node:
+            out[rows] = float(node["value"])
+            return
+        go_left = _feature(cols, node["feature"])[rows] < float(node["threshold"])
+        if go_left.any():
+            walk(node["left"], cols, rows[go_left], out)
+        if not go_left.all():
+            walk(node["right"], cols, rows[~go_left], out)
+
+    def evaluate(cols: SniperColumns) -> np.ndarray:
+        out = np.zeros(len(cols))
+        if len(cols):
+            walk(root, cols, np.arange(len(cols)), out)
+        return out
+
+    return evaluate
+
+
+_COMPILERS = {"linear": _compile_linear, "rules": _compile_rules, "tree": _compile_tree}
+
+
+def compile_model(name: str, spec: dict, source: str = "builtin", mtime: float = 0.0) -> ScoringModel:
+    kind = spec.get("kind")
+    if kind not in _COMPILERS:
+        raise ValueError(f"unknown model kind {kind!r}; expected one of {sorted(_COMPILERS)}")
+    return ScoringModel(
+        name=name,
+        kind=kind,
+        evaluate=_COMPILERS[kind](spec),
+        fly_threshold=float(spec.get("fly_threshold", 50.0)),
+        source=source,
+        mtime=mtime,
+    )
+
+
+class ScoringModelRegistry:
+    def __init__(self, directory: str | None = None, reload_sec: float = 2.0):
+        self.directory = directory
+        self.reload_sec = reload_sec
+        self._builtins = {name: compile_model(name, spec) for name, spec in BUILTIN_MODELS.items()}
+        self.models: dict[str, ScoringModel] = dict(self._builtins)
+        self.errors: dict[str, str] = {}  # path -> last compile error
+        self._files: dict[str, tuple[float, str | None]] = {}  # path -> (mtime, model name)
+        self._checked_at = 0.0
+        self.refresh(force=True)
+
+    def refresh(self, force: bool = False) -> None:
+        """Re-scan the model directory (throttled to reload_sec): compile new or changed files, drop deleted ones."""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_sec:
+            return
+        self._checked_at = now
+        paths = {}
+        if self.directory and os.path.isdir(self.directory):
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".json") and entry.is_file():
+                    paths[entry.path] = entry.stat().st_mtime
+        for path in list(self._files):
+            if path not in paths:
+                _, name = self._files.pop(path)
+                self.errors.pop(path, None)
+                self._drop(name)
+        for path, mtime in paths.items():
+            known = self._files.get(path)
+            if known is not None and known[0] == mtime:
+                continue
+            try:
+                with open(path) as f:
+                    spec = json.load(f)
+                name = spec.get("name") or os.path.splitext(os.path.basename(path))[0]
+                model = compile_model(name, spec, source=path, mtime=mtime)
+                if known is not None and known[1] != name:
+                    self._drop(known[1])
+                self.models[name] = model
+                self.errors.pop(path, None)
+            except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+                self.errors[path] = f"{type(e).__name__}: {e}"
+                name = known[1] if known else None
+            self._files[path] = (mtime, name)
+
+    def _drop(self, name: str | None) -> None:
+        """Forget a file-backed model; a built-in of the same name comes back."""
+        if name is None:
+            return
+        if name in self._builtins:
+            self.models[name] = self._builtins[name]
+        else:
+            self.models.pop(name, None)
+
+    def get(self, name: str) -> ScoringModel:
+        self.refresh()
+        model = self.models.get(name)
+        if model is None:
+            raise UnknownScoringModel(name)
+        return model
+
+    def describe(self) -> dict:
+        self.refresh()
+        return {
+            "models": [
+                {"name": m.name, "kind": m.kind, "fly_threshold": m.fly_threshold, "source": m.source, "mtime": m.mtime}
+                for m in self.models.values()
+            ],
+            "errors": dict(self.errors),
+        }
+
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_registry: ScoringModelRegistry | None = None
+
+
+def get_scoring_models() -> ScoringModelRegistry:
+    global _registry
+    if _registry is None:
+        directory = settings.SNIPER_MODELS_DIR
+        if directory and not os.path.isabs(directory):
+            directory = os.path.join(_BACKEND_DIR, directory)
+        _registry = ScoringModelRegistry(directory, settings.SNIPER_MODELS_RELOAD_SEC)
+    return _registry
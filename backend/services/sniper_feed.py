@@ -0,0 +1,230 @@
+"""
+Continuous sniper feed with rolling per-pool state.
+
+Clients push small updates (new pool, funding tick, wallet counts, dev activity) instead of
+resending the candidate list. Per pool the feed keeps the funding ticks inside a sliding window
+(running sum -> bond_curve_funding_velocity), the set of buying wallets and the buy count
+(-> unique_wallets_ratio), its creation time and dev flag, all mirrored into NumPy columns.
+Every tick the whole book is rescored column-wise (age moves for every pool each second) and
+only differences are published: rank changes inside the top K and fly flips.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+import numpy as np
+
+from core.config import settings
+from models.quantum import SniperFeedUpdate
+from services.scoring_models import get_scoring_models
+from services.sniper_scoring import SniperColumns, rank_order, top_k
+
+_INITIAL_CAPACITY = 256
+
+
+class _PoolState:
+    __slots__ = ("ticks", "funding", "wallets", "buys")
+
+    def __init__(self):
+        self.ticks: deque[tuple[float, float]] = deque()  # (ts, amount) inside the velocity window
+        self.funding = 0.0  # sum of amounts in `ticks`
+        self.wallets: set[str] = set()
+        self.buys = 0
+
+
+class SniperFeed:
+    def __init__(self, window_sec: float | None = None, top_k: int | None = None, model: str = "quantum"):
+        self.model = model  # scoring model name, resolved on every rescore so reloads apply
+        self.window_sec = window_sec or settings.SNIPER_FEED_VELOCITY_WINDOW_SEC
+        self.top_k = top_k or settings.SNIPER_FEED_TOP_K
+        self.pool_ids: list[str] = []
+        self.row_of: dict[str, int] = {}
+        self._state: list[_PoolState] = []
+        cap = _INITIAL_CAPACITY
+        self.created_at = np.zeros(cap)
+        self.velocity = np.zeros(cap)
+        self.uniqueness = np.zeros(cap)
+        self.dev_active = np.zeros(cap, dtype=bool)
+        self._fly = np.zeros(cap, dtype=bool)
+        self._ranks: dict[str, int] = {}
+        self._subscribers: set[asyncio.Queue] = set()
+        self._ticker: asyncio.Task | None = None
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self.pool_ids)
+
+    # --- updates ---
+
+    def _row(self, pool_id: str, now: float) -> int:
+        row = self.row_of.get(pool_id)
+        if row is not None:
+            return row
+        row = len(self.pool_ids)
+        if row == len(self.created_at):
+            for name in ("created_at", "velocity", "uniqueness", "dev_active", "_fly"):
+                col = getattr(self, name)
+                setattr(self, name, np.concatenate([col, np.zeros_like(col)]))
+        self.pool_ids.append(pool_id)
+        self.row_of[pool_id] = row
+        self._state.append(_PoolState())
+        self.created_at[row] = now
+        self.velocity[row] = self.uniqueness[row] = 0.0
+        self.dev_active[row] = self._fly[row] = False
+        return row
+
+    def _remove(self, pool_id: str) -> None:
+        """Swap-remove so live rows stay contiguous."""
+        row = self.row_of.pop(pool_id, None)
+        if row is None:
+            return
+        last = len(self.pool_ids) - 1
+        if row != last:
+            moved = self.pool_ids[last]
+            self.pool_ids[row] = moved
+            self.row_of[moved] = row
+            self._state[row] = self._state[last]
+            for col in (self.created_at, self.velocity, self.uniqueness, self.dev_active, self._fly):
+                col[row] = col[last]
+        self.pool_ids.pop()
+        self._state.pop()
+        self._ranks.pop(pool_id, None)
+
+    def _refresh_velocity(self, row: int, now: float) -> None:
+        st = self._state[row]
+        cutoff = now - self.window_sec
+        while st.ticks and st.ticks[0][0] < cutoff:
+            st.funding -= st.ticks.popleft()[1]
+        span = min(self.window_sec, max(now - self.created_at[row], 1.0))
+        self.velocity[row] = max(st.funding, 0.0) / span
+
+    def apply(self, update: SniperFeedUpdate, now: float | None = None) -> None:
+        now = time.time() if now is None else now
+        if update.type == "remove":
+            self._remove(update.pool_id)
+            self.version += 1
+            return
+        ts = update.ts or now
+        row = self._row(update.pool_id, now)
+        st = self._state[row]
+        if update.type == "pool":
+            if update.created_at_sec_ago is not None:
+                self.created_at[row] = ts - update.created_at_sec_ago
+            if update.dev_wallet_active is not None:
+                self.dev_active[row] = update.dev_wallet_active
+        elif update.type == "funding":
+            amount = update.amount or 0.0
+            st.ticks.append((ts, amount))
+            st.funding += amount
+            st.buys += 1
+            if update.wallet:
+                st.wallets.add(update.wallet)
+                self.uniqueness[row] = len(st.wallets) / st.buys
+            self._refresh_velocity(row, now)
+        elif update.type == "wallets":
+            if update.unique_wallets_ratio is not None:
+                self.uniqueness[row] = update.unique_wallets_ratio
+            elif update.total_buys:
+                self.uniqueness[row] = (update.unique_wallets or 0) / update.total_buys
+        elif update.type == "dev":
+            self.dev_active[row] = bool(update.dev_wallet_active)
+        self.version += 1
+
+    # --- scoring ---
+
+    def columns(self, now: float | None = None) -> SniperColumns:
+        now = time.time() if now is None else now
+        n = len(self.pool_ids)
+        for row in range(n):
+            if self._state[row].ticks:
+                self._refresh_velocity(row, now)
+        return SniperColumns(
+            pool_ids=self.pool_ids,
+            velocity=self.velocity[:n],
+            uniqueness=self.uniqueness[:n],
+            age_sec=np.maximum(now - self.created_at[:n], 0.0),
+            dev_active=self.dev_active[:n],
+        )
+
+    def snapshot(self, k: int | None = None, now: float | None = None) -> list[dict]:
+        """Current top-k rows, best quantum score first."""
+        cols = self.columns(now)
+        q, c, fly = self._score(cols)
+        order = rank_order(q) if k is None else top_k(q, k)
+        return [self._entry(cols, i, rank, q, c, fly) for rank, i in enumerate(order.tolist(), start=1)]
+
+    def _score(self, cols: SniperColumns) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        models = get_scoring_models()
+        model = models.get(self.model)
+        q = model.evaluate(cols)
+        return q, models.get("classical").evaluate(cols), q >= model.fly_threshold
+
+    @staticmethod
+    def _entry(cols: SniperColumns, i: int, rank: int, q: np.ndarray, c: np.ndarray, fly: np.ndarray) -> dict:
+        return {
+            "pool_id": cols.pool_ids[i],
+            "quantum_rank": rank,
+            "quantum_score": round(float(q[i]), 2),
+            "classical_score": round(float(c[i]), 2),
+            "bond_curve_funding_velocity": round(float(cols.velocity[i]), 6),
+            "unique_wallets_ratio": round(float(cols.uniqueness[i]), 4),
+            "created_at_sec_ago": round(float(cols.age_sec[i]), 1),
+            "fly": bool(fly[i]),
+        }
+
+    def tick(self, now: float | None = None) -> list[dict]:
+        """Rescore everything; return rank changes within the top K and fly flips since the last tick."""
+        cols = self.columns(now)
+        n = len(cols)
+        q, c, fly = self._score(cols)
+        changes: list[dict] = []
+        order = top_k(q, self.top_k)
+        ranks = {cols.pool_ids[i]: r for r, i in enumerate(order.tolist(), start=1)}
+        for r, i in enumerate(order.tolist(), start=1):
+            if self._ranks.get(cols.pool_ids[i]) != r:
+                changes.append({"type": "rank", **self._entry(cols, i, r, q, c, fly)})
+        for pool_id in self._ranks.keys() - ranks.keys():
+            changes.append({"type": "dropped", "pool_id": pool_id})
+        self._ranks = ranks
+        for i in np.flatnonzero(fly != self._fly[:n]).tolist():
+            changes.append({"type": "fly", "pool_id": cols.pool_ids[i], "fly": bool(fly[i]), "quantum_score": round(float(q[i]), 2)})
+        self._fly[:n] = fly
+        return changes
+
+    # --- streaming ---
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+        self._subscribers.add(queue)
+        if self._ticker is None or self._ticker.done():
+            self._ticker = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            try:
+                changes = self.tick()
+                if changes:
+                    message = {"type": "tick", "ts": time.time(), "pools": len(self), "changes": changes}
+                    for queue in list(self._subscribers):
+                        if queue.full():
+                            queue.get_nowait()  # slow consumer: drop its oldest tick
+                        queue.put_nowait(message)
+            except Exception as e:
+                # Keep ticking: a bad tick (e.g. a broken scoring model) must not end the feed.
+                print(f"Sniper feed tick failed: {e}")
+            await asyncio.sleep(settings.SNIPER_FEED_TICK_MS / 1000)
+
+
+_feed: SniperFeed | None = None
+
+
+def get_sniper_feed() -> SniperFeed:
+    global _feed
+    if _feed is None:
+        _feed = SniperFeed()
+    return _feed
@@ -0,0 +1,60 @@
+"""
+Columnar sniper scoring.
+
+PoolCandidate lists are converted to NumPy columns once; scoring models (services/scoring_models)
+evaluate all candidates in one pass, ranks come from a stable argsort and top-K from a partial
+partition, so thousands of candidates per request score in a few milliseconds.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass
+class SniperColumns:
+    pool_ids: list[str]
+    velocity: np.ndarray  # bond_curve_funding_velocity
+    uniqueness: np.ndarray  # unique_wallets_ratio
+    age_sec: np.ndarray  # created_at_sec_ago
+    dev_active: np.ndarray  # bool
+
+    def __len__(self) -> int:
+        return len(self.pool_ids)
+
+
+def to_columns(candidates: list) -> SniperColumns:
+    n = len(candidates)
+    return SniperColumns(
+        pool_ids=[c.pool_id for c in candidates],
+        velocity=np.fromiter((c.bond_curve_funding_velocity for c in candidates), dtype=np.float64, count=n),
+        uniqueness=np.fromiter((c.unique_wallets_ratio for c in candidates), dtype=np.float64, count=n),
+        age_sec=np.fromiter((c.created_at_sec_ago for c in candidates), dtype=np.float64, count=n),
+        dev_active=np.fromiter((c.dev_wallet_active for c in candidates), dtype=bool, count=n),
+    )
+
+
+def rank_order(scores: np.ndarray) -> np.ndarray:
+    """Candidate indices best first; ties keep input order."""
+    return np.argsort(-scores, kind="stable")
+
+
+def ranks(order: np.ndarray) -> np.ndarray:
+    """1-based rank per candidate from rank_order()."""
+    r = np.empty(len(order), dtype=np.int64)
+    r[order] = np.arange(1, len(order) + 1)
+    return r
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k best scores, best first (partition, then sort only those k)."""
+    n = len(scores)
+    if k >= n:
+        return rank_order(scores)
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    kth = np.partition(scores, n - k)[n - k]  # k-th best score
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[: k - len(above)]  # lowest indices win ties, as in rank_order()
+    part = np.concatenate([above, ties])
+    return part[np.lexsort((part, -scores[part]))]
@@ -270,6 +270,9 @@ export default function LiquidationDemoPage() {
                   <div className="rounded-lg border border-slate-600 bg-slate-800/50 p-4">
                     <p className="mb-2 text-sm font-medium text-slate-400">Classical (sort by health factor — greedy)</p>
                     <p className="text-slate-400">Recovery: <span className="text-white">{(result.comparison.classical_recovery * 100).toFixed(2)}%</span></p>
+                    {result.comparison.classical_recovery_value != null && (
+                      <p className="text-slate-400">Recovery value: <span className="text-white">{result.comparison.classical_recovery_value.toLocaleString()}</span></p>
+                    )}
                     {result.comparison.classical_gas_used != null && (
                       <p className="text-slate-400">Gas: <span className="text-white">{result.comparison.classical_gas_used.toLocaleString()}</span></p>
                     )}
@@ -281,6 +284,9 @@ export default function LiquidationDemoPage() {
                   <div className="rounded-lg border border-cyan-500/50 bg-cyan-500/10 p-4">
                     <p className="mb-2 text-sm font-medium text-cyan-400">Quantum (maximize recovery within gas & liquidity limits)</p>
                     <p className="text-slate-400">Recovery: <span className="text-green-400 font-semibold">{(result.comparison.quantum_recovery * 100).toFixed(2)}%</span></p>
+                    {result.comparison.quantum_recovery_value != null && (
+                      <p className="text-slate-400">Recovery value: <span className="text-green-400 font-semibold">{result.comparison.quantum_recovery_value.toLocaleString()}</span></p>
+                    )}
                     {result.comparison.quantum_gas_used != null && (
                       <p className="text-slate-400">Gas: <span className="text-white">{result.comparison.quantum_gas_used.toLocaleString()}</span></p>
                     )}
@@ -293,7 +299,7 @@ export default function LiquidationDemoPage() {
                   </span>
                   {result.comparison.improvement_pct !== 0 && (
                     <span className="text-slate-400">
-                      Recovery improvement: <strong className="text-white">{result.comparison.improvement_pct > 0 ? "+" : ""}{result.comparison.improvement_pct}%</strong>
+                      Recovery value improvement: <strong className="text-white">{result.comparison.improvement_pct > 0 ? "+" : ""}{result.comparison.improvement_pct}%</strong>
                     </span>
                   )}
                 </div>
@@ -73,11 +73,20 @@ export type SchedulerOrder = {
   account: string;
   reads: string[];
   writes: string[];
+  gas_estimate?: number;
 };
 
 export type SchedulerRequest = {
   pending_orders: SchedulerOrder[];
   conflict_matrix?: number[][];
+  include_matrix?: boolean;
+  include_edges?: boolean;
+  strategy?: "first_fit" | "largest_first" | "dsatur";
+  local_search_ms?: number;
+  max_orders_per_slot?: number;
+  max_gas_per_slot?: number;
+  hazards?: "ww" | "rw";
+  pipelined?: boolean;
 };
 
 export type SchedulerComparison = {
@@ -87,6 +96,7 @@ export type SchedulerComparison = {
   quantum_conflicts_remaining: number;
   slots_reduction_pct: number;
   winner: string;
+  strategies?: Record<string, { slots: number; ms: number }>;
 };
 
 export type SchedulerResponse = {
@@ -94,6 +104,8 @@ export type SchedulerResponse = {
   total_slots: number;
   conflict_reduction: string;
   conflict_matrix?: number[][];
+  conflict_edges?: [number, number][];
+  dependency_edges?: [number, number, number][];
   total_conflicts?: number;
   comparison?: SchedulerComparison;
   quantum_metrics?: { graph_nodes?: number; graph_edges?: number; conflict_pairs?: number; coloring_slots?: number; classical_slots_baseline?: number };
@@ -138,10 +150,12 @@ export type LiquidationRequest = {
 
 export type LiquidationComparison = {
   classical_recovery: number;
+  classical_recovery_value?: number;
   classical_selected: string[];
   classical_gas_used?: number;
   classical_constraint_violation?: string;
   quantum_recovery: number;
+  quantum_recovery_value?: number;
   quantum_selected: string[];
   quantum_gas_used?: number;
   improvement_pct: number;
@@ -152,6 +166,7 @@ export type LiquidationResponse = {
   selected_positions: string[];
   strategy: { position: string; action: string; priority: number }[];
   estimated_recovery: number;
+  recovery_value?: number;
   simulation_time: number;
   comparison?: LiquidationComparison;
   quantum_metrics?: { positions_evaluated?: number; positions_selected?: number; solver_ms?: number; constraints_checked?: string };
@@ -330,6 +345,37 @@ export type BatchExitRequest = {
   position_tokens?: number;
   max_slippage_pct?: number;
   gas_per_tx?: number;
+  pool?: { address: string; tokens: string[]; reserves: number[]; fee: number } | null;
+  pool_address?: string | null;
+  token_in?: string | null;
+  gas_price_gwei?: number;
+  native_token_price?: number;
+  recovery?: number;
+  max_batches?: number;
+  simulate?: boolean;
+  paths?: number;
+  volatility_pct?: number;
+  drift_pct?: number;
+  seed?: number | null;
+};
+
+export type BatchExitSimulation = {
+  batches: number;
+  profile: number;
+  paths: number;
+  mean_net_proceeds: number;
+  net_proceeds: Record<string, number>;
+  slippage_pct: Record<string, number>;
+};
+
+export type BatchExitSweepEntry = {
+  batches: number;
+  profile: number;
+  proceeds: number;
+  net_proceeds: number;
+  slippage_pct: number;
+  max_batch_impact_pct: number;
+  feasible: boolean;
 };
 
 export type BatchExitComparison = {
@@ -345,10 +391,12 @@ export type BatchExitComparison = {
 };
 
 export type BatchExitResponse = {
-  recommended_batches: { batch: number; amount: number; slot: number }[];
+  recommended_batches: { batch: number; amount: number; slot: number; expected_out?: number; impact_pct?: number }[];
   comparison?: BatchExitComparison | null;
+  sweep?: BatchExitSweepEntry[];
+  simulation?: BatchExitSimulation[];
   simulation_time: number;
-  quantum_metrics?: Record<string, number>;
+  quantum_metrics?: Record<string, number | boolean>;
 };
 
 export async function runBatchExit(body: BatchExitRequest): Promise<BatchExitResponse> {
@@ -365,8 +413,13 @@ export type HedgeFinderRequest = {
   token_to_hedge: string;
   pools: { address: string; tokens: string[]; reserves: number[]; fee: number }[];
   target_stable?: string | null;
+  targets?: string[] | null;
+  amount?: number;
+  max_hops?: number;
 };
 
+export type HedgeTarget = { target: string; path: string[]; expected_output: number };
+
 export type HedgeFinderComparison = {
   classical_path: string[];
   classical_output: number;
@@ -381,6 +434,8 @@ export type HedgeFinderComparison = {
 export type HedgeFinderResponse = {
   optimal_path: string[];
   expected_output: number;
+  target?: string | null;
+  ranked_targets?: HedgeTarget[];
   comparison?: HedgeFinderComparison | null;
   simulation_time: number;
   quantum_metrics?: Record<string, number>;